@@ -6,33 +6,30 @@ detection, REAL web verification, URL safety check, screenshot
 OCR analysis, and premium dark UI.
 
 Run:  streamlit run app.py
+Batch: python -m trusthire postings.csv -o scored.jsonl   (no UI, see trusthire/cli.py)
 Deps: pip install streamlit Pillow pytesseract
       (also install Tesseract-OCR for screenshot scanning)
 """
 
 import streamlit as st
-import re
-import json
-import os
+import hashlib
+import html
 import math
-import socket
-import ssl
-from datetime import datetime
-from urllib.request import urlopen, Request
-from urllib.parse import urlparse
-
-# ── Optional OCR imports ──
-try:
-    from PIL import Image
-    PIL_AVAILABLE = True
-except ImportError:
-    PIL_AVAILABLE = False
-
-try:
-    import pytesseract
-    TESSERACT_AVAILABLE = True
-except ImportError:
-    TESSERACT_AVAILABLE = False
+import time
+from datetime import datetime, timedelta
+
+from trusthire.blobstore import TEXT_STORE
+from trusthire.history import SCAN_HISTORY, save_last_result
+from trusthire.metrics import STAGE_METRICS, StageTimer, probe_spans
+from trusthire.neardup import NEAR_DUP_INDEX, known_scam_match
+from trusthire.ocr import OCR_CACHE, extract_texts_from_images
+from trusthire.render import (
+    generate_ai_explanation, generate_report_txt, generate_safe_job_links, highlight_scam_words,
+)
+from trusthire.reports import lookup_prior_reports, save_scam_report
+from trusthire.features import extract_features
+from trusthire.scoring import calculate_risk_score, text_risk_level
+from trusthire.verify import VERIFY_CACHE, run_web_checks
 
 # ─────────────────────────────────────────────
 # PAGE CONFIG
@@ -255,53 +252,9 @@ div.stButton > button:not([kind="primary"]):hover {
 """, unsafe_allow_html=True)
 
 
-# ─────────────────────────────────────────────
-# FILE PERSISTENCE
-# ─────────────────────────────────────────────
-REPORTS_FILE = "scam_reports.json"
-HISTORY_FILE = "scan_history.json"
-LAST_RESULT_FILE = "last_result.json"
-
-
-def load_scan_history():
-    """Load scan history from disk."""
-    if os.path.exists(HISTORY_FILE):
-        with open(HISTORY_FILE, "r", encoding="utf-8") as f:
-            try:
-                return json.load(f)
-            except json.JSONDecodeError:
-                return []
-    return []
-
-
-def save_scan_history(history):
-    """Save scan history to disk."""
-    with open(HISTORY_FILE, "w", encoding="utf-8") as f:
-        json.dump(history, f, indent=2, ensure_ascii=False)
-
-
-def load_last_result():
-    """Load the most recent analysis result from disk."""
-    if os.path.exists(LAST_RESULT_FILE):
-        with open(LAST_RESULT_FILE, "r", encoding="utf-8") as f:
-            try:
-                return json.load(f)
-            except json.JSONDecodeError:
-                return None
-    return None
-
-
-def save_last_result(result):
-    """Save the most recent analysis result to disk."""
-    with open(LAST_RESULT_FILE, "w", encoding="utf-8") as f:
-        json.dump(result, f, indent=2, ensure_ascii=False)
-
-
 # ─────────────────────────────────────────────
 # SESSION STATE
 # ─────────────────────────────────────────────
-if "scan_history" not in st.session_state:
-    st.session_state.scan_history = load_scan_history()
 if "last_result" not in st.session_state:
     st.session_state.last_result = None
 if "show_ai" not in st.session_state:
@@ -318,394 +271,80 @@ if "_page_override" in st.session_state and st.session_state._page_override:
 
 
 
-# ═════════════════════════════════════════════
-# WEB VERIFICATION FUNCTIONS
-# ═════════════════════════════════════════════
-
-def verify_email_domain(email):
-    result = {"valid_domain": False, "is_free": False, "domain": ""}
-    if "@" not in email:
-        return result
-    domain = email.strip().lower().split("@")[-1]
-    result["domain"] = domain
-    FREE_DOMAINS = [
-        "gmail.com", "yahoo.com", "outlook.com", "hotmail.com",
-        "protonmail.com", "aol.com", "ymail.com", "rediffmail.com",
-        "mail.com", "zoho.com", "icloud.com", "live.com",
-        "yandex.com", "tutanota.com", "gmx.com",
-    ]
-    if domain in FREE_DOMAINS:
-        result["is_free"] = True
-        result["valid_domain"] = True
-        return result
-    try:
-        socket.setdefaulttimeout(4)
-        socket.getaddrinfo(domain, 80)
-        result["valid_domain"] = True
-    except (socket.gaierror, socket.timeout, OSError):
-        result["valid_domain"] = False
-    return result
-
-
-def verify_company_online(company_name):
-    result = {"found": False, "domain_tried": "", "website_live": False, "details": ""}
-    if not company_name or not company_name.strip():
-        result["details"] = "No company name provided"
-        return result
-    clean = re.sub(r'[^a-zA-Z0-9\s]', '', company_name.strip().lower())
-    slug = clean.replace(" ", "")
-    domains_to_try = [
-        f"{slug}.com", f"{slug}.in", f"{slug}.co.in",
-        f"{slug}.org", f"{slug}.io", f"www.{slug}.com",
-    ]
-    for domain in domains_to_try:
-        result["domain_tried"] = domain
-        try:
-            socket.setdefaulttimeout(4)
-            socket.getaddrinfo(domain, 80)
-            for scheme in ["https", "http"]:
-                try:
-                    req = Request(f"{scheme}://{domain}", method="HEAD",
-                                 headers={"User-Agent": "Mozilla/5.0 TrustHireAI/1.0"})
-                    ctx = ssl.create_default_context()
-                    ctx.check_hostname = False
-                    ctx.verify_mode = ssl.CERT_NONE
-                    resp = urlopen(req, timeout=6, context=ctx)
-                    if resp.status < 400:
-                        result["found"] = True
-                        result["website_live"] = True
-                        result["details"] = f"Company website found at {scheme}://{domain}"
-                        return result
-                except Exception:
-                    continue
-            result["found"] = True
-            result["details"] = f"Domain {domain} exists in DNS but website is not reachable"
-            return result
-        except (socket.gaierror, socket.timeout, OSError):
-            continue
-    result["details"] = f"No website found for '{company_name}' (tried: {', '.join(domains_to_try[:3])}...)"
-    return result
-
-
-def check_url_safety(url_str):
-    """Check if a URL is reachable and analyze its domain for safety signals."""
-    result = {"safe": None, "reachable": False, "domain": "", "reasons": []}
-    try:
-        parsed = urlparse(url_str)
-        domain = parsed.netloc or parsed.path.split("/")[0]
-        result["domain"] = domain
-    except Exception:
-        result["reasons"].append("❌ Invalid URL format")
-        result["safe"] = False
-        return result
-
-    if not domain:
-        result["reasons"].append("❌ Could not parse domain from URL")
-        result["safe"] = False
-        return result
-
-    # Check for suspicious TLDs
-    suspicious_tlds = [".xyz", ".top", ".buzz", ".click", ".link", ".work",
-                       ".gq", ".ml", ".tk", ".cf", ".ga"]
-    for tld in suspicious_tlds:
-        if domain.endswith(tld):
-            result["reasons"].append(f"⚠️ Suspicious TLD: {tld} (commonly used in scam sites)")
-
-    # Check for IP-address URLs
-    if re.match(r'^\d+\.\d+\.\d+\.\d+', domain):
-        result["reasons"].append("⚠️ URL uses raw IP address instead of domain name")
-
-    # Check for very long subdomains (phishing pattern)
-    if domain.count(".") > 3:
-        result["reasons"].append("⚠️ Excessive subdomains — common phishing pattern")
-
-    # Check HTTP reachability
-    for scheme in ["https", "http"]:
-        full_url = f"{scheme}://{domain}" if "://" not in url_str else url_str
-        try:
-            req = Request(full_url, method="HEAD",
-                          headers={"User-Agent": "Mozilla/5.0 TrustHireAI/1.0"})
-            ctx = ssl.create_default_context()
-            ctx.check_hostname = False
-            ctx.verify_mode = ssl.CERT_NONE
-            resp = urlopen(req, timeout=6, context=ctx)
-            result["reachable"] = True
-            if resp.status >= 400:
-                result["reasons"].append(f"⚠️ Server returned status {resp.status}")
-            break
-        except Exception:
-            continue
-
-    if not result["reachable"]:
-        result["reasons"].append("❌ URL is NOT reachable — website may be down or fake")
-
-    # No HTTPS check
-    if url_str.startswith("http://") and not url_str.startswith("https://"):
-        result["reasons"].append("⚠️ URL uses HTTP instead of HTTPS (not secure)")
-
-    result["safe"] = len(result["reasons"]) == 0
-    return result
-
-
-def extract_text_from_image(uploaded_file):
-    """Extract text from an uploaded image using OCR."""
-    if not PIL_AVAILABLE:
-        return None, "PIL/Pillow is not installed. Run: pip install Pillow"
-    if not TESSERACT_AVAILABLE:
-        return None, "pytesseract is not installed. Run: pip install pytesseract (and install Tesseract-OCR)"
-    try:
-        image = Image.open(uploaded_file)
-        text = pytesseract.image_to_string(image)
-        return text.strip(), None
-    except Exception as e:
-        return None, f"OCR failed: {str(e)}"
-
-
-# ═════════════════════════════════════════════
-# KEYWORD BANKS
-# ═════════════════════════════════════════════
-PAYMENT_KEYWORDS = [
-    "registration fee", "payment required", "training fee", "deposit",
-    "processing fee", "advance payment", "security deposit", "pay first",
-    "pay to apply", "joining fee", "enrollment fee", "application fee",
-    "fee required", "pay for training", "pay for kit", "pay for material",
-    "pay before joining", "refundable deposit", "non refundable",
-    "send money", "transfer amount",
-]
-URGENCY_KEYWORDS = [
-    "urgent hiring", "limited seats", "work from home and earn", "easy money",
-    "guaranteed income", "instant approval", "no experience needed",
-    "act now", "hurry", "apply immediately", "don't miss", "last chance",
-    "limited time", "only few seats", "once in a lifetime",
-    "immediate joining", "join today", "start today", "start immediately",
-    "hiring now", "walk in", "spot offer", "direct joining",
-]
-PERSONAL_INFO_KEYWORDS = [
-    "bank account", "bank details", "credit card", "debit card", "ssn",
-    "social security", "pan card", "aadhaar", "aadhar", "passport copy",
-    "send your id", "send documents", "share your photo", "selfie with id",
-]
-TOO_GOOD_KEYWORDS = [
-    "earn from home", "earn daily", "earn weekly", "make money fast",
-    "become rich", "earn lakhs", "earn thousands", "high income",
-    "passive income", "income guarantee", "double your money",
-    "no investment", "zero investment", "free laptop", "free phone",
-    "work only 2 hours", "part time income", "extra income",
-    "flexible hours earn", "simple task",
-]
-MLM_KEYWORDS = [
-    "refer and earn", "referral bonus", "chain", "multi level",
-    "network marketing", "downline", "build your team", "recruit people",
-    "pyramid", "mlm",
-]
-VAGUE_ROLE_KEYWORDS = [
-    "data entry", "copy paste", "typing job", "form filling",
-    "ad posting", "sms sending", "email sending", "captcha",
-    "survey filling", "click and earn", "like and earn",
-    "watch and earn", "simple online job",
-]
-CONTACT_KEYWORDS = [
-    "whatsapp", "telegram", "signal", "contact on whatsapp",
-    "dm me", "inbox me", "message me personally",
-]
-FREE_EMAIL_DOMAINS = [
-    "gmail.com", "yahoo.com", "outlook.com", "hotmail.com",
-    "protonmail.com", "aol.com", "ymail.com", "rediffmail.com",
-    "mail.com", "zoho.com", "icloud.com", "live.com",
-]
-
-ALL_SCAM_KEYWORDS = (PAYMENT_KEYWORDS + URGENCY_KEYWORDS + PERSONAL_INFO_KEYWORDS
-                     + TOO_GOOD_KEYWORDS + MLM_KEYWORDS + VAGUE_ROLE_KEYWORDS
-                     + CONTACT_KEYWORDS)
-
-
-def _find_matches(text_lower, keywords):
-    return [kw for kw in keywords if kw in text_lower]
-
-
-# ═════════════════════════════════════════════
-# SCORING ENGINE — 50/50 WEIGHTED
-#   Company verification  = 50 points (50%)
-#   Email + Description   = 50 points (50%)
-# ═════════════════════════════════════════════
-
-def calculate_risk_score(job_text, email, company, web_checks=None):
-    text_reasons = []
-    verification_results = []
-    text_lower = job_text.lower()
-    text_stripped = job_text.strip()
-    words = text_stripped.split()
-    raw = 0
-
-    hits = _find_matches(text_lower, PAYMENT_KEYWORDS)
-    if hits:
-        raw += 30; text_reasons.append(f"💳 Payment/fee demands: {', '.join(hits)}")
-    hits = _find_matches(text_lower, URGENCY_KEYWORDS)
-    if hits:
-        raw += 20; text_reasons.append(f"⚡ Urgency/pressure tactics: {', '.join(hits)}")
-    hits = _find_matches(text_lower, PERSONAL_INFO_KEYWORDS)
-    if hits:
-        raw += 25; text_reasons.append(f"🔓 Requests sensitive data: {', '.join(hits)}")
-    hits = _find_matches(text_lower, TOO_GOOD_KEYWORDS)
-    if hits:
-        raw += 20; text_reasons.append(f"🌈 Unrealistic promises: {', '.join(hits)}")
-    hits = _find_matches(text_lower, MLM_KEYWORDS)
-    if hits:
-        raw += 25; text_reasons.append(f"🔺 MLM/pyramid indicators: {', '.join(hits)}")
-    hits = _find_matches(text_lower, VAGUE_ROLE_KEYWORDS)
-    if hits:
-        raw += 15; text_reasons.append(f"📝 Vague job descriptions: {', '.join(hits)}")
-    hits = _find_matches(text_lower, CONTACT_KEYWORDS)
-    if hits:
-        raw += 10; text_reasons.append(f"📱 Informal communication: {', '.join(hits)}")
-
-    # Salary anomaly
-    sal_m = re.findall(r'(\d+)\s*lpa', text_lower)
-    if sal_m and ("fresher" in text_lower or "no experience" in text_lower):
-        for s in sal_m:
-            if int(s) > 8:
-                raw += 20; text_reasons.append(f"💰 Unrealistic salary ({s} LPA) for freshers"); break
-    for m in re.findall(r'\$\s*(\d[\d,]*)', text_lower):
-        v = int(m.replace(",", ""))
-        if v > 5000 and ("week" in text_lower or "daily" in text_lower):
-            raw += 20; text_reasons.append(f"💰 Suspiciously high pay (${m}/week or /day)"); break
-
-    # Free email
-    if email:
-        dom = email.lower().strip().split("@")[-1] if "@" in email else ""
-        if dom and dom in FREE_EMAIL_DOMAINS:
-            raw += 15; text_reasons.append(f"📧 Recruiter uses free email (@{dom})")
-
-    # Text quality checks
-    if words:
-        cr = sum(1 for w in words if w.isupper() and len(w) > 2) / len(words)
-        if cr > 0.25:
-            raw += 10; text_reasons.append(f"🔠 Excessive ALL-CAPS ({int(cr*100)}% of words)")
-    if text_stripped.count("!") >= 4:
-        raw += 8; text_reasons.append(f"❗ Excessive exclamation marks ({text_stripped.count('!')} found)")
-    wc = len(words)
-    if 0 < wc < 30:
-        raw += 10; text_reasons.append(f"📏 Very short description ({wc} words)")
-    qual_kw = ["bachelor", "master", "degree", "b.tech", "b.e", "mba",
-               "qualification", "graduate", "diploma", "certification",
-               "b.sc", "m.sc", "b.com", "experience in", "years of experience",
-               "proficient in", "knowledge of", "skills required"]
-    if not any(q in text_lower for q in qual_kw) and wc > 10:
-        raw += 8; text_reasons.append("🎓 No educational/skill requirements mentioned")
-    no_int = ["no interview", "direct selection", "selected directly",
-              "no aptitude", "no test required", "guaranteed selection"]
-    hits = _find_matches(text_lower, no_int)
-    if hits:
-        raw += 15; text_reasons.append(f"🚫 Bypasses hiring process: {', '.join(hits)}")
-    if len(re.findall(r'[\+]?[\d\-\s]{10,}', text_stripped)) >= 2:
-        raw += 5; text_reasons.append(f"📞 Multiple phone numbers listed")
-    comm = ["commission only", "commission based", "incentive based",
-            "performance based only", "no fixed salary", "target based"]
-    hits = _find_matches(text_lower, comm)
-    if hits:
-        raw += 12; text_reasons.append(f"💸 Commission/incentive-only pay: {', '.join(hits)}")
-    if not company or not company.strip():
-        raw += 10; text_reasons.append("🏢 No company name provided")
-
-    # Scale to 50-point budget
-    text_score = min(50, int((raw / 200) * 50)) if raw > 0 else 0
-
-    # ── Company verification (50 points) ──
-    company_score = 0
-    company_status = "unknown"  # track for UI alert
-
-    if not company or not company.strip():
-        company_score = 50
-        company_status = "missing"
-        verification_results.append("❌ No company name provided — cannot verify online")
-    elif web_checks and "company_check" in web_checks:
-        cc = web_checks["company_check"]
-        if cc["found"] and cc["website_live"]:
-            company_score = 0
-            company_status = "verified"
-            verification_results.append(f"✅ VERIFIED: {cc['details']}")
-        elif cc["found"] and not cc["website_live"]:
-            company_score = 25
-            company_status = "partial"
-            verification_results.append(f"⚠️ {cc['details']}")
-            text_reasons.append("⚠️ Company domain exists but website is not reachable")
-        else:
-            company_score = 50
-            company_status = "not_found"
-            verification_results.append(f"❌ {cc['details']}")
-            text_reasons.append(f"🌐 Company NOT found online — '{company}' has no web presence")
-    else:
-        company_score = 30
-        company_status = "unknown"
-        verification_results.append("⚠️ Company verification was not performed")
-
-    # Email domain verification bonus
-    if web_checks and "email_check" in web_checks and email:
-        ec = web_checks["email_check"]
-        if ec["is_free"]:
-            verification_results.append(f"⚠️ Email uses free provider (@{ec['domain']})")
-        elif ec["valid_domain"]:
-            text_score = max(0, text_score - 5)
-            verification_results.append(f"✅ Email domain @{ec['domain']} is valid (DNS verified)")
-        else:
-            text_score = min(50, text_score + 10)
-            text_reasons.append(f"🌐 Email domain @{ec['domain']} does NOT exist (DNS failed)")
-            verification_results.append(f"❌ Email domain @{ec['domain']} has no DNS records")
-
-    # URL check results
-    if web_checks and "url_check" in web_checks:
-        uc = web_checks["url_check"]
-        for r in uc["reasons"]:
-            verification_results.append(r)
-            if r.startswith("❌"):
-                text_score = min(50, text_score + 5)
-                text_reasons.append(r)
-
-    score = max(0, min(company_score + text_score, 100))
-    risk_level = "LOW" if score <= 30 else ("MEDIUM" if score <= 60 else "HIGH")
-    return score, risk_level, text_reasons, verification_results, company_status
-
-
 # ═════════════════════════════════════════════
 # HELPERS
 # ═════════════════════════════════════════════
 
-def highlight_scam_words(text):
-    result = text
-    for kw in sorted(ALL_SCAM_KEYWORDS, key=len, reverse=True):
-        pattern = re.compile(re.escape(kw), re.IGNORECASE)
-        result = pattern.sub(f'<span class="scam-word">{kw.upper()}</span>', result)
-    return result
+def posting_key(job_text, email, company, job_url):
+    """SHA-256 of the normalized scan inputs — the memo key for analysis and rendering."""
+    parts = [(job_text or "").replace("\r\n", "\n").strip(), (email or "").strip(),
+             (company or "").strip(), (job_url or "").strip()]
+    return hashlib.sha256("\x1f".join(parts).encode("utf-8")).hexdigest()
+
+
+def result_key(res):
+    return res.get("input_key") or posting_key(res["job_text"], res["email"], res["company"],
+                                               res.get("url_checked"))
+
+
+# Underscore arguments are not hashed by Streamlit: ``key`` already covers them.
+@st.cache_data(max_entries=256, ttl=600, show_spinner=False)
+def analyze_posting(key, _job_text, _email, _company, _job_url):
+    """Near-duplicate lookup, web checks and scoring for one posting, memoized
+    on ``key`` for ten minutes. Reposts of a known scam skip the email and URL
+    checks; the company is still verified."""
+    timer = StageTimer()
+    with timer.stage("neardup"):
+        matches = NEAR_DUP_INDEX.query(_job_text, k=10)
+        template = known_scam_match(matches)
+    with timer.stage("web_checks"):
+        web_checks = run_web_checks(_company, _email, _job_url, skip=template is not None)
+    with timer.stage("scoring"):
+        features = extract_features(_job_text)
+        prior = lookup_prior_reports(_job_text, _email, _job_url)
+        score, risk_level, reasons, verifications, company_status = calculate_risk_score(
+            _job_text, _email, _company, web_checks, near_duplicate=template,
+            features=features, prior_reports=prior,
+        )
+        # Near-duplicate templates are judged on the text before this scan's own bonus
+        base_score = score if template is None else calculate_risk_score(
+            _job_text, _email, _company, web_checks, features=features, prior_reports=prior)[0]
+    timer.spans.update(probe_spans(web_checks))
+    near_duplicates = [{k: v for k, v in m.items() if k != "digest"} for m in matches[:3]]
+    return {"score": score, "risk_level": risk_level, "reasons": reasons,
+            "verifications": verifications, "company_status": company_status,
+            "text_risk_level": text_risk_level(base_score, company_status),
+            "near_duplicates": near_duplicates,
+            "timings_ms": timer.spans, "analyzed_at": time.time()}
+
+
+@st.cache_data(max_entries=64, show_spinner=False)
+def highlighted_html(key, _job_text):
+    return highlight_scam_words(_job_text)
+
+
+@st.cache_data(max_entries=64, show_spinner=False)
+def ai_explanation(key, score, reasons, verifications):
+    return generate_ai_explanation(score, reasons, verifications)
+
+
+@st.cache_data(max_entries=64, show_spinner=False)
+def report_txt(key, score, risk_level, reasons, verifications, _job_text, _email, _company):
+    return generate_report_txt(_job_text, _email, _company, score, risk_level, reasons, verifications)
+
+
+@st.cache_data(max_entries=64, show_spinner=False)
+def safe_job_links(key, _job_text):
+    return generate_safe_job_links(_job_text)
 
 
-def generate_ai_explanation(score, reasons, verifications):
-    if score <= 30:
-        o = ("✅ **Low Risk Assessment:** This job posting appears mostly "
-             "legitimate. Our analysis including live web verification found no major red flags.")
-    elif score <= 60:
-        o = ("⚠️ **Moderate Risk Assessment:** This posting raises concerns. "
-             "Some elements are commonly associated with scam listings.")
-    else:
-        o = ("🚨 **High Risk Assessment:** This posting displays **multiple "
-             "strong scam indicators**. Our analysis flagged characteristics "
-             "overwhelmingly associated with known fraud patterns.")
-    secs = []
-    if reasons:
-        secs.append(f"\n\n**🔎 Issues ({len(reasons)}):**\n" + "\n".join(f"  - {r}" for r in reasons))
-    if verifications:
-        secs.append(f"\n\n**🌐 Verification:**\n" + "\n".join(f"  - {v}" for v in verifications))
-    tips = ("\n\n**🛡️ Recommendations:**\n"
-            "  - Verify company via official website & LinkedIn\n"
-            "  - Search government business registries (MCA, SEC)\n"
-            "  - Never pay money upfront for a job\n"
-            "  - Check reviews on Glassdoor / AmbitionBox\n"
-            "  - If too good to be true, it probably is")
-    conf = f"\n\n**🎯 Confidence:** {min(70 + len(reasons)*4 + len(verifications)*8, 98)}%"
-    return o + "".join(secs) + tips + conf
+def render_gauge(score):
+    st.markdown(gauge_html(score), unsafe_allow_html=True)
 
 
-def render_gauge(score):
-    """Render a semicircular arc meter with arrow needle."""
+@st.cache_data(max_entries=101, show_spinner=False)
+def gauge_html(score):
+    """Semicircular arc meter with arrow needle (HTML/SVG)."""
     r = 80
     cx, cy = 120, 115
     semi_circ = math.pi * r
@@ -738,7 +377,7 @@ def render_gauge(score):
 
     risk_label = "Low Risk" if score <= 30 else ("Medium Risk" if score <= 60 else "High Risk")
 
-    st.markdown(f"""
+    return f"""
     <div style="text-align:center; padding:20px 0 10px;">
       <svg width="240" height="160" viewBox="0 0 240 160">
         <defs>
@@ -781,114 +420,7 @@ def render_gauge(score):
               color:{score_color}; font-weight:700; font-size:0.9rem; letter-spacing:0.5px;">
           {risk_label}</span>
       </div>
-    </div>""", unsafe_allow_html=True)
-
-
-def save_scam_report(report):
-    reports = []
-    if os.path.exists(REPORTS_FILE):
-        with open(REPORTS_FILE, "r", encoding="utf-8") as f:
-            try: reports = json.load(f)
-            except json.JSONDecodeError: reports = []
-    reports.append(report)
-    with open(REPORTS_FILE, "w", encoding="utf-8") as f:
-        json.dump(reports, f, indent=2, ensure_ascii=False)
-
-
-def generate_safe_job_links(job_text):
-    """Generate links to trusted job portals based on keywords from the job description."""
-    text_lower = job_text.lower()
-    # Extract relevant keywords for search
-    role_keywords = []
-    # Try to find job title / role keywords
-    common_roles = [
-        "software engineer", "developer", "designer", "manager", "analyst",
-        "data entry", "marketing", "sales", "accountant", "teacher",
-        "nurse", "driver", "content writer", "graphic designer", "web developer",
-        "full stack", "frontend", "backend", "devops", "cloud", "python",
-        "java", "react", "angular", "machine learning", "ai", "data scientist",
-        "project manager", "product manager", "hr", "human resources",
-        "customer support", "business development", "operations",
-        "intern", "fresher", "senior", "junior", "lead", "architect",
-    ]
-    for role in common_roles:
-        if role in text_lower:
-            role_keywords.append(role)
-    
-    # Build a search query from found keywords (max 3)
-    if role_keywords:
-        search_query = " ".join(role_keywords[:3])
-    else:
-        # Fallback: extract first few meaningful words
-        words = [w for w in job_text.split()[:10] if len(w) > 3 and w.isalpha()]
-        search_query = " ".join(words[:3]) if words else "jobs"
-    
-    from urllib.parse import quote_plus
-    query_encoded = quote_plus(search_query)
-    
-    portals = [
-        {
-            "name": "LinkedIn Jobs",
-            "icon": "💼",
-            "url": f"https://www.linkedin.com/jobs/search/?keywords={query_encoded}",
-            "description": "Professional network with verified company profiles",
-            "trust": "⭐⭐⭐⭐⭐",
-        },
-        {
-            "name": "Indeed",
-            "icon": "🔍",
-            "url": f"https://www.indeed.com/jobs?q={query_encoded}",
-            "description": "World's largest job search engine with company reviews",
-            "trust": "⭐⭐⭐⭐⭐",
-        },
-        {
-            "name": "Glassdoor",
-            "icon": "🏢",
-            "url": f"https://www.glassdoor.com/Job/jobs.htm?sc.keyword={query_encoded}",
-            "description": "Jobs with salary data and employee reviews",
-            "trust": "⭐⭐⭐⭐⭐",
-        },
-        {
-            "name": "Naukri.com",
-            "icon": "🇮🇳",
-            "url": f"https://www.naukri.com/{query_encoded.replace('+', '-')}-jobs",
-            "description": "India's #1 job portal with verified employers",
-            "trust": "⭐⭐⭐⭐",
-        },
-        {
-            "name": "Google Jobs",
-            "icon": "🌐",
-            "url": f"https://www.google.com/search?q={query_encoded}+jobs&ibp=htl;jobs",
-            "description": "Aggregated listings from multiple trusted sources",
-            "trust": "⭐⭐⭐⭐⭐",
-        },
-        {
-            "name": "Monster",
-            "icon": "👾",
-            "url": f"https://www.monster.com/jobs/search?q={query_encoded}",
-            "description": "Established job board with career resources",
-            "trust": "⭐⭐⭐⭐",
-        },
-    ]
-    return portals, search_query
-
-
-def generate_report_txt(job_text, email, company, score, risk_level, reasons, verifications):
-    ts = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    lines = [
-        "=" * 56, "    🛡️ TrustHire AI – Scam Risk Report", "=" * 56,
-        f"  Generated : {ts}", f"  Risk Score: {score}/100 ({risk_level})",
-        "-" * 56, "", "📋 JOB DESCRIPTION:", "-" * 40,
-        job_text or "(none)", "", f"📧 EMAIL : {email or '(none)'}",
-        f"🏢 COMPANY: {company or '(none)'}", "", "-" * 56,
-        "🔎 RED FLAGS:", "-" * 40,
-    ]
-    for r in (reasons or ["✅ (none)"]): lines.append(f"  • {r}")
-    if verifications:
-        lines += ["", "🌐 VERIFICATION:", "-" * 40]
-        for v in verifications: lines.append(f"  • {v}")
-    lines += ["", "=" * 56, "  Report by TrustHire AI v1.0"]
-    return "\n".join(lines)
+    </div>"""
 
 
 # ═════════════════════════════════════════════
@@ -945,9 +477,15 @@ with st.sidebar:
     </div>
     """, unsafe_allow_html=True)
     st.markdown('<hr class="divider">', unsafe_allow_html=True)
+    # "?diagnostics=1" in the URL adds the (otherwise hidden) diagnostics page
+    nav_pages = ["🧠 Analyze Job", "🕘 Scan History", "🚨 Report Scam", "ℹ️ About"]
+    if st.query_params.get("diagnostics"):
+        nav_pages.append("🩺 Diagnostics")
+    if st.session_state.page_nav not in nav_pages:
+        st.session_state.page_nav = nav_pages[0]
     st.radio(
         "Navigate",
-        ["🧠 Analyze Job", "🚨 Report Scam", "ℹ️ About"],
+        nav_pages,
         key="page_nav",
         label_visibility="collapsed",
     )
@@ -978,9 +516,9 @@ if page == "🧠 Analyze Job":
     job_text = st.text_area("Paste Job Description", height=200,
         placeholder="Paste the full job description here…")
     job_url = st.text_input("🔗 Job Posting URL", placeholder="https://example.com/careers/job-12345")
-    screenshot = st.file_uploader("📸 Upload Job Screenshot (OCR scan)",
-                                  type=["png", "jpg", "jpeg", "webp"],
-                                  help="Upload a screenshot — AI extracts text via OCR")
+    screenshots = st.file_uploader("📸 Upload Job Screenshots (OCR scan)",
+                                   type=["png", "jpg", "jpeg", "webp"], accept_multiple_files=True,
+                                   help="Upload one or more screenshots — AI extracts text via OCR")
     email = st.text_input("📧 Recruiter Email", placeholder="recruiter@company.com")
     company = st.text_input("🏢 Company Name", placeholder="Enter company name")
     # ── Custom styled "Check Scam Risk" button ──
@@ -1006,17 +544,24 @@ if page == "🧠 Analyze Job":
     st.markdown('</div>', unsafe_allow_html=True)
 
     if analyze_clicked:
+        timer = StageTimer()
+        scan_start = time.perf_counter()
+
         # ── Handle screenshot OCR ──
         ocr_text = ""
-        ocr_msg = ""
-        if screenshot is not None:
-            with st.spinner("📸 Extracting text from screenshot (OCR)..."):
-                extracted, err = extract_text_from_image(screenshot)
-                if extracted:
-                    ocr_text = extracted
-                    ocr_msg = f"✅ Extracted {len(extracted.split())} words from screenshot"
-                elif err:
-                    ocr_msg = f"⚠️ {err}"
+        ocr_msgs = []
+        if screenshots:
+            with st.spinner(f"📸 Extracting text from {len(screenshots)} screenshot(s) (OCR)..."), \
+                    timer.stage("ocr"):
+                ocr_parts = []
+                for shot, (extracted, err) in zip(screenshots, extract_texts_from_images(screenshots)):
+                    label = shot.name if len(screenshots) > 1 else "screenshot"
+                    if extracted:
+                        ocr_parts.append(extracted)
+                        ocr_msgs.append(f"✅ Extracted {len(extracted.split())} words from {label}")
+                    elif err:
+                        ocr_msgs.append(f"⚠️ {label}: {err}" if len(screenshots) > 1 else f"⚠️ {err}")
+                ocr_text = "\n\n".join(ocr_parts)
 
         # Combine job text + OCR text
         combined_text = job_text.strip()
@@ -1026,36 +571,44 @@ if page == "🧠 Analyze Job":
         if not combined_text:
             st.warning("⚠️ Please provide a job description — paste text, enter a URL, or upload a screenshot.")
         else:
+            key = posting_key(combined_text, email, company, job_url)
+            analysis_start = time.time()
             with st.spinner("🔍 Analyzing text + verifying company & email online..."):
-                web_checks = {}
-
-                if company and company.strip():
-                    web_checks["company_check"] = verify_company_online(company)
-                if email and "@" in email:
-                    web_checks["email_check"] = verify_email_domain(email)
-                if job_url and job_url.strip():
-                    web_checks["url_check"] = check_url_safety(job_url.strip())
-
-                score, risk_level, reasons, verifications, company_status = calculate_risk_score(
-                    combined_text, email, company, web_checks
-                )
-
-            # Store OCR info
-            if ocr_msg:
-                verifications.insert(0, ocr_msg)
+                with timer.stage("analysis"):
+                    analysis = analyze_posting(key, combined_text, email, company, job_url)
+            if analysis["analyzed_at"] >= analysis_start:
+                timer.spans.pop("analysis")
+                timer.spans.update(analysis["timings_ms"])
+            else:
+                timer.spans["analysis_cached"] = timer.spans.pop("analysis")   # identical posting
 
             result = {
                 "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-                "score": score, "risk_level": risk_level,
-                "reasons": reasons, "verifications": verifications,
+                "score": analysis["score"], "risk_level": analysis["risk_level"],
+                "reasons": analysis["reasons"], "verifications": ocr_msgs + analysis["verifications"],
                 "job_text": combined_text, "email": email, "company": company,
-                "company_status": company_status,
+                "company_status": analysis["company_status"],
+                "text_risk_level": analysis["text_risk_level"],
+                "near_duplicates": analysis["near_duplicates"],
                 "url_checked": job_url if job_url else None,
+                "input_key": key,
+                "timings_ms": timer.spans,
             }
             st.session_state.last_result = result
-            save_last_result(result)
-            st.session_state.scan_history.append(result)
-            save_scan_history(st.session_state.scan_history)
+            st.session_state.report_job_text = None
+            with timer.stage("history"):
+                save_last_result(result)
+                SCAN_HISTORY.append(result)
+            with timer.stage("neardup_index"):
+                NEAR_DUP_INDEX.add_scan(result)
+            # The on-disk copies were written before these two spans existed;
+            # the in-session record (same dict) gets them.
+            timer.add("total", time.perf_counter() - scan_start)
+            STAGE_METRICS.observe_spans(timer.spans)
+            try:
+                STAGE_METRICS.write_prometheus()
+            except OSError:
+                pass
             st.session_state.show_ai = False
             st.session_state.show_opportunities = False
             st.rerun()
@@ -1110,6 +663,19 @@ if page == "🧠 Analyze Job":
                 else:
                     st.markdown(f'<div class="flag-info">{v}</div>', unsafe_allow_html=True)
 
+        # ── Similar postings seen before ──
+        similar = [m for m in res.get("near_duplicates", []) if not m.get("exact")]
+        if similar:
+            st.markdown('<hr class="divider">', unsafe_allow_html=True)
+            st.markdown("##### ♻️ Similar Postings Seen Before")
+            for m in similar:
+                seen = "Reported as a scam" if m["kind"] == "report" else f"Scanned — {m['risk_level']} ({m['score']}/100)"
+                when = f" · {m['timestamp']}" if m.get("timestamp") else ""
+                css = "flag-item" if m["kind"] == "report" or m["risk_level"] == "HIGH" else "flag-info"
+                st.markdown(f'<div class="{css}">{m["similarity"]:.0%} similar · {seen}{when}<br>'
+                            f'<span style="opacity:0.7">{html.escape(m["preview"], quote=False)}…</span></div>',
+                            unsafe_allow_html=True)
+
         # ── Detected Threat Signals ──
         st.markdown('<hr class="divider">', unsafe_allow_html=True)
         if res["reasons"]:
@@ -1124,7 +690,7 @@ if page == "🧠 Analyze Job":
         if res["reasons"]:
             st.markdown('<hr class="divider">', unsafe_allow_html=True)
             st.markdown("##### 📝 Highlighted Keywords")
-            hl = highlight_scam_words(res["job_text"])
+            hl = highlighted_html(result_key(res), res["job_text"])
             st.markdown(f'<div class="ai-box" style="white-space:pre-wrap;font-size:0.85rem;">{hl}</div>',
                         unsafe_allow_html=True)
 
@@ -1135,19 +701,20 @@ if page == "🧠 Analyze Job":
             st.rerun()
         if st.session_state.show_ai:
             st.markdown("##### 🧠 AI Explanation")
-            st.markdown(generate_ai_explanation(res["score"], res["reasons"], res.get("verifications", [])))
+            st.markdown(ai_explanation(result_key(res), res["score"], res["reasons"],
+                                       res.get("verifications", [])))
 
         st.markdown('<hr class="divider">', unsafe_allow_html=True)
 
-        rpt = generate_report_txt(res["job_text"], res["email"], res["company"],
-                                  res["score"], res["risk_level"], res["reasons"],
-                                  res.get("verifications", []))
+        rpt = report_txt(result_key(res), res["score"], res["risk_level"], res["reasons"],
+                         res.get("verifications", []), res["job_text"], res["email"], res["company"])
         st.download_button("📥 Download Report (TXT)", data=rpt,
             file_name=f"trusthire_{datetime.now().strftime('%Y%m%d_%H%M%S')}.txt",
             mime="text/plain", use_container_width=True)
 
         if st.button("🚨 Report This Scam", use_container_width=True, key="report_scam_nav_btn"):
             st.session_state._page_override = "🚨 Report Scam"
+            st.session_state.report_job_text = res["job_text"]   # indexed for near-duplicates
             st.rerun()
 
         # ── Better Opportunities button (styled like reference image) ──
@@ -1179,7 +746,7 @@ if page == "🧠 Analyze Job":
                 st.markdown('<p style="color:#94a3b8; font-size:0.88rem; margin-bottom:16px;">'
                             'This posting looks risky. Here are <strong style="color:#6ee7b7;">trusted job portals</strong> '
                             'with verified listings matching your search:</p>', unsafe_allow_html=True)
-                portals, search_query = generate_safe_job_links(res["job_text"])
+                portals, search_query = safe_job_links(result_key(res), res["job_text"])
                 st.markdown(f'<div class="flag-info">🔍 Search keywords: <strong>{search_query}</strong></div>',
                             unsafe_allow_html=True)
                 for portal in portals:
@@ -1201,6 +768,60 @@ if page == "🧠 Analyze Job":
 
 
 
+# ═════════════════════════════════════════════
+# PAGE — SCAN HISTORY
+# ═════════════════════════════════════════════
+elif page == "🕘 Scan History":
+    st.markdown("""
+    <div class="hero-header">
+        <h1>🕘 Scan History</h1>
+        <p>Every posting scanned on this server, newest first</p>
+    </div>
+    """, unsafe_allow_html=True)
+    # The history is shared by all sessions; a session only keeps its
+    # filters and the cursors of the pages it has paged through.
+    hc1, hc2, hc3 = st.columns([2, 2, 3])
+    with hc1:
+        h_levels = st.multiselect("Risk level", ["HIGH", "MEDIUM", "LOW"])
+    with hc2:
+        h_dates = st.date_input("Date range", value=(), format="YYYY-MM-DD")
+    with hc3:
+        h_company = st.text_input("Company", placeholder="Acme Corp")
+    h_since = str(h_dates[0]) if len(h_dates) > 0 else None
+    h_until = str(h_dates[-1] + timedelta(days=1)) if len(h_dates) > 0 else None   # through that day
+    h_filters = dict(risk_levels=h_levels, since=h_since, until=h_until, company=h_company)
+    h_key = repr(h_filters)
+    if st.session_state.get("history_filters") != h_key:
+        st.session_state.history_filters = h_key
+        st.session_state.history_cursors = [None]
+
+    cursors = st.session_state.history_cursors
+    entries, next_cursor = SCAN_HISTORY.query(**h_filters, page_size=20, cursor=cursors[-1])
+    st.caption(f"{SCAN_HISTORY.count(**h_filters):,} matching scans · page {len(cursors)}")
+    if not entries:
+        st.info("No scans match these filters.")
+    for e in entries:
+        color = {"HIGH": "#ef4444", "MEDIUM": "#f59e0b"}.get(e["risk_level"], "#22c55e")
+        score = f"{e['score']:g}" if e["score"] is not None else "–"
+        st.markdown(
+            f'<div class="history-row"><span style="flex:1; overflow:hidden; text-overflow:ellipsis;'
+            f' white-space:nowrap; margin-right:16px;"><b>{html.escape(e["company"] or "Unknown")}</b>'
+            f' · <span style="color:#94a3b8;">{html.escape(e["preview"])}</span></span>'
+            f'<span style="color:#94a3b8; margin-right:16px;">{html.escape(e["timestamp"])}</span>'
+            f'<span style="color:{color}; font-weight:700;">{html.escape(e["risk_level"])} · {score}</span>'
+            f'</div>', unsafe_allow_html=True)
+
+    pc1, _, pc2 = st.columns([1, 4, 1])
+    with pc1:
+        if st.button("← Newer", disabled=len(cursors) == 1, use_container_width=True):
+            cursors.pop()
+            st.rerun()
+    with pc2:
+        if st.button("Older →", disabled=next_cursor is None, use_container_width=True):
+            cursors.append(next_cursor)
+            st.rerun()
+
+
 # ═════════════════════════════════════════════
 # PAGE — REPORT SCAM
 # ═════════════════════════════════════════════
@@ -1212,8 +833,11 @@ elif page == "🚨 Report Scam":
     </div>
     """, unsafe_allow_html=True)
     st.markdown('<div class="glass-card">', unsafe_allow_html=True)
+    reported_text = st.session_state.get("report_job_text")
     with st.form("report_form", clear_on_submit=True):
         st.markdown("#### 📝 Scam Report Form")
+        if reported_text:
+            st.caption("📎 The posting you just scanned is attached to this report.")
         report_link = st.text_input("🔗 Job Posting Link", placeholder="https://...")
         rc1, rc2 = st.columns(2)
         with rc1:
@@ -1233,7 +857,12 @@ elif page == "🚨 Report Scam":
                     "phone": report_phone, "details": report_details,
                     "has_screenshot": report_screenshot is not None,
                 }
+                if reported_text:
+                    report["job_text"] = reported_text
+                    st.session_state.report_job_text = None
                 save_scam_report(report)
+                NEAR_DUP_INDEX.add_report(report)
+                analyze_posting.clear()   # new report can change scores; don't serve stale ones
                 st.success("✅ **Report submitted!** Thank you for keeping the community safe. 🛡️")
                 st.balloons()
     st.markdown('</div>', unsafe_allow_html=True)
@@ -1287,4 +916,27 @@ exist on the internet, and we can extract text from screenshots for analysis.
             st.markdown(f'<div class="glass-card stat-card"><div class="number">{n}</div>'
                         f'<div class="label">{l}</div></div>', unsafe_allow_html=True)
     st.markdown('<p style="text-align:center; color:#4a4a6a; font-size:0.8rem; margin-top:30px;">'
-                'Built with ❤️ using Python & Streamlit · 🛡️ TrustHire AI v1.0</p>'
\ No newline at end of file
+                'Built with ❤️ using Python & Streamlit · 🛡️ TrustHire AI v1.0</p>', unsafe_allow_html=True)
+
+
+# ═════════════════════════════════════════════
+# PAGE — DIAGNOSTICS (hidden, ?diagnostics=1)
+# ═════════════════════════════════════════════
+elif page == "🩺 Diagnostics":
+    st.markdown("#### 🩺 Scan Stage Timings (this process)")
+    summary = STAGE_METRICS.summary()
+    if summary:
+        st.table([{"stage": stage, **row} for stage, row in summary.items()])
+    else:
+        st.info("No scans yet in this process.")
+
+    last = st.session_state.last_result
+    if last and last.get("timings_ms"):
+        st.markdown("#### ⏱️ Last Scan")
+        st.json(last["timings_ms"])
+
+    st.markdown("#### 🗄️ Caches")
+    st.json({"verify": VERIFY_CACHE.stats(), "ocr": OCR_CACHE.stats(), "texts": TEXT_STORE.stats()})
+
+    st.markdown("#### 📈 Prometheus Export")
+    st.code(STAGE_METRICS.prometheus_text(), language="text")
@@ -0,0 +1,64 @@
+"""
+The batch CLI and the checkpointed pipeline must write the same rows.
+
+Both read the same input formats; a line that is not a JSON object is an
+error row carrying its 1-based line number on either path.
+"""
+
+import json
+
+import pytest
+
+from trusthire import cli, pipeline
+
+
+@pytest.fixture
+def postings_file(tmp_path):
+    lines = []
+    for i in range(30):
+        lines.append(json.dumps({"id": i, "job_text": f"urgent hiring pay registration fee {i}",
+                                 "email": "hr@gmail.com" if i % 2 else "", "company": "Acme" * (i % 3)}))
+    lines[4] = '{"id": 4, "job_text": '      # truncated line
+    lines[11] = "[1, 2, 3]"                  # valid JSON, not an object
+    lines.insert(20, "")                     # blank lines are skipped, but still counted
+    lines[25] = "not json"
+    path = tmp_path / "postings.jsonl"
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    return path
+
+
+def _rows(path):
+    return [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+
+
+def test_cli_and_pipeline_write_the_same_rows(postings_file, tmp_path):
+    plain, checkpointed = tmp_path / "plain.jsonl", tmp_path / "checkpointed.jsonl"
+    assert cli.main([str(postings_file), "-o", str(plain), "--workers", "1"]) == 0
+    assert cli.main([str(postings_file), "-o", str(checkpointed), "--batch-size", "7",
+                     "--checkpoint", str(tmp_path / "run.ckpt"), "--checkpoint-every", "7"]) == 0
+    assert _rows(plain) == _rows(checkpointed)
+    errors = [r for r in _rows(plain) if "error" in r]
+    assert [(r["row"], r["line"]) for r in errors] == [(5, 5), (12, 12), (25, 26)]
+
+
+def test_resumed_pipeline_keeps_line_numbers(postings_file, tmp_path, monkeypatch):
+    out, ckpt = tmp_path / "out.jsonl", tmp_path / "run.ckpt"
+    real_write = pipeline._write
+
+    def crash_after_two_batches(batches, writer):
+        for n, batch in enumerate(real_write(batches, writer)):
+            yield batch
+            if n == 1:
+                raise KeyboardInterrupt
+
+    monkeypatch.setattr(pipeline, "_write", crash_after_two_batches)
+    with pytest.raises(KeyboardInterrupt):
+        pipeline.run_pipeline(str(postings_file), str(out), checkpoint=str(ckpt),
+                              checkpoint_every=5, batch_size=5, progress_every=0)
+    assert pipeline.load_checkpoint(str(ckpt))["rows"] == 10
+    monkeypatch.setattr(pipeline, "_write", real_write)
+    pipeline.run_pipeline(str(postings_file), str(out), checkpoint=str(ckpt),
+                          batch_size=5, progress_every=0)
+    rows = _rows(out)
+    assert [r["row"] for r in rows] == list(range(1, 31))
+    assert [(r["row"], r["line"]) for r in rows if "error" in r] == [(5, 5), (12, 12), (25, 26)]
@@ -0,0 +1,96 @@
+"""
+Parity of the NumPy batch scorer with the single-posting scorer.
+
+``vectorized.score_batch`` must return exactly what ``calculate_risk_score``
+gives for each posting, reasons included, with prior reports on and off.
+"""
+
+import random
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from trusthire import reports, vectorized
+from trusthire.bench import _FILLER
+from trusthire.keywords import KEYWORD_BANKS
+from trusthire.scoring import calculate_risk_score
+
+_EMAILS = ["", "hr@acme-corp.com", "jobs.now@gmail.com", "  Recruit@YAHOO.com ", "no-at-sign",
+           "bad@scam.example", "hr@reported.example", "x@"]
+_COMPANIES = ["", "   ", "Acme Corp", "Globex"]
+_URLS = [None, "", "https://acme-corp.com/careers/1", "http://scam.example/apply", "www.globex.io/jobs"]
+_EXTRAS = [
+    "Call 98765 43210 or +91-98765-43211 today",
+    "freshers welcome, salary 12 LPA", "fresher package 6 LPA",
+    "earn $7,500 per week", "make $900 daily", "$20,000 a month",
+    "Apply at http://scam.example/form or www.reported-link.example/now",
+    "URGENT HIRING APPLY NOW TODAY", "!!!! act fast !!!", "Ünïcödé — ９８７６５４３２１０ ﹗",
+    "pay-fee registration.fee (payment) PAYMENT",
+]
+
+
+def _postings(seed, n):
+    rng = random.Random(seed)
+    keywords = [kw for bank in KEYWORD_BANKS.values() for kw in bank]
+    out = []
+    for i in range(n):
+        words = []
+        for _ in range(rng.choice([0, 3, 12, 40, 150])):
+            words.append(rng.choice(keywords) if rng.random() < 0.15 else rng.choice(_FILLER))
+        words += rng.sample(_EXTRAS, rng.randrange(3))
+        if rng.random() < 0.3:
+            words = [w.upper() if rng.random() < 0.5 else w for w in words]
+        out.append({"job_text": " ".join(words), "email": rng.choice(_EMAILS),
+                    "company": rng.choice(_COMPANIES), "job_url": rng.choice(_URLS)})
+    # every keyword at least once, alone and inside other words
+    for category, bank in KEYWORD_BANKS.items():
+        for kw in bank:
+            out.append({"job_text": f"{kw} role in our team", "email": "", "company": "Acme",
+                        "job_url": None})
+            out.append({"job_text": f"x{kw}y", "email": "", "company": "", "job_url": None})
+    return out
+
+
+@pytest.fixture
+def report_store(tmp_path, monkeypatch):
+    store = reports.ReportStore(str(tmp_path / "reports.sqlite3"), legacy_json=None,
+                                bloom_path=str(tmp_path / "reports.bloom"))
+    monkeypatch.setattr(reports, "REPORT_STORE", store)
+    monkeypatch.setattr(vectorized, "REPORT_STORE", store)
+    return store
+
+
+def _expected(posting, with_reports):
+    text, email, company = posting["job_text"], posting["email"], posting["company"]
+    job_url = posting["job_url"] or None
+    prior = reports.lookup_prior_reports(text, email, job_url) if with_reports else None
+    score, level, reasons, verifications, status = calculate_risk_score(
+        text, email, company, prior_reports=prior)
+    return {"score": score, "risk_level": level, "company_status": status,
+            "reasons": reasons, "verifications": verifications}
+
+
+@pytest.mark.parametrize("with_reports", [False, True])
+def test_score_batch_matches_calculate_risk_score(report_store, with_reports):
+    if with_reports:
+        for report in [
+            {"email": "bad@scam.example", "job_link": "http://scam.example/apply"},
+            {"email": "someone@reported.example", "phone": "+91 98765 43210"},
+            {"job_link": "www.reported-link.example/now"},
+        ]:
+            report_store.add({"timestamp": "2026-01-01 00:00:00", **report})
+    postings = _postings(seed=19, n=1500)
+    batch = vectorized.score_batch(postings, reports=with_reports)
+    assert len(batch) == len(postings)
+    for i, (posting, got) in enumerate(zip(postings, batch)):
+        assert got == _expected(posting, with_reports), f"posting {i}: {posting!r}"
+
+
+def test_reports_are_counted_only_when_asked(report_store):
+    report_store.add({"timestamp": "2026-01-01 00:00:00", "email": "bad@scam.example"})
+    posting = {"job_text": "send your resume", "email": "bad@scam.example", "company": "Acme",
+               "job_url": None}
+    without, with_reports = (vectorized.score_batch([posting], reports=r)[0] for r in (False, True))
+    assert with_reports["score"] == without["score"] + 20
+    assert not vectorized.check_parity([posting], reports=True)
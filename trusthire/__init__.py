@@ -0,0 +1,68 @@
+"""
+TrustHire AI scoring engine
+===========================
+Everything the Streamlit app uses to score a job posting, importable on
+its own for workers, scripts and the batch CLI (``python -m trusthire``)
+and the local HTTP API (``python -m trusthire.server``).
+
+Importing the package has no side effects and loads nothing up front:
+each name below pulls in its submodule on first access, so a worker that
+only scores text never imports the network, SQLite or OCR stacks.
+
+    keywords  keyword banks + single-pass automaton
+    features  one-pass text features shared by scoring and rendering
+    scoring   calculate_risk_score, score_posting (dict in / dict out)
+    verify    company / email / URL checks, probe client, result cache
+    dnsclient asyncio A/AAAA/MX stub resolver over shared UDP sockets
+    reputation  memory-mapped allow/deny domain lists, checked before probing
+    reports   user scam reports (SQLite, Bloom-filter gated) + scoring-time lookup
+    bloom     on-disk Bloom filter updated in place
+    history   scan history (JSONL, shared indexed view) + last result
+    blobstore content-addressed, compressed posting texts for history
+    render    highlighting, explanation, safe links, TXT report
+    ocr       screenshot preprocessing + OCR with a content-hash cache (lazy)
+    metrics   per-stage scan timings, histograms, Prometheus export
+    neardup   MinHash/LSH index of past scans and reports (reposted scams)
+    pipeline  streaming ingestion with per-stage throughput and checkpoints
+    vectorized  NumPy batch scoring for offline rescoring (needs NumPy)
+"""
+
+import importlib
+
+_EXPORTS = {
+    "keywords": ["ALL_SCAM_KEYWORDS", "FREE_EMAIL_DOMAINS", "KEYWORD_BANKS", "find_keyword_hits"],
+    "features": ["PostingFeatures", "extract_features"],
+    "scoring": ["calculate_risk_score", "score_posting"],
+    "verify": ["PROBE_CLIENT", "VERIFY_CACHE", "check_url_safety", "run_web_checks",
+               "verify_company_online", "verify_email_domain", "verify_email_domains"],
+    "dnsclient": ["DNS_CLIENT", "DNSClient", "DNSError"],
+    "reputation": ["DOMAIN_REPUTATION", "DomainReputation", "build_reputation_db"],
+    "reports": ["REPORT_STORE", "ReportStore", "lookup_prior_reports", "save_scam_report"],
+    "bloom": ["BloomFilter"],
+    "history": ["SCAN_HISTORY", "ScanHistory", "append_scan_history", "iter_scan_history",
+                "load_scan_history", "load_last_result", "prune_text_store", "save_last_result"],
+    "blobstore": ["TEXT_STORE", "BlobStore"],
+    "render": ["generate_ai_explanation", "generate_report_txt", "generate_safe_job_links",
+               "highlight_scam_words"],
+    "metrics": ["STAGE_METRICS", "StageMetrics", "StageTimer"],
+    "neardup": ["NEAR_DUP_INDEX", "NearDuplicateIndex", "known_scam_match"],
+    "pipeline": ["read_records", "run_pipeline"],
+    "vectorized": ["BatchFeatures", "check_parity", "score_batch"],
+    "ocr": ["OCR_CACHE", "OCR_POOL", "OCRPool", "extract_text_from_image", "extract_texts_from_images"],
+}
+_MODULE_OF = {name: module for module, names in _EXPORTS.items() for name in names}
+
+__all__ = sorted(_MODULE_OF)
+
+
+def __getattr__(name):
+    module = _MODULE_OF.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{module}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
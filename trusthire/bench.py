@@ -0,0 +1,418 @@
+"""
+Offline performance benchmarks for the scan hot path.
+
+    python -m trusthire.bench
+    python -m trusthire.bench --quick -o bench.json
+    python -m trusthire.bench --compare baseline.json --max-slowdown 1.25
+
+A seeded synthetic corpus (short / medium / long postings, clean to
+scam-heavy) is run through scoring, highlighting, the TXT report, scan
+history and the report store. The web verifiers run against local
+stand-ins, so no internet access is needed:
+
+    FakeResolver    getaddrinfo replacement with latency and NXDOMAIN rate,
+                    pointing every host at the fake HTTP server
+    FakeDNSServer   UDP nameserver for the DNS client (email MX checks),
+                    same latency and NXDOMAIN rate
+    FakeHTTPServer  HEAD server on 127.0.0.1 with latency and 5xx rate
+
+HTTPS is not emulated: port 443 resolves to a closed local port, so every
+``https://`` probe is refused at once and the verifiers fall back to http,
+as they do for sites without TLS.
+
+All files are written to a temporary working directory. Results go to
+stdout (or ``-o``) as JSON; with ``--compare`` the exit status is 1 when a
+benchmark's median is more than ``--max-slowdown`` times the baseline's.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import socket
+import statistics
+import struct
+import sys
+import tempfile
+import threading
+import time
+import zlib
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+CORPUS_SEED = 1337
+LENGTHS = {"short": 25, "medium": 150, "long": 900}          # words per posting
+SCAM_DENSITY = {"clean": 0.0, "mixed": 0.08, "heavy": 0.25}  # share of keyword phrases
+
+_FILLER = (
+    "we are looking for a motivated engineer to join our platform team "
+    "you will design build and maintain services used by customers across the region "
+    "the role involves code review mentoring planning and close work with product "
+    "experience with python sql and cloud infrastructure is preferred "
+    "our office is located in the city centre with flexible hours and a hybrid policy "
+    "benefits include health insurance paid leave learning budget and a pension plan"
+).split()
+_EMAILS = ["hr@acme-corp.com", "jobs.hiring.now@gmail.com", "careers@globex.io",
+           "recruit@example.org", "", "talent@initech.co.in"]
+_COMPANIES = ["Acme Corp", "Globex", "Initech Solutions", "", "Umbrella Holdings"]
+_URLS = ["https://acme-corp.com/careers/123", "http://bit.ly/jobnow", "", "www.globex.io/jobs"]
+
+
+# ─────────────────────────────────────────────
+# SYNTHETIC CORPUS
+# ─────────────────────────────────────────────
+
+def synthetic_posting(rng, words, density):
+    """One posting dict of about ``words`` words, ``density`` of them scam phrases."""
+    from .keywords import ALL_SCAM_KEYWORDS
+
+    out = []
+    while len(out) < words:
+        if density and rng.random() < density:
+            out.extend(rng.choice(ALL_SCAM_KEYWORDS).split())
+        else:
+            out.append(rng.choice(_FILLER))
+    text = " ".join(out[:words])
+    if density and rng.random() < 0.5:
+        text += f" Call +91 98{rng.randrange(10**8):08d} now."
+    return {"job_text": text, "email": rng.choice(_EMAILS),
+            "company": rng.choice(_COMPANIES), "job_url": rng.choice(_URLS)}
+
+
+def build_corpus(per_cell=40, seed=CORPUS_SEED):
+    """``{"medium/mixed": [posting, ...], ...}`` — same postings for the same seed."""
+    rng = random.Random(seed)
+    return {f"{length}/{kind}": [synthetic_posting(rng, words, density) for _ in range(per_cell)]
+            for length, words in LENGTHS.items() for kind, density in SCAM_DENSITY.items()}
+
+
+# ─────────────────────────────────────────────
+# LOCAL NETWORK STAND-INS
+# ─────────────────────────────────────────────
+
+def _chance(seed, key, rate):
+    """Deterministic per-key coin flip, so failures repeat run to run."""
+    return rate > 0 and (zlib.crc32(f"{seed}:{key}".encode()) % 10_000) < rate * 10_000
+
+
+class FakeResolver:
+    """``getaddrinfo`` stand-in: every name resolves to the fake HTTP server."""
+
+    def __init__(self, http_port, latency=0.002, failure_rate=0.0, seed=CORPUS_SEED):
+        self.http_port = http_port
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self.seed = seed
+        self.closed_port = _closed_port()
+        self.calls = 0
+
+    def __call__(self, host, port, *args, **kwargs):
+        self.calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+        if _chance(self.seed, host, self.failure_rate):
+            raise socket.gaierror(socket.EAI_NONAME, "Name or service not known")
+        target = self.closed_port if port == 443 else self.http_port
+        return [(socket.AF_INET, socket.SOCK_STREAM, socket.IPPROTO_TCP, "", ("127.0.0.1", target))]
+
+
+def _closed_port():
+    """A local port with nothing listening (connections are refused)."""
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+class _FakeHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_HEAD(self):
+        server = self.server
+        if server.latency:
+            time.sleep(server.latency)
+        host = self.headers.get("Host", "")
+        status = 503 if _chance(server.seed, host + self.path, server.failure_rate) else 200
+        self.send_response(status)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+
+class _FakeDNSProtocol(asyncio.DatagramProtocol):
+    def __init__(self, server):
+        self.server = server
+        self.transport = None
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def datagram_received(self, data, addr):
+        from .dnsclient import _encode_name, _read_name
+        server = self.server
+        server.queries += 1
+        qid = struct.unpack_from("!H", data)[0]
+        name, end = _read_name(data, 12)
+        qtype = struct.unpack_from("!H", data, end)[0]
+        nx = _chance(server.seed, name, server.failure_rate)
+        answers = []
+        if not nx and qtype == 1:
+            answers.append((1, socket.inet_aton("127.0.0.1")))
+        elif not nx and qtype == 28:
+            answers.append((28, socket.inet_pton(socket.AF_INET6, "::1")))
+        elif not nx and qtype == 15:
+            answers.append((15, struct.pack("!H", 10) + _encode_name("mx." + name)))
+        reply = struct.pack("!HHHHHH", qid, 0x8180 | (3 if nx else 0), 1, len(answers), 0, 0)
+        reply += data[12:end + 4]
+        for rtype, rdata in answers:
+            reply += struct.pack("!HHHIH", 0xC00C, rtype, 1, 60, len(rdata)) + rdata
+        if server.latency:
+            asyncio.get_running_loop().call_later(server.latency, self.transport.sendto, reply, addr)
+        else:
+            self.transport.sendto(reply, addr)
+
+
+class FakeDNSServer:
+    """UDP nameserver on 127.0.0.1: A, AAAA and MX for every name after
+    ``latency``, NXDOMAIN for a deterministic ``failure_rate`` of names."""
+
+    def __init__(self, latency=0.002, failure_rate=0.0, seed=CORPUS_SEED):
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self.seed = seed
+        self.queries = 0
+        self.port = None
+        self._loop = None
+        self._transport = None
+
+    def __enter__(self):
+        self._loop = asyncio.new_event_loop()
+        threading.Thread(target=self._loop.run_forever, name="fake-dns", daemon=True).start()
+        self._transport, _ = asyncio.run_coroutine_threadsafe(self._loop.create_datagram_endpoint(
+            lambda: _FakeDNSProtocol(self), local_addr=("127.0.0.1", 0)), self._loop).result()
+        self.port = self._transport.get_extra_info("sockname")[1]
+        return self
+
+    def __exit__(self, *exc):
+        self._loop.call_soon_threadsafe(self._transport.close)
+        self._loop.call_soon_threadsafe(self._loop.stop)
+
+
+class FakeHTTPServer(ThreadingHTTPServer):
+    """HEAD-only keep-alive server on 127.0.0.1 with latency and a 5xx rate."""
+
+    daemon_threads = True
+
+    def __init__(self, latency=0.005, failure_rate=0.0, seed=CORPUS_SEED):
+        super().__init__(("127.0.0.1", 0), _FakeHandler)
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self.seed = seed
+
+    @property
+    def port(self):
+        return self.server_address[1]
+
+    def __enter__(self):
+        threading.Thread(target=self.serve_forever, name="fake-http", daemon=True).start()
+        return self
+
+    def __exit__(self, *exc):
+        self.shutdown()
+        self.server_close()
+
+
+# ─────────────────────────────────────────────
+# TIMING
+# ─────────────────────────────────────────────
+
+def _timeit(fn, items, rounds, min_seconds):
+    """Per-call microseconds over ``rounds`` passes through ``items``."""
+    samples = []
+    start = time.perf_counter()
+    for r in range(rounds):
+        for item in items:
+            t0 = time.perf_counter_ns()
+            fn(item)
+            samples.append((time.perf_counter_ns() - t0) / 1000)
+        if r and time.perf_counter() - start > min_seconds:
+            break
+    samples.sort()
+    return {
+        "calls": len(samples),
+        "median_us": round(statistics.median(samples), 2),
+        "p95_us": round(samples[int(0.95 * (len(samples) - 1))], 2),
+        "mean_us": round(statistics.fmean(samples), 2),
+        "ops_per_s": round(1e6 / statistics.fmean(samples), 1),
+    }
+
+
+def run_benchmarks(per_cell=40, rounds=5, min_seconds=1.0, net_latency=0.002,
+                   dns_failure_rate=0.2, http_failure_rate=0.1, seed=CORPUS_SEED):
+    """Run every benchmark in a temp working directory; returns the result dict."""
+    from . import history, reports, reputation, verify
+    from .render import generate_report_txt, highlight_scam_words
+    from .scoring import calculate_risk_score
+
+    corpus = build_corpus(per_cell, seed)
+    results = {}
+
+    def bench(name, fn, items, rounds=rounds):
+        results[name] = _timeit(fn, items, rounds, min_seconds)
+
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory(prefix="trusthire-bench-") as tmp:
+        os.chdir(tmp)
+        try:
+            # ── pure CPU: scoring and rendering, per corpus cell ──
+            for cell, postings in corpus.items():
+                bench(f"score/{cell}", lambda p: calculate_risk_score(
+                    p["job_text"], p["email"], p["company"]), postings)
+            for length in LENGTHS:
+                postings = corpus[f"{length}/mixed"]
+                bench(f"highlight/{length}", lambda p: highlight_scam_words(p["job_text"]), postings)
+                scored = [(p, calculate_risk_score(p["job_text"], p["email"], p["company"]))
+                          for p in postings]
+                bench(f"report_txt/{length}", lambda ps: generate_report_txt(
+                    ps[0]["job_text"], ps[0]["email"], ps[0]["company"], *ps[1][:4]),
+                    scored)
+            try:
+                from .vectorized import check_parity, score_batch
+            except ImportError:
+                pass   # NumPy not installed
+            else:
+                for length in LENGTHS:
+                    postings = corpus[f"{length}/mixed"]
+                    assert not check_parity(postings), "vectorized scores differ from score_posting"
+                    bench(f"score_batch/{length}", score_batch, [postings])
+                    results[f"score_batch/{length}"]["us_per_posting"] = round(
+                        results[f"score_batch/{length}"]["median_us"] / len(postings), 2)
+
+            # ── persistence ──
+            records = [{"timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"), "score": i % 100,
+                        "risk_level": "HIGH", "reasons": ["⚡ Urgency"], "job_preview": p["job_text"][:200]}
+                       for i, p in enumerate(corpus["medium/mixed"])]
+            bench("history/append", history.append_scan_history, records)
+            bench("history/save_last_result", history.save_last_result, records)
+            scans = [dict(r, job_text=p["job_text"]) for r, p in zip(records, corpus["medium/mixed"])]
+            bench("history/append_with_text", history.append_scan_history, scans)
+            bench("history/load_scan_history", lambda _: history.load_scan_history(), [None] * 10)
+            shared = history.ScanHistory("bench_history.index.sqlite3")
+            bench("history/query_page", lambda level: shared.query(risk_levels=[level], page_size=20),
+                  ["HIGH", "LOW"] * 5)
+            bench("history/recent", lambda _: shared.recent(20), [None] * 10)
+
+            report_rows = [{"timestamp": "2024-01-01 00:00:00", "job_link": p["job_url"],
+                            "email": p["email"], "phone": f"98{i:08d}", "details": p["job_text"][:300],
+                            "has_screenshot": False} for i, p in enumerate(corpus["medium/heavy"])]
+            bench("reports/save", reports.save_scam_report, report_rows, rounds=1)
+            bench("reports/lookup", lambda p: reports.lookup_prior_reports(
+                p["job_text"], p["email"], p["job_url"]), corpus["medium/heavy"])
+            bench("reports/lookup_miss", lambda i: reports.REPORT_STORE.lookup(
+                f"hr{i}@unreported{i}.example", [f"97{i:08d}"], [f"http://unreported{i}.example/"]),
+                range(10 * per_cell))
+
+            # ── domain reputation file ──
+            with open("allow.txt", "w", encoding="utf-8") as f:
+                f.writelines(f"site{i}.example\n" for i in range(100_000))
+            reputation.build_reputation_db("bench_reputation.db", {"allow": ["allow.txt"]})
+            table = reputation.DomainReputation("bench_reputation.db")
+            hosts = [f"jobs.site{i * 7919 % 200_000}.example" for i in range(10 * per_cell)]
+            bench("reputation/lookup", table.lookup, hosts)
+
+            # ── verifiers against the local stand-ins ──
+            with FakeHTTPServer(net_latency, http_failure_rate, seed) as server, \
+                    FakeDNSServer(net_latency, dns_failure_rate, seed) as nameserver:
+                resolver = FakeResolver(server.port, net_latency, dns_failure_rate, seed)
+                saved = verify.PROBE_CLIENT.resolver, verify.DNS_CLIENT.nameservers
+                verify.PROBE_CLIENT.resolver = resolver
+                verify.DNS_CLIENT.nameservers = [("127.0.0.1", nameserver.port)]
+                try:
+                    names = [f"Bench Co {i}" for i in range(per_cell)]
+                    emails = [f"hr@bench{i}.example" for i in range(per_cell)]
+                    urls = [f"http://jobs{i}.example/apply" for i in range(per_cell)]
+                    bench("verify/email_uncached", verify.verify_email_domain.uncached, emails, 2)
+                    bench("verify/email_bulk_1000", verify.verify_email_domains,
+                          [[f"hr@bulk{i}-{j}.example" for j in range(1000)] for i in range(2)], 1)
+                    bench("verify/company_uncached", verify.verify_company_online.uncached, names, 2)
+                    bench("verify/url_uncached", verify.check_url_safety.uncached, urls, 2)
+                    bench("verify/run_web_checks_cold", lambda i: verify.run_web_checks(
+                        f"Cold Co {i}", f"hr@cold{i}.example", f"http://cold{i}.example/"),
+                        range(per_cell), 1)
+                    bench("verify/run_web_checks_cached", lambda i: verify.run_web_checks(
+                        f"Cold Co {i}", f"hr@cold{i}.example", f"http://cold{i}.example/"),
+                        range(per_cell))
+                finally:
+                    verify.PROBE_CLIENT.resolver, verify.DNS_CLIENT.nameservers = saved
+        finally:
+            os.chdir(cwd)
+
+    return {
+        "meta": {
+            "python": platform.python_version(), "implementation": platform.python_implementation(),
+            "platform": platform.platform(), "cpus": os.cpu_count(),
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "seed": seed, "per_cell": per_cell, "rounds": rounds,
+            "net_latency_s": net_latency, "dns_failure_rate": dns_failure_rate,
+            "http_failure_rate": http_failure_rate,
+        },
+        "benchmarks": results,
+    }
+
+
+def compare(current, baseline, max_slowdown):
+    """Benchmarks whose median grew by more than ``max_slowdown``×: ``{name: ratio}``."""
+    slower = {}
+    for name, now in current["benchmarks"].items():
+        before = baseline.get("benchmarks", {}).get(name)
+        if before and before["median_us"] > 0:
+            ratio = now["median_us"] / before["median_us"]
+            if ratio > max_slowdown:
+                slower[name] = round(ratio, 2)
+    return slower
+
+
+def main(argv=None):
+    p = argparse.ArgumentParser(prog="python -m trusthire.bench", description=__doc__.split("\n\n")[0])
+    p.add_argument("-o", "--output", default="-", help="JSON results file (default: stdout)")
+    p.add_argument("--quick", action="store_true", help="small corpus, one round")
+    p.add_argument("--per-cell", type=int, default=40, help="postings per length/density cell")
+    p.add_argument("--rounds", type=int, default=5)
+    p.add_argument("--min-seconds", type=float, default=1.0, help="stop repeating a benchmark after this")
+    p.add_argument("--seed", type=int, default=CORPUS_SEED)
+    p.add_argument("--net-latency", type=float, default=0.002, help="fake DNS and HTTP latency (s)")
+    p.add_argument("--dns-failure-rate", type=float, default=0.2)
+    p.add_argument("--http-failure-rate", type=float, default=0.1)
+    p.add_argument("--compare", metavar="BASELINE", help="earlier JSON output to check against")
+    p.add_argument("--max-slowdown", type=float, default=1.25)
+    args = p.parse_args(argv)
+    if args.quick:
+        args.per_cell, args.rounds, args.min_seconds = 10, 1, 0.2
+
+    result = run_benchmarks(args.per_cell, args.rounds, args.min_seconds, args.net_latency,
+                            args.dns_failure_rate, args.http_failure_rate, args.seed)
+    status = 0
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            slower = compare(result, json.load(f), args.max_slowdown)
+        result["regressions"] = slower
+        for name, ratio in sorted(slower.items()):
+            print(f"❌ {name}: {ratio:.2f}× slower than baseline", file=sys.stderr)
+        status = 1 if slower else 0
+
+    text = json.dumps(result, indent=2, ensure_ascii=False)
+    if args.output == "-":
+        print(text)
+    else:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+        for name, r in result["benchmarks"].items():
+            print(f"{name:<32} {r['median_us']:>11,.1f} µs  p95 {r['p95_us']:>11,.1f} µs", file=sys.stderr)
+    return status
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,149 @@
+"""
+Content-addressed store for posting texts.
+
+A text is kept once, zlib-compressed, under the SHA-256 of its UTF-8
+bytes; scan history and the last-result file record only that digest.
+The same scam pasted a hundred times costs one row, and reading history
+no longer decompresses or parses texts nobody opens.
+
+Blobs live in one SQLite table (``WITHOUT ROWID``, keyed on the digest)
+rather than a file each, so a 1 KB posting takes about its compressed
+size on disk instead of a filesystem block.
+"""
+
+import hashlib
+import os
+import threading
+import time
+import zlib
+from collections import OrderedDict
+
+TEXTS_DB = "scan_texts.sqlite3"
+TEXT_CACHE_MAX_ENTRIES = 256     # decompressed texts kept in memory
+RETAIN_GRACE_SECONDS = 3600      # blobs stored this recently survive ``retain``
+_SQL_CHUNK = 500                 # digests per IN (...) query
+
+
+def text_digest(text):
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class BlobStore:
+    """Deduplicated, compressed texts keyed by ``text_digest``."""
+
+    def __init__(self, path=TEXTS_DB, max_cached=TEXT_CACHE_MAX_ENTRIES):
+        self.path = path
+        self.max_cached = max_cached
+        self._db = None
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _conn(self):
+        if self._db is None:
+            import sqlite3   # deferred: only needed once a text is stored or read
+            db = sqlite3.connect(self.path, timeout=5, check_same_thread=False,
+                                 isolation_level=None)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            db.execute("""CREATE TABLE IF NOT EXISTS blobs (
+                digest TEXT PRIMARY KEY, data BLOB, stored_at REAL) WITHOUT ROWID""")
+            if "stored_at" not in {row[1] for row in db.execute("PRAGMA table_info(blobs)")}:
+                db.execute("ALTER TABLE blobs ADD COLUMN stored_at REAL")
+            self._db = db
+        return self._db
+
+    def _remember(self, digest, text):
+        self._cache[digest] = text
+        self._cache.move_to_end(digest)
+        while len(self._cache) > self.max_cached:
+            self._cache.popitem(last=False)
+
+    def put(self, text):
+        """Store ``text`` and return its digest.
+
+        Always goes to the database, even for a text read a moment ago: the
+        row may have been pruned since. An existing row only has its
+        ``stored_at`` refreshed, which keeps it out of a concurrent ``retain``.
+        """
+        digest = text_digest(text)
+        data = zlib.compress(text.encode("utf-8"))
+        with self._lock:
+            self._conn().execute(
+                "INSERT INTO blobs VALUES (?, ?, ?)"
+                " ON CONFLICT(digest) DO UPDATE SET stored_at = excluded.stored_at",
+                (digest, data, time.time()))
+            self._remember(digest, text)
+        return digest
+
+    def get(self, digest):
+        """The text stored under ``digest``, or None."""
+        return self.get_many([digest]).get(digest)
+
+    def get_many(self, digests):
+        """``{digest: text}`` for the digests that are stored; one query per 500."""
+        found = {}
+        with self._lock:
+            missing = []
+            for digest in set(digests):
+                if digest in self._cache:
+                    self._cache.move_to_end(digest)
+                    found[digest] = self._cache[digest]
+                else:
+                    missing.append(digest)
+            if not missing or not self.exists():
+                return found
+            db = self._conn()
+            for i in range(0, len(missing), _SQL_CHUNK):
+                chunk = missing[i:i + _SQL_CHUNK]
+                for digest, data in db.execute(
+                        f"SELECT digest, data FROM blobs WHERE digest IN ({','.join('?' * len(chunk))})",
+                        chunk):
+                    try:
+                        found[digest] = zlib.decompress(data).decode("utf-8")
+                    except (zlib.error, UnicodeDecodeError):
+                        continue
+                    self._remember(digest, found[digest])
+        return found
+
+    def exists(self):
+        return self._db is not None or os.path.exists(self.path)
+
+    def retain(self, digests, grace=RETAIN_GRACE_SECONDS):
+        """Delete every blob whose digest is not in ``digests``; returns how many went.
+
+        Blobs stored within the last ``grace`` seconds are kept regardless:
+        another process may have stored one and not yet written the record
+        that points at it.
+        """
+        if not self.exists():
+            return 0
+        keep = set(digests)
+        cutoff = time.time() - grace
+        with self._lock:
+            db = self._conn()
+            db.execute("BEGIN IMMEDIATE")
+            try:
+                db.execute("CREATE TEMP TABLE IF NOT EXISTS keep (digest TEXT PRIMARY KEY)")
+                db.execute("DELETE FROM keep")
+                db.executemany("INSERT OR IGNORE INTO keep VALUES (?)", ((d,) for d in keep))
+                removed = db.execute(
+                    "DELETE FROM blobs WHERE digest NOT IN (SELECT digest FROM keep)"
+                    " AND COALESCE(stored_at, 0) < ?", (cutoff,)).rowcount
+                db.execute("DELETE FROM keep")
+                db.execute("COMMIT")
+            except BaseException:
+                db.execute("ROLLBACK")
+                raise
+            self._cache.clear()
+        return removed
+
+    def stats(self):
+        with self._lock:
+            if not self.exists():
+                return {"blobs": 0, "compressed_bytes": 0, "cached": len(self._cache)}
+            blobs, size = self._conn().execute(
+                "SELECT COUNT(*), COALESCE(SUM(LENGTH(data)), 0) FROM blobs").fetchone()
+            return {"blobs": blobs, "compressed_bytes": size, "cached": len(self._cache)}
+
+
+TEXT_STORE = BlobStore()
@@ -0,0 +1,155 @@
+"""
+Bloom filter that lives on disk and is updated in place.
+
+The ``k`` bit positions of a key come from one 128-bit BLAKE2b digest by
+double hashing, so every process and every run agrees on them. The file
+is a fixed header followed by the bit array. ``flush`` writes back only
+the bytes that changed since the last write, then the header, so adding
+a few keys to a multi-MB filter costs a few small writes. Writers in
+different processes serialize on an ``flock`` of the file and merge their
+bits into what is on disk, so neither erases the other's.
+"""
+
+import hashlib
+import math
+import os
+import struct
+
+BLOOM_FP_RATE = 0.01
+_MAGIC = b"THBLOOM1"
+_HEADER = struct.Struct("<8sQQQQQ")   # magic, bits, hashes, capacity, count, watermark
+_DIGEST = struct.Struct("<QQ")
+
+
+def _lock_file(f):
+    """Exclusive ``flock`` on ``f`` until it is closed; a no-op without ``fcntl`` (Windows)."""
+    try:
+        import fcntl
+    except ImportError:
+        return
+    fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+
+
+class BloomFilter:
+    """Set membership with false positives (about ``fp_rate`` at ``capacity``) and no false negatives.
+
+    ``watermark`` is free for the owner to record how far the filter is
+    up to date (e.g. the last row id added); it is saved with the bits.
+    """
+
+    def __init__(self, capacity, fp_rate=BLOOM_FP_RATE):
+        capacity = max(1, int(capacity))
+        bits = max(64, math.ceil(-capacity * math.log(fp_rate) / math.log(2) ** 2))
+        self.bits = (bits + 7) // 8 * 8
+        self.hashes = max(1, round(self.bits / capacity * math.log(2)))
+        self.capacity = capacity
+        self.count = 0
+        self.watermark = 0
+        self._array = bytearray(self.bits // 8)
+        self._dirty = set()
+
+    def _positions(self, key):
+        h1, h2 = _DIGEST.unpack(hashlib.blake2b(key.encode("utf-8"), digest_size=16).digest())
+        h2 |= 1
+        bits = self.bits
+        for _ in range(self.hashes):
+            yield h1 % bits
+            h1 += h2
+
+    def add(self, key):
+        """Add ``key``; returns False when every bit was already set (probably a repeat)."""
+        array = self._array
+        new = False
+        for pos in self._positions(key):
+            byte, mask = pos >> 3, 1 << (pos & 7)
+            if not array[byte] & mask:
+                array[byte] |= mask
+                self._dirty.add(byte)
+                new = True
+        if new:
+            self.count += 1
+        return new
+
+    def __contains__(self, key):
+        array = self._array
+        for pos in self._positions(key):   # most keys are absent and stop at the first clear bit
+            if not array[pos >> 3] & (1 << (pos & 7)):
+                return False
+        return True
+
+    def __len__(self):
+        return self.count
+
+    @property
+    def nbytes(self):
+        return len(self._array)
+
+    def _header(self):
+        return _HEADER.pack(_MAGIC, self.bits, self.hashes, self.capacity, self.count, self.watermark)
+
+    def save(self, path):
+        """Write the whole filter to a temp file and swap it in."""
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(self._header())
+            f.write(self._array)
+        os.replace(tmp, path)
+        self._dirty.clear()
+
+    def flush(self, path):
+        """Write the changed bytes into ``path`` in place (all of it if there is no such file).
+
+        Each changed byte is OR-ed with the byte on disk, under an exclusive
+        ``flock`` where the platform has one, so bits another process
+        flushed meanwhile are kept (and picked up here too). Bits go first
+        and the header last, so a crash in between leaves an older
+        ``watermark`` with extra bits set, never the reverse.
+        """
+        try:
+            with open(path, "r+b") as f:
+                _lock_file(f)
+                head = f.read(_HEADER.size)
+                if head[:8] == _MAGIC and len(head) == _HEADER.size \
+                        and _HEADER.unpack(head)[1:3] == (self.bits, self.hashes):
+                    _, _, _, _, count, watermark = _HEADER.unpack(head)
+                    self._merge_dirty(f)
+                    f.seek(0)
+                    f.write(_HEADER.pack(_MAGIC, self.bits, self.hashes, self.capacity,
+                                         max(count, self.count), max(watermark, self.watermark)))
+                    self._dirty.clear()
+                    return
+        except FileNotFoundError:
+            pass
+        self.save(path)   # no file yet, or a different filter: replace it whole
+
+    def _merge_dirty(self, f):
+        """OR the changed bytes with the file's and write them back; ``f`` is locked."""
+        if not self._dirty:
+            return
+        dirty = sorted(self._dirty)
+        first = dirty[0]
+        f.seek(_HEADER.size + first)
+        on_disk = f.read(dirty[-1] + 1 - first)   # one read spanning every changed byte
+        array = self._array
+        for byte in dirty:
+            if byte - first < len(on_disk):
+                array[byte] |= on_disk[byte - first]
+            f.seek(_HEADER.size + byte)
+            f.write(array[byte:byte + 1])
+
+    @classmethod
+    def load(cls, path):
+        """Read a saved filter; ``ValueError`` if the file is not one."""
+        with open(path, "rb") as f:
+            head = f.read(_HEADER.size)
+            if len(head) != _HEADER.size or head[:8] != _MAGIC:
+                raise ValueError(f"{path} is not a Bloom filter file")
+            _, bits, hashes, capacity, count, watermark = _HEADER.unpack(head)
+            array = bytearray(f.read())
+        if len(array) != bits // 8:
+            raise ValueError(f"{path} is truncated")
+        bloom = cls.__new__(cls)
+        bloom.bits, bloom.hashes, bloom.capacity = bits, hashes, capacity
+        bloom.count, bloom.watermark = count, watermark
+        bloom._array, bloom._dirty = array, set()
+        return bloom
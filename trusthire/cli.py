@@ -0,0 +1,280 @@
+"""
+Headless batch scoring
+======================
+Score job-board exports without the Streamlit UI:
+
+    python -m trusthire postings.csv -o scored.jsonl
+    python -m trusthire postings.jsonl -o scored.csv --workers 8 --web --reports
+
+Input is CSV or JSONL (one posting per row / line). Postings are scored on
+a process pool in batches and written out in input order as soon as each
+batch is done, so memory stays flat however large the export is. With
+``--checkpoint`` the run goes through ``trusthire.pipeline`` instead and
+can be resumed after a crash.
+"""
+
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+from collections import Counter, deque
+from concurrent.futures import ProcessPoolExecutor
+
+from .keywords import keyword_automaton
+from .scoring import score_posting
+
+OUTPUT_FIELDS = ["row", "id", "score", "risk_level", "company_status",
+                 "reasons", "verifications", "error", "line"]
+
+
+# ─────────────────────────────────────────────
+# INPUT / OUTPUT
+# ─────────────────────────────────────────────
+
+def _format_of(path, explicit=None):
+    if explicit:
+        return explicit
+    return "csv" if path.lower().endswith(".csv") else "jsonl"
+
+
+def read_postings(path, fmt=None):
+    """Yield postings (dicts) from a CSV or JSONL file, one at a time.
+
+    A JSONL line that is not valid JSON, or not an object, comes back as
+    ``{"_error": ..., "_line": n}`` and is scored as an error row.
+    """
+    fmt = _format_of(path, fmt)
+    stream = sys.stdin if path == "-" else open(path, "r", encoding="utf-8", newline="")
+    try:
+        if fmt == "csv":
+            csv.field_size_limit(min(sys.maxsize, 2**31 - 1))
+            yield from csv.DictReader(stream)
+        else:
+            for number, line in enumerate(stream, 1):
+                if not line.strip():
+                    continue
+                try:
+                    record = json.loads(line)
+                except ValueError as e:
+                    record = {"_error": f"{type(e).__name__}: {e}"}
+                if not isinstance(record, dict):
+                    record = {"_error": f"TypeError: expected a JSON object, got {type(record).__name__}"}
+                if "_error" in record:
+                    record["_line"] = number
+                yield record
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+
+
+class ResultWriter:
+    """Writes scored rows to CSV or JSONL, flushing after every batch."""
+
+    def __init__(self, path, fmt=None, append=False):
+        self.fmt = _format_of(path, fmt)
+        mode = "a" if append else "w"
+        self.stream = sys.stdout if path == "-" else open(path, mode, encoding="utf-8", newline="")
+        self._csv = None
+        if self.fmt == "csv":
+            self._csv = csv.DictWriter(self.stream, fieldnames=OUTPUT_FIELDS, extrasaction="ignore")
+            if not append:
+                self._csv.writeheader()
+
+    def write_many(self, rows):
+        for row in rows:
+            if self._csv:
+                flat = dict(row)
+                for key in ("reasons", "verifications"):
+                    flat[key] = " | ".join(flat.get(key) or [])
+                self._csv.writerow(flat)
+            else:
+                self.stream.write(json.dumps(row, ensure_ascii=False) + "\n")
+        self.stream.flush()
+
+    def close(self):
+        if self.stream is not sys.stdout:
+            self.stream.close()
+
+
+# ─────────────────────────────────────────────
+# SCORING
+# ─────────────────────────────────────────────
+
+def _error_row(row, record):
+    """Result for an input line ``read_postings`` could not parse."""
+    return {"row": row, "id": None, "error": record["_error"], "line": record.get("_line")}
+
+
+def _score_batch(batch, fields, web, reports=False):
+    """Score ``[(row, posting), ...]`` — runs inside a worker process."""
+    if reports:
+        from .reports import lookup_prior_reports
+    if web:
+        from .verify import run_web_checks
+    else:
+        rows = _score_batch_vectorized(batch, fields, reports)
+        if rows is not None:
+            return rows
+    out = []
+    for row, record in batch:
+        if "_error" in record:
+            out.append(_error_row(row, record))
+            continue
+        result = {"row": row, "id": None}
+        try:
+            result["id"] = record.get(fields["id"])
+            posting = {"job_text": record.get(fields["text"]), "email": record.get(fields["email"]),
+                       "company": record.get(fields["company"]), "job_url": record.get(fields["url"])}
+            web_checks = (run_web_checks(posting["company"], posting["email"], posting["job_url"])
+                          if web else None)
+            prior = (lookup_prior_reports(posting["job_text"] or "", posting["email"] or "",
+                                          posting["job_url"] or None) if reports else None)
+            result.update(score_posting(posting, web_checks, prior_reports=prior))
+        except Exception as e:
+            result["error"] = f"{type(e).__name__}: {e}"
+        out.append(result)
+    return out
+
+
+def _score_batch_vectorized(batch, fields, reports=False):
+    """Offline batches go through the NumPy path when it is installed; None
+    means fall back to one posting at a time (which reports per-row errors)."""
+    try:
+        from .vectorized import score_batch
+    except ImportError:
+        return None
+    good = [(row, record) for row, record in batch if "_error" not in record]
+    try:
+        postings = [{"job_text": record.get(fields["text"]), "email": record.get(fields["email"]),
+                     "company": record.get(fields["company"]), "job_url": record.get(fields["url"])}
+                    for _, record in good]
+        scores = score_batch(postings, reports=reports)
+        scored = {row: {"row": row, "id": record.get(fields["id"]), **score}
+                  for (row, record), score in zip(good, scores)}
+    except Exception:
+        return None
+    return [scored[row] if row in scored else _error_row(row, record) for row, record in batch]
+
+
+def _batches(postings, size):
+    batch = []
+    for row, posting in enumerate(postings, 1):
+        batch.append((row, posting))
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def score_postings(postings, fields, workers=None, batch_size=500, web=False, reports=False):
+    """Yield lists of scored rows, in input order.
+
+    At most ``2 × workers`` batches are in flight, which bounds memory and
+    applies backpressure to the reader.
+    """
+    workers = workers or os.cpu_count() or 1
+    keyword_automaton()   # build once here; forked workers inherit it
+    if workers == 1:
+        for batch in _batches(postings, batch_size):
+            yield _score_batch(batch, fields, web, reports)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        inflight = deque()
+        for batch in _batches(postings, batch_size):
+            inflight.append(pool.submit(_score_batch, batch, fields, web, reports))
+            if len(inflight) >= 2 * workers:
+                yield inflight.popleft().result()
+        while inflight:
+            yield inflight.popleft().result()
+
+
+# ─────────────────────────────────────────────
+# ENTRY POINT
+# ─────────────────────────────────────────────
+
+def build_parser():
+    p = argparse.ArgumentParser(prog="python -m trusthire",
+                                description="Batch-score job postings for scam risk.")
+    p.add_argument("input", help="CSV or JSONL file of postings ('-' for stdin)")
+    p.add_argument("-o", "--output", default="-", help="CSV or JSONL output file (default: stdout)")
+    p.add_argument("--input-format", choices=["csv", "jsonl"], help="override detection by extension")
+    p.add_argument("--output-format", choices=["csv", "jsonl"], help="override detection by extension")
+    p.add_argument("--workers", type=int, default=None, help="scoring processes (default: CPU count)")
+    p.add_argument("--batch-size", type=int, default=500, help="postings per worker task")
+    p.add_argument("--web", action="store_true", help="also run live company/email/URL checks")
+    p.add_argument("--reports", action="store_true",
+                   help="also count matches in user scam reports (scam_reports.sqlite3 here)")
+    p.add_argument("--progress-every", type=int, default=10_000, help="progress line interval (rows)")
+    p.add_argument("--checkpoint", metavar="PATH",
+                   help="stream through one process, saving progress here; rerun to resume")
+    p.add_argument("--checkpoint-every", type=int, default=10_000, help="checkpoint interval (rows)")
+    p.add_argument("--text-field", default="job_text")
+    p.add_argument("--email-field", default="email")
+    p.add_argument("--company-field", default="company")
+    p.add_argument("--url-field", default="job_url")
+    p.add_argument("--id-field", default="id")
+    return p
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    fields = {"text": args.text_field, "email": args.email_field, "company": args.company_field,
+              "url": args.url_field, "id": args.id_field}
+    if args.checkpoint:
+        return _main_pipeline(args, fields)
+    postings = read_postings(args.input, args.input_format)
+    writer = ResultWriter(args.output, args.output_format)
+    levels = Counter()
+    done = errors = 0
+    next_report = args.progress_every
+    start = time.perf_counter()
+    try:
+        for rows in score_postings(postings, fields, args.workers, args.batch_size, args.web,
+                                   args.reports):
+            writer.write_many(rows)
+            for r in rows:
+                if "error" in r:
+                    errors += 1
+                else:
+                    levels[r["risk_level"]] += 1
+            done += len(rows)
+            if args.progress_every and done >= next_report:
+                rate = done / (time.perf_counter() - start)
+                print(f"… {done:,} scored · {rate:,.0f} postings/s", file=sys.stderr)
+                next_report += args.progress_every
+    finally:
+        writer.close()
+
+    elapsed = time.perf_counter() - start
+    summary = {
+        "postings": done, "errors": errors, "seconds": round(elapsed, 3),
+        "postings_per_second": round(done / elapsed, 1) if elapsed else None,
+        "risk_levels": {k: levels[k] for k in ("LOW", "MEDIUM", "HIGH")},
+    }
+    return _report(summary)
+
+
+def _main_pipeline(args, fields):
+    from .pipeline import run_pipeline
+    try:
+        summary = run_pipeline(args.input, args.output, fields, args.checkpoint, args.checkpoint_every,
+                               args.batch_size, args.web, input_format=args.input_format,
+                               output_format=args.output_format, progress_every=args.progress_every,
+                               reports=args.reports)
+    except ValueError as e:
+        print(f"❌ {e}", file=sys.stderr)
+        return 2
+    return _report(summary)
+
+
+def _report(summary):
+    done, errors, levels = summary["postings"], summary["errors"], summary["risk_levels"]
+    print(f"✅ Scored {done:,} postings in {summary['seconds']:.1f}s "
+          f"({summary['postings_per_second'] or 0:,.0f}/s) — "
+          f"LOW {levels['LOW']:,} · MEDIUM {levels['MEDIUM']:,} · HIGH {levels['HIGH']:,}"
+          + (f" · {errors:,} errors" if errors else ""), file=sys.stderr)
+    print(json.dumps(summary), file=sys.stderr)
+    return 1 if errors and errors == done else 0
@@ -0,0 +1,362 @@
+"""
+Asyncio DNS stub resolver over shared UDP sockets.
+
+``getaddrinfo`` holds a thread for every lookup and only answers "is there
+an address". ``DNSClient`` speaks the DNS wire protocol itself. A, AAAA
+and MX queries go out over one UDP socket per nameserver, each under a
+random 16-bit id. Many queries are in flight at once and each has its own
+timeout. A query that times out, or gets SERVFAIL / REFUSED back, is
+retried on the next nameserver. At most ``max_inflight`` queries wait on
+any one nameserver.
+
+The client runs on its own event-loop thread, so blocking callers on
+worker threads and coroutines on any other loop share the same sockets:
+
+    DNS_CLIENT.resolve("example.com", "MX")               # from any thread
+    await DNS_CLIENT.query("example.com", "A")            # from any event loop
+    DNS_CLIENT.resolve_many([("a.com", "MX"), ("b.com", "A")])
+
+Nameservers come from ``/etc/resolv.conf`` unless given. Truncated (TC)
+answers are used as they are. There is no TCP fallback, since existence
+checks on A/AAAA/MX records don't need the full answer.
+"""
+
+import asyncio
+import os
+import secrets
+import socket
+import struct
+import threading
+import time
+from collections import Counter
+
+DNS_PORT = 53
+DNS_TIMEOUT = 2.0            # seconds per attempt
+DNS_RETRIES = 2              # further attempts, each on the next nameserver
+DNS_MAX_INFLIGHT = 64        # queries outstanding per nameserver
+RESOLV_CONF = "/etc/resolv.conf"
+FALLBACK_NAMESERVERS = ("1.1.1.1", "8.8.8.8")
+
+QTYPES = {"A": 1, "CNAME": 5, "MX": 15, "AAAA": 28}
+RCODES = {0: "NOERROR", 1: "FORMERR", 2: "SERVFAIL", 3: "NXDOMAIN", 4: "NOTIMP", 5: "REFUSED"}
+_RETRY_RCODES = {"SERVFAIL", "REFUSED", "NOTIMP", "FORMERR"}
+_HEADER = struct.Struct("!HHHHHH")
+_RR = struct.Struct("!HHIH")
+_MAX_POINTERS = 64
+
+
+class DNSError(OSError):
+    """No usable answer from any nameserver (timeouts, SERVFAIL, REFUSED…)."""
+
+
+# ─────────────────────────────────────────────
+# WIRE FORMAT
+# ─────────────────────────────────────────────
+
+def _encode_name(name):
+    """Wire-format name; ``ValueError`` for names DNS cannot carry."""
+    try:
+        labels = name.rstrip(".").encode("idna").split(b".")
+    except UnicodeError as e:
+        raise ValueError(f"invalid domain name {name!r}: {e}") from None
+    if not all(labels) or any(len(label) > 63 for label in labels):
+        raise ValueError(f"invalid domain name {name!r}")
+    wire = b"".join(bytes([len(label)]) + label for label in labels) + b"\x00"
+    if len(wire) > 255:
+        raise ValueError(f"domain name too long: {name!r}")
+    return wire
+
+
+def _read_name(msg, pos):
+    """``(name, position after it)``, following compression pointers."""
+    labels = []
+    end = None
+    for _ in range(_MAX_POINTERS):
+        length = msg[pos]
+        if length >= 0xC0:
+            if end is None:
+                end = pos + 2
+            pos = ((length & 0x3F) << 8) | msg[pos + 1]
+            continue
+        if length == 0:
+            return ".".join(labels), end if end is not None else pos + 1
+        labels.append(msg[pos + 1:pos + 1 + length].decode("ascii", "replace").lower())
+        pos += 1 + length
+    raise ValueError("compression loop")
+
+
+def encode_query(qid, name, qtype):
+    """One recursive query for ``name`` (type code ``qtype``, class IN)."""
+    return _HEADER.pack(qid, 0x0100, 1, 0, 0, 0) + _encode_name(name) + struct.pack("!HH", qtype, 1)
+
+
+def parse_response(msg):
+    """``(id, rcode, question name, question type, [(type, value), ...])``.
+
+    A/AAAA values are address strings, MX values ``(preference, host)``,
+    CNAME values host names; other record types are skipped. Raises
+    ``ValueError`` for anything that is not a well-formed response.
+    """
+    try:
+        qid, flags, qdcount, ancount, _, _ = _HEADER.unpack_from(msg)
+        if not flags & 0x8000 or qdcount != 1:
+            raise ValueError("not a response to one question")
+        qname, pos = _read_name(msg, _HEADER.size)
+        qtype, _ = struct.unpack_from("!HH", msg, pos)
+        pos += 4
+        answers = []
+        for _ in range(ancount):
+            _, pos = _read_name(msg, pos)
+            rtype, _, _, rdlength = _RR.unpack_from(msg, pos)
+            pos += _RR.size
+            rdata = msg[pos:pos + rdlength]
+            if len(rdata) != rdlength:
+                raise ValueError("truncated record")
+            if rtype == 1 and rdlength == 4:
+                answers.append((rtype, socket.inet_ntop(socket.AF_INET, rdata)))
+            elif rtype == 28 and rdlength == 16:
+                answers.append((rtype, socket.inet_ntop(socket.AF_INET6, rdata)))
+            elif rtype == 15:
+                answers.append((rtype, (struct.unpack_from("!H", msg, pos)[0], _read_name(msg, pos + 2)[0])))
+            elif rtype == 5:
+                answers.append((rtype, _read_name(msg, pos)[0]))
+            pos += rdlength
+    except (struct.error, IndexError) as e:
+        raise ValueError(f"malformed DNS message: {e}") from None
+    return qid, RCODES.get(flags & 0x000F, str(flags & 0x000F)), qname, qtype, answers
+
+
+# ─────────────────────────────────────────────
+# NAMESERVERS
+# ─────────────────────────────────────────────
+
+def parse_nameserver(spec):
+    """``"1.1.1.1"``, ``"127.0.0.1:5353"``, ``"[::1]:53"``, ``"::1"`` or a tuple → ``(host, port)``."""
+    if isinstance(spec, tuple):
+        return spec[0], int(spec[1])
+    spec = spec.strip()
+    if spec.startswith("["):
+        host, _, port = spec[1:].partition("]")
+        return host, int(port.lstrip(":") or DNS_PORT)
+    if spec.count(":") == 1:
+        host, port = spec.split(":")
+        return host, int(port)
+    return spec, DNS_PORT
+
+
+def system_nameservers(path=RESOLV_CONF):
+    """``nameserver`` entries from resolv.conf, else ``FALLBACK_NAMESERVERS``."""
+    found = []
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                parts = line.split()
+                if len(parts) >= 2 and parts[0] == "nameserver":
+                    found.append(parts[1].split("%")[0])   # drop IPv6 zone ids
+    except OSError:
+        pass
+    return found or list(FALLBACK_NAMESERVERS)
+
+
+class _NameserverProtocol(asyncio.DatagramProtocol):
+    """One connected UDP socket to one nameserver; routes answers to waiting queries by id."""
+
+    def __init__(self):
+        self.transport = None
+        self.pending = {}   # id → (future, name, qtype)
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def datagram_received(self, data, addr):
+        try:
+            qid, rcode, qname, qtype, answers = parse_response(data)
+        except ValueError:
+            return
+        entry = self.pending.get(qid)
+        if entry is None:
+            return
+        fut, name, code = entry
+        if qname != name or qtype != code:
+            return   # stale or spoofed: the question must match too
+        del self.pending[qid]
+        if not fut.done():
+            fut.set_result((rcode, answers))
+
+    def error_received(self, exc):
+        self._fail_all(exc)   # e.g. ICMP port unreachable
+
+    def connection_lost(self, exc):
+        self._fail_all(exc or DNSError("nameserver socket closed"))
+
+    def _fail_all(self, exc):
+        pending, self.pending = self.pending, {}
+        for fut, _, _ in pending.values():
+            if not fut.done():
+                fut.set_exception(exc)
+
+
+# ─────────────────────────────────────────────
+# CLIENT
+# ─────────────────────────────────────────────
+
+class DNSClient:
+    """Stub resolver shared by every thread and event loop in the process."""
+
+    def __init__(self, nameservers=None, timeout=DNS_TIMEOUT, retries=DNS_RETRIES,
+                 max_inflight=DNS_MAX_INFLIGHT):
+        self.timeout = timeout
+        self.retries = retries
+        self.max_inflight = max_inflight
+        self.stats = Counter()   # queries, sent, timeouts, retries, errors
+        self._nameservers = None
+        self._loop = None
+        self._pid = None
+        self._endpoints = {}     # (host, port) → task for its protocol
+        self._limits = {}        # (host, port) → asyncio.Semaphore
+        self._next = 0
+        self._lock = threading.Lock()
+        if nameservers is not None:
+            self.nameservers = nameservers
+
+    @property
+    def nameservers(self):
+        if self._nameservers is None:
+            self._nameservers = [parse_nameserver(s) for s in system_nameservers()]
+        return self._nameservers
+
+    @nameservers.setter
+    def nameservers(self, specs):
+        """Switch nameservers; sockets to the old ones are closed."""
+        self._nameservers = [parse_nameserver(s) for s in specs] or None
+        self._close_endpoints()
+
+    # ── event-loop thread ──
+
+    def _ensure_loop(self):
+        with self._lock:
+            if self._loop is None or self._pid != os.getpid():   # a forked child starts afresh
+                loop = asyncio.new_event_loop()
+                threading.Thread(target=loop.run_forever, name="dns-client", daemon=True).start()
+                self._loop, self._pid = loop, os.getpid()
+                self._endpoints, self._limits = {}, {}
+            return self._loop
+
+    def _close_endpoints(self):
+        loop, endpoints = self._loop, self._endpoints
+        self._endpoints, self._limits = {}, {}
+        if loop is None or self._pid != os.getpid():
+            return
+
+        def close():
+            for task in endpoints.values():
+                if task.done() and not task.cancelled() and task.exception() is None:
+                    task.result()[0].close()
+        loop.call_soon_threadsafe(close)
+
+    async def _endpoint(self, ns):
+        task = self._endpoints.get(ns)
+        if task is None or (task.done() and (task.cancelled() or task.exception() is not None
+                                             or task.result()[0].is_closing())):
+            loop = asyncio.get_running_loop()
+            task = self._endpoints[ns] = loop.create_task(
+                loop.create_datagram_endpoint(_NameserverProtocol, remote_addr=ns))
+        _, protocol = await task
+        return protocol
+
+    async def _query(self, name, qtype):
+        code = QTYPES[qtype]
+        name = name.strip().rstrip(".").lower()
+        wire_name = _read_name(_encode_name(name), 0)[0]   # as echoed back (IDNA); rejects bad names
+        servers = self.nameservers
+        start, self._next = self._next, self._next + 1
+        self.stats["queries"] += 1
+        last = "no nameservers"
+        t0 = time.perf_counter()
+        for attempt in range(self.retries + 1):
+            ns = servers[(start + attempt) % len(servers)]
+            if attempt:
+                self.stats["retries"] += 1
+            limit = self._limits.get(ns)
+            if limit is None:
+                limit = self._limits[ns] = asyncio.Semaphore(self.max_inflight)
+            async with limit:
+                try:
+                    protocol = await self._endpoint(ns)
+                except OSError as e:
+                    last = e
+                    continue
+                qid = secrets.randbits(16)
+                while qid in protocol.pending:
+                    qid = secrets.randbits(16)
+                fut = asyncio.get_running_loop().create_future()
+                protocol.pending[qid] = (fut, wire_name, code)
+                try:
+                    protocol.transport.sendto(encode_query(qid, name, code))
+                    self.stats["sent"] += 1
+                    rcode, answers = await asyncio.wait_for(fut, self.timeout)
+                except asyncio.TimeoutError:
+                    self.stats["timeouts"] += 1
+                    last = f"timed out after {self.timeout}s"
+                    continue
+                except OSError as e:
+                    last = e
+                    continue
+                finally:
+                    protocol.pending.pop(qid, None)
+            if rcode in _RETRY_RCODES:
+                last = rcode
+                continue
+            records = [value for rtype, value in answers if rtype == code]
+            if qtype == "MX":
+                records.sort()
+            return {"name": name, "type": qtype, "rcode": rcode, "records": records,
+                    "nameserver": f"{ns[0]}:{ns[1]}", "seconds": time.perf_counter() - t0}
+        self.stats["errors"] += 1
+        raise DNSError(f"{name} {qtype}: {last}")
+
+    # ── public API ──
+
+    async def query(self, name, qtype="A"):
+        """Answer dict ``{"name", "type", "rcode", "records", "nameserver", "seconds"}``.
+
+        NXDOMAIN is an answer (``rcode``), not an error. Raises ``DNSError``
+        when no nameserver answered and ``ValueError`` for invalid names.
+        """
+        loop = self._ensure_loop()
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is loop:
+            return await self._query(name, qtype)
+        return await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(self._query(name, qtype), loop))
+
+    def resolve(self, name, qtype="A"):
+        """Blocking ``query`` for worker threads."""
+        return self._run(self._query(name, qtype))
+
+    def resolve_many(self, queries):
+        """Run ``[(name, qtype), ...]`` concurrently; answers (or the exception raised) in order."""
+        async def gather():
+            return await asyncio.gather(*(self._query(n, t) for n, t in queries), return_exceptions=True)
+        return self._run(gather()) if queries else []
+
+    def _run(self, coro):
+        loop = self._ensure_loop()
+        if threading.current_thread().name == "dns-client":
+            coro.close()
+            raise RuntimeError("blocking DNS call from the DNS client's own loop; await query() instead")
+        return asyncio.run_coroutine_threadsafe(coro, loop).result()
+
+    def close(self):
+        """Close the sockets and stop the loop thread; the next query starts a new one."""
+        with self._lock:
+            loop = self._loop
+            self._close_endpoints()
+            self._loop = None
+        if loop is not None and self._pid == os.getpid():
+            loop.call_soon_threadsafe(loop.stop)
+
+
+DNS_CLIENT = DNSClient()
@@ -0,0 +1,50 @@
+"""
+Text features of a posting, extracted in one pass and shared by the scorer
+and the safe-job search.
+"""
+
+import functools
+import re
+
+from .keywords import find_keyword_hits
+
+_LPA_RE = re.compile(r'(\d+)\s*lpa')
+_DOLLAR_RE = re.compile(r'\$\s*(\d[\d,]*)')
+_PHONE_RE = re.compile(r'[\+]?[\d\-\s]{10,}')
+
+
+class PostingFeatures:
+    """Everything the rules read from the text. Treat as read-only: instances are shared."""
+
+    __slots__ = ("word_count", "caps_words", "lead_words", "exclamations", "keyword_hits",
+                 "salary_lpa", "dollar_amounts", "phone_count",
+                 "mentions_fresher", "mentions_week_or_daily")
+
+    def __init__(self, job_text):
+        text_lower = job_text.lower()
+        words = job_text.split()
+        self.word_count = len(words)
+        self.caps_words = sum(1 for w in words if w.isupper() and len(w) > 2)
+        self.lead_words = words[:10]
+        self.exclamations = job_text.count("!")
+        self.keyword_hits = find_keyword_hits(text_lower)
+        self.salary_lpa = _LPA_RE.findall(text_lower)
+        self.dollar_amounts = _DOLLAR_RE.findall(text_lower)
+        self.phone_count = len(_PHONE_RE.findall(job_text.strip()))
+        self.mentions_fresher = "fresher" in text_lower or "no experience" in text_lower
+        self.mentions_week_or_daily = "week" in text_lower or "daily" in text_lower
+
+    @property
+    def caps_ratio(self):
+        return self.caps_words / self.word_count if self.word_count else 0.0
+
+    def __repr__(self):
+        return (f"PostingFeatures(words={self.word_count}, caps={self.caps_words}, "
+                f"exclamations={self.exclamations}, phones={self.phone_count})")
+
+
+@functools.lru_cache(maxsize=64)
+def extract_features(job_text):
+    """``PostingFeatures`` for ``job_text``; recent texts are memoized so the
+    scorer, the safe-job links and the report reuse one extraction."""
+    return PostingFeatures(job_text)
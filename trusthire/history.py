@@ -0,0 +1,513 @@
+"""
+Scan history (append-only JSONL with rotation) and the last-result file.
+
+Posting texts are not written into either file: a record on disk holds
+``text_digest`` (its key in ``blobstore.TEXT_STORE``) and a short
+``job_preview``. Records read back fetch ``job_text`` from the store the
+first time it is asked for, so listing history decompresses nothing.
+
+``SCAN_HISTORY`` is the one copy a process serves to every session. It
+keeps an SQLite index beside the JSONL files: one row per record, holding
+the record's byte offset and the columns that views filter on (time, risk
+level, company). Queries page through the index newest first and never
+read the JSONL, so they cost the same for a hundred scans as for millions.
+The index follows the files: appends from any process are picked up from
+the last indexed byte, and a rotated or compacted segment is re-indexed.
+"""
+
+import collections
+import json
+import os
+import threading
+import time
+from datetime import datetime
+
+from .blobstore import TEXT_STORE
+
+
+HISTORY_FILE = "scan_history.jsonl"            # one JSON record per line, append-only
+LEGACY_HISTORY_FILE = "scan_history.json"      # pre-JSONL format, migrated on first read
+LAST_RESULT_FILE = "last_result.json"
+
+HISTORY_ROTATE_BYTES = 64 * 1024 * 1024        # start a new segment past this size…
+HISTORY_ROTATE_DAYS = 30                       # …or once its first record is this old
+HISTORY_KEEP_SEGMENTS = 12                     # rotated segments kept on disk
+HISTORY_INDEX_DB = "scan_history.index.sqlite3"
+HISTORY_RECENT_WINDOW = 100                    # newest entries served from memory
+HISTORY_RECHECK_SECONDS = 1.0                  # how soon other processes' appends are seen
+HISTORY_PREVIEW_CHARS = 160
+TEXT_PREVIEW_CHARS = 200                       # job_preview kept in each record on disk
+_TEXT_BATCH = 256                              # records whose texts are fetched together
+
+_history_lock = threading.RLock()
+
+
+def _migrate_legacy_history():
+    """Convert the old indented ``scan_history.json`` into JSONL, once."""
+    if os.path.exists(HISTORY_FILE) or not os.path.exists(LEGACY_HISTORY_FILE):
+        return
+    with open(LEGACY_HISTORY_FILE, "r", encoding="utf-8") as f:
+        try:
+            records = json.load(f)
+        except json.JSONDecodeError:
+            records = []
+    tmp = HISTORY_FILE + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        for record in records:
+            f.write(json.dumps(_stored(record), ensure_ascii=False) + "\n")
+    os.replace(tmp, HISTORY_FILE)
+    os.replace(LEGACY_HISTORY_FILE, LEGACY_HISTORY_FILE + ".migrated")
+
+
+def _iter_jsonl(path):
+    """Yield parsed records from a JSONL file, skipping torn or corrupt lines."""
+    if not os.path.exists(path):
+        return
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError:
+                continue
+
+
+def _stored(record):
+    """The on-disk form of ``record``: ``job_text`` swapped for its digest and a preview."""
+    text = record.get("job_text") if isinstance(record, dict) else None
+    if not isinstance(text, str):
+        return record
+    stored = {k: v for k, v in record.items() if k != "job_text"}
+    stored["text_digest"] = TEXT_STORE.put(text)
+    stored.setdefault("job_preview", text[:TEXT_PREVIEW_CHARS])
+    return stored
+
+
+class ScanRecord(dict):
+    """A history record as read back; ``job_text`` is fetched from the text
+    store on first access (``record["job_text"]`` or ``record.get``).
+
+    ``"job_text" in record`` stays False until then.
+    """
+
+    def __missing__(self, key):
+        if key != "job_text" or "text_digest" not in self:
+            raise KeyError(key)
+        text = TEXT_STORE.get(self["text_digest"])
+        self["job_text"] = text if text is not None else self.get("job_preview", "")
+        return self["job_text"]
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+
+def _record(record):
+    return ScanRecord(record) if isinstance(record, dict) else record
+
+
+def _with_texts(records):
+    """Fill in ``job_text`` for a batch of records with one store query."""
+    texts = TEXT_STORE.get_many(r["text_digest"] for r in records
+                                if "job_text" not in r and "text_digest" in r)
+    for r in records:
+        if "job_text" not in r and "text_digest" in r:
+            r["job_text"] = texts.get(r["text_digest"], r.get("job_preview", ""))
+    return records
+
+
+def _iter_with_texts(records):
+    batch = []
+    for record in records:
+        batch.append(record)
+        if len(batch) >= _TEXT_BATCH:
+            yield from _with_texts(batch)
+            batch = []
+    yield from _with_texts(batch)
+
+
+def history_segments():
+    """Rotated history segments, oldest first."""
+    base, ext = os.path.splitext(HISTORY_FILE)
+    folder = os.path.dirname(base) or "."
+    prefix = os.path.basename(base) + "-"
+    names = sorted(n for n in os.listdir(folder) if n.startswith(prefix) and n.endswith(ext))
+    return [os.path.join(folder, n) for n in names]
+
+
+def _iter_stored(include_rotated=False):
+    _migrate_legacy_history()
+    if include_rotated:
+        for path in history_segments():
+            yield from _iter_jsonl(path)
+    yield from _iter_jsonl(HISTORY_FILE)
+
+
+def iter_scan_history(include_rotated=False, texts=False):
+    """Stream scan records oldest-first without loading the whole file.
+
+    Records are ``ScanRecord``s that load ``job_text`` when it is read.
+    ``texts=True`` prefetches the texts in batches instead, for callers
+    that will read every one.
+    """
+    records = (_record(r) for r in _iter_stored(include_rotated))
+    return _iter_with_texts(records) if texts else records
+
+
+def load_scan_history(texts=False):
+    """Load the active history segment into a list.
+
+    Every record ends up in memory; views should page through
+    ``SCAN_HISTORY`` instead.
+    """
+    return list(iter_scan_history(texts=texts))
+
+
+def append_scan_history(record):
+    """Append one scan record — O(1), independent of history size.
+
+    The text goes to the text store first, so a record on disk never
+    points at a text that was not saved. Both happen under the history
+    lock, which ``prune_text_store`` also holds.
+    """
+    with _history_lock:
+        line = json.dumps(_stored(record), ensure_ascii=False) + "\n"
+        _migrate_legacy_history()
+        with open(HISTORY_FILE, "a", encoding="utf-8") as f:
+            f.write(line)
+        _maybe_rotate_history()
+
+
+def _maybe_rotate_history():
+    try:
+        size = os.path.getsize(HISTORY_FILE)
+    except OSError:
+        return
+    too_old = False
+    with open(HISTORY_FILE, "r", encoding="utf-8") as f:
+        try:
+            first = datetime.strptime(json.loads(f.readline())["timestamp"], "%Y-%m-%d %H:%M:%S")
+            too_old = (datetime.now() - first).days >= HISTORY_ROTATE_DAYS
+        except (ValueError, KeyError, TypeError):
+            pass
+    if size >= HISTORY_ROTATE_BYTES or too_old:
+        rotate_scan_history()
+
+
+def rotate_scan_history():
+    """Close the active segment: compact it under a timestamped name and prune old ones."""
+    with _history_lock:
+        if not os.path.exists(HISTORY_FILE):
+            return None
+        base, ext = os.path.splitext(HISTORY_FILE)
+        segment = f"{base}-{datetime.now().strftime('%Y%m%d-%H%M%S-%f')}{ext}"
+        os.replace(HISTORY_FILE, segment)
+    compact_scan_history(segment)
+    pruned = history_segments()[:-HISTORY_KEEP_SEGMENTS]
+    for old in pruned:
+        os.remove(old)
+    if pruned:
+        prune_text_store()
+    return segment
+
+
+def prune_text_store():
+    """Drop stored texts no longer referenced by history, the last result or
+    a scam report; returns the count.
+
+    Texts stored in the last ``blobstore.RETAIN_GRACE_SECONDS`` are kept,
+    which covers appends in flight in other processes.
+    """
+    with _history_lock:
+        keep = {r["text_digest"] for r in _iter_stored(include_rotated=True) if "text_digest" in r}
+        last = _load_last_stored()
+        if last and "text_digest" in last:
+            keep.add(last["text_digest"])
+        from .reports import REPORT_STORE
+        keep |= REPORT_STORE.text_digests()
+        return TEXT_STORE.retain(keep)
+
+
+def compact_scan_history(path=HISTORY_FILE, max_age_days=None):
+    """Rewrite a history file without corrupt lines or records older than ``max_age_days``.
+
+    Streams line by line into a temp file and swaps it in atomically.
+    Records from before the text store get their texts moved into it.
+    Returns ``(kept, dropped)``.
+    """
+    cutoff = None
+    if max_age_days is not None:
+        cutoff = datetime.now().timestamp() - max_age_days * 86400
+    kept = dropped = 0
+    tmp = path + ".tmp"
+    with open(path, "r", encoding="utf-8") as src, open(tmp, "w", encoding="utf-8") as dst:
+        for line in src:
+            try:
+                record = json.loads(line)
+                if cutoff is not None:
+                    ts = datetime.strptime(record["timestamp"], "%Y-%m-%d %H:%M:%S").timestamp()
+                    if ts < cutoff:
+                        dropped += 1
+                        continue
+            except (json.JSONDecodeError, KeyError, TypeError, ValueError):
+                dropped += 1
+                continue
+            dst.write(json.dumps(_stored(record), ensure_ascii=False) + "\n")
+            kept += 1
+    os.replace(tmp, path)
+    return kept, dropped
+
+
+def _load_last_stored():
+    if os.path.exists(LAST_RESULT_FILE):
+        with open(LAST_RESULT_FILE, "r", encoding="utf-8") as f:
+            try:
+                return json.load(f)
+            except json.JSONDecodeError:
+                return None
+    return None
+
+
+def load_last_result():
+    """Load the most recent analysis result from disk."""
+    return _record(_load_last_stored())
+
+
+def save_last_result(result):
+    """Save the most recent analysis result to disk (its text goes to the text store)."""
+    with _history_lock:
+        stored = _stored(result)
+        with open(LAST_RESULT_FILE, "w", encoding="utf-8") as f:
+            json.dump(stored, f, indent=2, ensure_ascii=False)
+
+
+# ─────────────────────────────────────────────
+# SHARED, INDEXED HISTORY
+# ─────────────────────────────────────────────
+
+def _summary(record):
+    """The index columns of one record; the same dict shape queries return."""
+    text = record.get("job_text") or record.get("job_preview") or ""
+    text = " ".join(str(text)[:4 * HISTORY_PREVIEW_CHARS].split())
+    company = str(record.get("company") or "").strip()
+    score = record.get("score")
+    return {"timestamp": str(record.get("timestamp") or ""),
+            "score": score if isinstance(score, (int, float)) else None,
+            "risk_level": str(record.get("risk_level") or ""),
+            "company": company,
+            "preview": text[:HISTORY_PREVIEW_CHARS]}
+
+
+class ScanHistory:
+    """Scan history shared by every session of a process: paged queries
+    over an SQLite index, plus the newest entries kept in memory.
+
+    Returned entries are summaries (``id``, ``timestamp``, ``score``,
+    ``risk_level``, ``company``, ``preview``); ``get(id)`` reads one
+    full record from the JSONL and its text from the text store.
+    """
+
+    _COLUMNS = "id, timestamp, score, risk_level, company, preview"
+
+    def __init__(self, index_path=HISTORY_INDEX_DB, recent_window=HISTORY_RECENT_WINDOW):
+        self.index_path = index_path
+        self._db = None
+        self._recent = collections.deque(maxlen=recent_window)
+        self._indexed = None
+        self._checked = 0.0
+        self._lock = threading.RLock()
+
+    def _conn(self):
+        if self._db is None:
+            import sqlite3   # deferred: only needed once history is viewed or written
+            db = sqlite3.connect(self.index_path, timeout=5, check_same_thread=False,
+                                 isolation_level=None)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            db.execute("""CREATE TABLE IF NOT EXISTS segments (
+                path TEXT PRIMARY KEY, inode INTEGER, indexed_bytes INTEGER)""")
+            db.execute("""CREATE TABLE IF NOT EXISTS entries (
+                id INTEGER PRIMARY KEY, path TEXT, offset INTEGER, length INTEGER,
+                timestamp TEXT, score NUMERIC, risk_level TEXT, company TEXT,
+                company_norm TEXT, preview TEXT)""")
+            db.execute("CREATE INDEX IF NOT EXISTS entries_path ON entries(path)")
+            db.execute("CREATE INDEX IF NOT EXISTS entries_time ON entries(timestamp, id)")
+            db.execute("CREATE INDEX IF NOT EXISTS entries_risk ON entries(risk_level, timestamp, id)")
+            db.execute("CREATE INDEX IF NOT EXISTS entries_company ON entries(company_norm, timestamp, id)")
+            self._db = db
+        return self._db
+
+    # ── keeping the index in step with the files ──
+
+    def _refresh(self, force=False):
+        """Index whatever the JSONL files gained since the last look."""
+        now = time.monotonic()
+        if not force and now - self._checked < HISTORY_RECHECK_SECONDS:
+            return
+        with self._lock:
+            self._checked = now
+            _migrate_legacy_history()
+            db = self._conn()
+            files = {}
+            for path in history_segments() + [HISTORY_FILE]:
+                try:
+                    files[path] = os.stat(path)
+                except OSError:
+                    pass
+            db.execute("BEGIN IMMEDIATE")   # one process indexes new bytes; the others see its rows
+            try:
+                known = {path: (inode, done) for path, inode, done
+                         in db.execute("SELECT path, inode, indexed_bytes FROM segments")}
+                for path in set(known) - set(files):     # pruned, or renamed by rotation
+                    db.execute("DELETE FROM entries WHERE path = ?", (path,))
+                    db.execute("DELETE FROM segments WHERE path = ?", (path,))
+                    del known[path]
+                for path, st in files.items():
+                    inode, done = known.get(path, (None, 0))
+                    if inode is not None and (inode != st.st_ino or st.st_size < done):
+                        db.execute("DELETE FROM entries WHERE path = ?", (path,))   # rewritten
+                        done = 0
+                    if st.st_size > done:
+                        done = self._index_file(db, path, done)
+                    if (st.st_ino, done) != known.get(path):
+                        db.execute("INSERT OR REPLACE INTO segments VALUES (?, ?, ?)",
+                                   (path, st.st_ino, done))
+                        known[path] = (st.st_ino, done)
+                db.execute("COMMIT")
+            except BaseException:
+                db.execute("ROLLBACK")
+                raise
+            if known != self._indexed:   # this process or another one changed the index
+                self._indexed = known
+                recent = self._select("", (), self._recent.maxlen)
+                self._recent = collections.deque(recent, maxlen=self._recent.maxlen)
+
+    def _index_file(self, db, path, start):
+        """Add the complete lines of ``path`` from byte ``start``; returns the byte after the last."""
+        rows = []
+        with open(path, "rb") as f:
+            f.seek(start)
+            offset = start
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break   # still being written; indexed on a later look
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    record = None
+                if isinstance(record, dict):
+                    s = _summary(record)
+                    rows.append((path, offset, len(line), s["timestamp"], s["score"],
+                                 s["risk_level"], s["company"], s["company"].lower() or None,
+                                 s["preview"]))
+                offset += len(line)
+        db.executemany("INSERT INTO entries (path, offset, length, timestamp, score, risk_level,"
+                       " company, company_norm, preview) VALUES (?,?,?,?,?,?,?,?,?)", rows)
+        return offset
+
+    # ── writing ──
+
+    def append(self, record):
+        """Append ``record`` to the history file and index it."""
+        with self._lock:
+            append_scan_history(record)
+            self._refresh(force=True)
+
+    # ── reading ──
+
+    def _select(self, where, params, limit):
+        rows = self._conn().execute(
+            f"SELECT {self._COLUMNS} FROM entries {where}"
+            " ORDER BY timestamp DESC, id DESC LIMIT ?", (*params, limit))
+        return [dict(zip(("id", "timestamp", "score", "risk_level", "company", "preview"), row))
+                for row in rows]
+
+    @staticmethod
+    def _where(risk_level, since, until, company, cursor=None):
+        clauses, params = [], []
+        if risk_level:
+            clauses.append("risk_level = ?")
+            params.append(risk_level)
+        if company and company.strip():
+            clauses.append("company_norm = ?")
+            params.append(company.strip().lower())
+        if since:
+            clauses.append("timestamp >= ?")
+            params.append(str(since))
+        if until:
+            clauses.append("timestamp < ?")
+            params.append(str(until))
+        if cursor:
+            clauses.append("(timestamp, id) < (?, ?)")
+            params += cursor
+        return (f"WHERE {' AND '.join(clauses)}" if clauses else ""), params
+
+    @staticmethod
+    def _levels(risk_levels):
+        if not risk_levels:
+            return [None]
+        return [risk_levels] if isinstance(risk_levels, str) else sorted(set(risk_levels))
+
+    def recent(self, n=20):
+        """The ``n`` newest entries, from memory when ``n`` fits the window."""
+        self._refresh()
+        if n <= self._recent.maxlen:
+            return list(self._recent)[:n]
+        with self._lock:
+            return self._select("", (), n)
+
+    def query(self, risk_levels=None, since=None, until=None, company=None,
+              page_size=20, cursor=None):
+        """One page of entries, newest first; returns ``(entries, next_cursor)``.
+
+        ``since``/``until`` are ``"YYYY-MM-DD[ HH:MM:SS]"`` strings (until
+        is exclusive); ``company`` matches the name case-insensitively.
+        Pass ``next_cursor`` back for the following page; it is None after
+        the last one. Pages are anchored on the last entry shown, so new
+        scans arriving in between don't shift them.
+        """
+        self._refresh()
+        entries = []
+        with self._lock:
+            # One index range per risk level, merged here: an IN (...) over
+            # several levels would make SQLite sort every match.
+            for level in self._levels(risk_levels):
+                where, params = self._where(level, since, until, company, cursor)
+                entries += self._select(where, params, page_size + 1)
+        entries.sort(key=lambda e: (e["timestamp"], e["id"]), reverse=True)
+        more = len(entries) > page_size
+        entries = entries[:page_size]
+        return entries, ((entries[-1]["timestamp"], entries[-1]["id"]) if more else None)
+
+    def count(self, risk_levels=None, since=None, until=None, company=None):
+        """How many entries match the same filters as ``query``."""
+        self._refresh()
+        total = 0
+        with self._lock:
+            for level in self._levels(risk_levels):
+                where, params = self._where(level, since, until, company)
+                total += self._conn().execute(f"SELECT COUNT(*) FROM entries {where}",
+                                              params).fetchone()[0]
+        return total
+
+    def get(self, entry_id):
+        """The full record behind an entry, or None if it has since been rotated away."""
+        self._refresh()
+        with self._lock:
+            row = self._conn().execute("SELECT path, offset, length FROM entries WHERE id = ?",
+                                       (entry_id,)).fetchone()
+        if row is None:
+            return None
+        try:
+            with open(row[0], "rb") as f:
+                f.seek(row[1])
+                record = json.loads(f.read(row[2]))
+        except (OSError, ValueError):
+            return None
+        return _with_texts([_record(record)])[0] if isinstance(record, dict) else None
+
+
+SCAN_HISTORY = ScanHistory()
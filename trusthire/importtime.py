@@ -0,0 +1,113 @@
+"""
+Cold-import timing for the engine entry points that workers use.
+
+    python -m trusthire.importtime
+    python -m trusthire.importtime --runs 9 --budget-ms 5
+
+Every entry point is imported in a fresh interpreter under
+``-X importtime``, from an empty temp directory. For each one we report:
+
+    own_ms    time spent in trusthire modules themselves (median of runs)
+    total_ms  own time plus every stdlib module it pulled in
+    heavy     heavy modules that got loaded (ssl, sqlite3, PIL, streamlit…)
+    files     files the import created (must be none)
+
+Exit status is 1 when the scoring entry point's ``own_ms`` exceeds the
+budget, when it loads a heavy module, or when any import writes a file.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+ENTRY_POINTS = {
+    "package": "import trusthire",
+    "scoring": "from trusthire import calculate_risk_score",
+    "keywords": "from trusthire import find_keyword_hits",
+    "render": "from trusthire import highlight_scam_words",
+    "history": "from trusthire import append_scan_history",
+    "reports": "from trusthire import save_scam_report",
+    "ocr": "from trusthire import extract_text_from_image",
+    "verify": "from trusthire import run_web_checks",
+    "cli": "import trusthire.cli",
+}
+HEAVY_MODULES = ["ssl", "sqlite3", "http.client", "concurrent.futures",
+                 "PIL", "pytesseract", "streamlit"]
+IMPORT_BUDGET_MS = 5.0
+
+_PROBE = ("import sys\n{stmt}\n"
+          "print(','.join(m for m in {heavy!r} if m in sys.modules))")
+
+
+def _parse_importtime(stderr):
+    """``{module: self_us}`` from ``-X importtime`` output."""
+    out = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, _, name = line[len("import time:"):].split("|")
+        out[name.strip()] = int(self_us)
+    return out
+
+
+def measure(stmt, runs=5):
+    """Median own/total import time for ``stmt`` plus heavy modules and files created."""
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [root, os.environ.get("PYTHONPATH")])),
+               PYTHONDONTWRITEBYTECODE="1")
+    base = subprocess.run([sys.executable, "-X", "importtime", "-c", "pass"],
+                          capture_output=True, text=True, env=env)
+    baseline = set(_parse_importtime(base.stderr))
+
+    own, total, heavy, files = [], [], [], set()
+    for _ in range(runs):
+        with tempfile.TemporaryDirectory() as cwd:
+            proc = subprocess.run(
+                [sys.executable, "-X", "importtime", "-c",
+                 _PROBE.format(stmt=stmt, heavy=HEAVY_MODULES)],
+                capture_output=True, text=True, env=env, cwd=cwd)
+            if proc.returncode:
+                raise RuntimeError(f"{stmt!r} failed:\n{proc.stderr[-2000:]}")
+            files.update(os.listdir(cwd))
+        times = _parse_importtime(proc.stderr)
+        own.append(sum(us for name, us in times.items() if name.split(".")[0] == "trusthire"))
+        total.append(sum(us for name, us in times.items() if name not in baseline))
+        heavy = [m for m in proc.stdout.strip().split(",") if m]
+    return {
+        "own_ms": round(statistics.median(own) / 1000, 2),
+        "total_ms": round(statistics.median(total) / 1000, 2),
+        "heavy": heavy,
+        "files": sorted(files),
+    }
+
+
+def main(argv=None):
+    p = argparse.ArgumentParser(prog="python -m trusthire.importtime", description=__doc__.split("\n\n")[0])
+    p.add_argument("--runs", type=int, default=5)
+    p.add_argument("--budget-ms", type=float, default=IMPORT_BUDGET_MS,
+                   help="max own import time for the scoring entry point")
+    p.add_argument("--json", action="store_true", help="print only the JSON result")
+    args = p.parse_args(argv)
+
+    results = {name: measure(stmt, args.runs) for name, stmt in ENTRY_POINTS.items()}
+    scoring = results["scoring"]
+    ok = (scoring["own_ms"] <= args.budget_ms and not scoring["heavy"]
+          and not any(r["files"] for r in results.values()))
+
+    if not args.json:
+        print(f"{'entry point':<10} {'own ms':>8} {'total ms':>9}  heavy modules")
+        for name, r in results.items():
+            print(f"{name:<10} {r['own_ms']:>8.2f} {r['total_ms']:>9.2f}  "
+                  f"{', '.join(r['heavy']) or '-'}" + (f"  FILES: {r['files']}" if r["files"] else ""))
+        print(f"{'✅' if ok else '❌'} scoring import {scoring['own_ms']:.2f} ms own "
+              f"(budget {args.budget_ms:.1f} ms)")
+    print(json.dumps({"budget_ms": args.budget_ms, "ok": ok, "entry_points": results}))
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
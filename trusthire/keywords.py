@@ -0,0 +1,170 @@
+"""
+Keyword banks and the single-pass keyword automaton used by the scorer.
+"""
+
+import functools
+from collections import deque
+
+
+# ═════════════════════════════════════════════
+# KEYWORD BANKS
+# ═════════════════════════════════════════════
+PAYMENT_KEYWORDS = [
+    "registration fee", "payment required", "training fee", "deposit",
+    "processing fee", "advance payment", "security deposit", "pay first",
+    "pay to apply", "joining fee", "enrollment fee", "application fee",
+    "fee required", "pay for training", "pay for kit", "pay for material",
+    "pay before joining", "refundable deposit", "non refundable",
+    "send money", "transfer amount",
+]
+URGENCY_KEYWORDS = [
+    "urgent hiring", "limited seats", "work from home and earn", "easy money",
+    "guaranteed income", "instant approval", "no experience needed",
+    "act now", "hurry", "apply immediately", "don't miss", "last chance",
+    "limited time", "only few seats", "once in a lifetime",
+    "immediate joining", "join today", "start today", "start immediately",
+    "hiring now", "walk in", "spot offer", "direct joining",
+]
+PERSONAL_INFO_KEYWORDS = [
+    "bank account", "bank details", "credit card", "debit card", "ssn",
+    "social security", "pan card", "aadhaar", "aadhar", "passport copy",
+    "send your id", "send documents", "share your photo", "selfie with id",
+]
+TOO_GOOD_KEYWORDS = [
+    "earn from home", "earn daily", "earn weekly", "make money fast",
+    "become rich", "earn lakhs", "earn thousands", "high income",
+    "passive income", "income guarantee", "double your money",
+    "no investment", "zero investment", "free laptop", "free phone",
+    "work only 2 hours", "part time income", "extra income",
+    "flexible hours earn", "simple task",
+]
+MLM_KEYWORDS = [
+    "refer and earn", "referral bonus", "chain", "multi level",
+    "network marketing", "downline", "build your team", "recruit people",
+    "pyramid", "mlm",
+]
+VAGUE_ROLE_KEYWORDS = [
+    "data entry", "copy paste", "typing job", "form filling",
+    "ad posting", "sms sending", "email sending", "captcha",
+    "survey filling", "click and earn", "like and earn",
+    "watch and earn", "simple online job",
+]
+CONTACT_KEYWORDS = [
+    "whatsapp", "telegram", "signal", "contact on whatsapp",
+    "dm me", "inbox me", "message me personally",
+]
+# The one free-mail list: scoring reads it directly, the verifiers through trusthire.reputation
+FREE_EMAIL_DOMAINS = frozenset([
+    "gmail.com", "yahoo.com", "outlook.com", "hotmail.com",
+    "protonmail.com", "aol.com", "ymail.com", "rediffmail.com",
+    "mail.com", "zoho.com", "icloud.com", "live.com",
+    "yandex.com", "tutanota.com", "gmx.com",
+])
+
+QUALIFICATION_KEYWORDS = [
+    "bachelor", "master", "degree", "b.tech", "b.e", "mba",
+    "qualification", "graduate", "diploma", "certification",
+    "b.sc", "m.sc", "b.com", "experience in", "years of experience",
+    "proficient in", "knowledge of", "skills required",
+]
+NO_INTERVIEW_KEYWORDS = [
+    "no interview", "direct selection", "selected directly",
+    "no aptitude", "no test required", "guaranteed selection",
+]
+COMMISSION_KEYWORDS = [
+    "commission only", "commission based", "incentive based",
+    "performance based only", "no fixed salary", "target based",
+]
+
+ALL_SCAM_KEYWORDS = (PAYMENT_KEYWORDS + URGENCY_KEYWORDS + PERSONAL_INFO_KEYWORDS
+                     + TOO_GOOD_KEYWORDS + MLM_KEYWORDS + VAGUE_ROLE_KEYWORDS
+                     + CONTACT_KEYWORDS)
+
+# Every bank the scorer looks at, keyed by category
+KEYWORD_BANKS = {
+    "payment": PAYMENT_KEYWORDS,
+    "urgency": URGENCY_KEYWORDS,
+    "personal_info": PERSONAL_INFO_KEYWORDS,
+    "too_good": TOO_GOOD_KEYWORDS,
+    "mlm": MLM_KEYWORDS,
+    "vague_role": VAGUE_ROLE_KEYWORDS,
+    "contact": CONTACT_KEYWORDS,
+    "qualification": QUALIFICATION_KEYWORDS,
+    "no_interview": NO_INTERVIEW_KEYWORDS,
+    "commission": COMMISSION_KEYWORDS,
+}
+
+# Job roles for the safe-job search. Not a scam signal, but matched in the
+# same automaton pass so the text is only walked once.
+ROLE_KEYWORDS = [
+    "software engineer", "developer", "designer", "manager", "analyst",
+    "data entry", "marketing", "sales", "accountant", "teacher",
+    "nurse", "driver", "content writer", "graphic designer", "web developer",
+    "full stack", "frontend", "backend", "devops", "cloud", "python",
+    "java", "react", "angular", "machine learning", "ai", "data scientist",
+    "project manager", "product manager", "hr", "human resources",
+    "customer support", "business development", "operations",
+    "intern", "fresher", "senior", "junior", "lead", "architect",
+]
+SCAN_BANKS = {**KEYWORD_BANKS, "role": ROLE_KEYWORDS}
+
+
+def _build_keyword_automaton(banks):
+    """Compile keyword banks into an Aho-Corasick automaton.
+
+    Returns ``(delta, outputs)``: ``delta[state]`` maps a character to the
+    next state (failure links already folded in, so a scan never backtracks)
+    and ``outputs[state]`` lists the ``(category, index)`` pairs of every
+    keyword ending in that state.
+    """
+    goto, fail, outputs = [{}], [0], [[]]
+    for category, keywords in banks.items():
+        for idx, kw in enumerate(keywords):
+            state = 0
+            for ch in kw:
+                nxt = goto[state].get(ch)
+                if nxt is None:
+                    nxt = len(goto)
+                    goto[state][ch] = nxt
+                    goto.append({}); fail.append(0); outputs.append([])
+                state = nxt
+            outputs[state].append((category, idx))
+
+    # Breadth-first: a state's failure target is always finished before it
+    delta = [dict(g) for g in goto]
+    queue = deque(goto[0].values())
+    while queue:
+        state = queue.popleft()
+        for ch, nxt in goto[state].items():
+            queue.append(nxt)
+            fail[nxt] = delta[fail[state]].get(ch, 0) if state else 0
+            outputs[nxt] = outputs[nxt] + outputs[fail[nxt]]
+        for ch, nxt in delta[fail[state]].items():
+            delta[state].setdefault(ch, nxt)
+    return delta, [tuple(o) for o in outputs]
+
+
+@functools.lru_cache(maxsize=None)
+def keyword_automaton():
+    """The compiled automaton — built on first use, then shared."""
+    return _build_keyword_automaton(SCAN_BANKS)
+
+
+def find_keyword_hits(text_lower):
+    """Single pass over the text; returns ``{category: [keywords hit]}``.
+
+    Each list keeps bank order, exactly like ``[kw for kw in bank if kw in text]``.
+    """
+    delta, outputs = keyword_automaton()
+    terminal = set()
+    state = 0
+    for ch in text_lower:
+        state = delta[state].get(ch, 0)
+        if outputs[state]:
+            terminal.add(state)
+    found = {category: set() for category in SCAN_BANKS}
+    for state in terminal:
+        for category, idx in outputs[state]:
+            found[category].add(idx)
+    return {category: [SCAN_BANKS[category][i] for i in sorted(found[category])]
+            for category in SCAN_BANKS}
@@ -0,0 +1,142 @@
+"""
+Per-stage timing for scans, aggregated into histograms for monitoring.
+
+A scan times each stage with a ``StageTimer``; its spans (milliseconds)
+are stored in the result record under ``"timings_ms"`` and folded into
+``STAGE_METRICS``, which can render Prometheus text exposition:
+
+    trusthire_stage_duration_seconds_bucket{stage="web_checks",le="0.5"} 12
+    trusthire_stage_duration_seconds_sum{stage="web_checks"} 3.91
+    trusthire_stage_duration_seconds_count{stage="web_checks"} 14
+
+The Streamlit app rewrites ``METRICS_FILE`` after every scan (for a
+node_exporter textfile collector); the HTTP service serves ``/metrics``.
+"""
+
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+METRICS_FILE = "trusthire_metrics.prom"
+# Seconds. Spans from sub-millisecond keyword scoring up to the 10 s verify deadline and slow OCR
+STAGE_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1,
+                 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+_PROBE_PHASES = ("dns", "connect", "tls", "response")
+
+
+class StageTimer:
+    """Collects ``{stage: milliseconds}`` for one scan."""
+
+    def __init__(self):
+        self.spans = {}
+
+    @contextmanager
+    def stage(self, name):
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - t0)
+
+    def add(self, name, seconds):
+        self.spans[name] = round(self.spans.get(name, 0.0) + seconds * 1000, 3)
+
+
+def probe_spans(web_checks):
+    """``probe_dns`` / ``probe_connect`` / … ms summed over the company and URL checks."""
+    spans = {}
+    for key in ("company_check", "url_check"):
+        timings = ((web_checks or {}).get(key) or {}).get("timings") or {}
+        for phase in _PROBE_PHASES:
+            if phase in timings:
+                spans[f"probe_{phase}"] = round(spans.get(f"probe_{phase}", 0.0) + timings[phase] * 1000, 3)
+    return spans
+
+
+class StageMetrics:
+    """Thread-safe cumulative histograms of stage durations, one per stage."""
+
+    def __init__(self, buckets=STAGE_BUCKETS):
+        self.buckets = tuple(buckets)
+        self._stages = {}   # stage → [bucket counts..., +Inf count, sum seconds]
+        self._lock = threading.Lock()
+
+    def observe(self, stage, seconds):
+        with self._lock:
+            row = self._stages.get(stage)
+            if row is None:
+                row = self._stages[stage] = [0] * (len(self.buckets) + 1) + [0.0]
+            for i, bound in enumerate(self.buckets):
+                if seconds <= bound:
+                    row[i] += 1
+                    break
+            else:
+                row[len(self.buckets)] += 1
+            row[-1] += seconds
+
+    def observe_spans(self, spans_ms):
+        for stage, ms in spans_ms.items():
+            self.observe(stage, ms / 1000)
+
+    def _snapshot(self):
+        with self._lock:
+            return {stage: list(row) for stage, row in self._stages.items()}
+
+    def quantile(self, stage, q, _row=None):
+        """Estimated ``q``-quantile in seconds (linear within a bucket, like PromQL)."""
+        row = _row or self._snapshot().get(stage)
+        if not row:
+            return None
+        counts = row[:-1]
+        rank = q * sum(counts)
+        seen = 0
+        for i, n in enumerate(counts):
+            if n and seen + n >= rank:
+                if i == len(self.buckets):
+                    return self.buckets[-1]   # beyond the last bound: report the bound
+                lower = self.buckets[i - 1] if i else 0.0
+                return lower + (self.buckets[i] - lower) * (rank - seen) / n
+            seen += n
+        return None
+
+    def summary(self):
+        """``{stage: {"count", "mean_ms", "p50_ms", "p99_ms"}}`` for the diagnostics page."""
+        out = {}
+        for stage, row in sorted(self._snapshot().items()):
+            count = sum(row[:-1])
+            out[stage] = {
+                "count": count,
+                "mean_ms": round(row[-1] / count * 1000, 2) if count else None,
+                "p50_ms": round(self.quantile(stage, 0.5, row) * 1000, 2),
+                "p99_ms": round(self.quantile(stage, 0.99, row) * 1000, 2),
+            }
+        return out
+
+    def prometheus_text(self, name="trusthire_stage_duration_seconds"):
+        lines = [f"# HELP {name} Time spent in each scan stage.", f"# TYPE {name} histogram"]
+        for stage, row in sorted(self._snapshot().items()):
+            cumulative = 0
+            for bound, n in zip(self.buckets + ("+Inf",), row[:-1]):
+                cumulative += n
+                lines.append(f'{name}_bucket{{stage="{stage}",le="{bound}"}} {cumulative}')
+            lines.append(f'{name}_sum{{stage="{stage}"}} {row[-1]:.6f}')
+            lines.append(f'{name}_count{{stage="{stage}"}} {cumulative}')
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path=METRICS_FILE):
+        """Atomically replace ``path`` so a scraper never reads half a file.
+
+        The temp name is per thread: Streamlit sessions share one process.
+        """
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(self.prometheus_text())
+        os.replace(tmp, path)
+
+    def reset(self):
+        with self._lock:
+            self._stages.clear()
+
+
+STAGE_METRICS = StageMetrics()
@@ -0,0 +1,248 @@
+"""
+Near-duplicate detection for reposted scams.
+
+Scam postings come back with a new phone number or fee amount. Every
+posting is reduced to word 3-gram shingles (digit runs collapsed to ``0``,
+first ``MAX_SHINGLE_TOKENS`` words only) and a 64-value MinHash signature.
+One-permutation hashing with rotation densification hashes each shingle
+once. Signatures only ever live in memory, so shingles are hashed with the
+built-in tuple hash over per-word crc32s. The signatures sit in a 16-band
+LSH index (4 rows per band), so a query only compares against postings
+sharing a band; pairs at ~0.5 Jaccard are found with even odds, ≥0.8
+almost always.
+
+The index is built in a background thread the first time it is used,
+from scan history and the postings attached to scam reports; until it is
+done, queries see whatever has been indexed so far. History is read
+without texts and each distinct text is fetched once, by its digest.
+New scans and reports are indexed as they come in.
+"""
+
+import hashlib
+import re
+import string
+import threading
+import zlib
+from array import array
+
+NUM_PERM = 64
+BANDS = 16
+ROWS = NUM_PERM // BANDS
+SHINGLE_SIZE = 3
+NEAR_DUP_THRESHOLD = 0.8    # estimated Jaccard for "same posting, lightly edited"
+NEAR_DUP_MIN_SIMILARITY = 0.5
+NEAR_DUP_MAX_DOCS = 50_000  # oldest postings are dropped past this
+MAX_SHINGLE_TOKENS = 400    # reposts are edited near the top; the tail adds time, not signal
+
+_DIGITS_RE = re.compile(r"\d+")
+_PUNCT_TO_SPACE = str.maketrans({ch: " " for ch in string.punctuation})
+_BIN_BITS = 6               # log2(NUM_PERM)
+_VALUE_MASK = (1 << (32 - _BIN_BITS)) - 1
+_EMPTY = 1 << 32
+_ROTATION_OFFSET = 1 << 26  # keeps borrowed bin values apart from native ones
+_BUILD_BATCH = 500          # texts fetched from the text store together
+
+
+def shingles(text):
+    """Hashes of the word 3-grams of ``text``, lowercased, with every number replaced by ``0``."""
+    tokens = _DIGITS_RE.sub("0", (text or "").lower()).translate(_PUNCT_TO_SPACE).split()
+    del tokens[MAX_SHINGLE_TOKENS:]
+    codes = {t: zlib.crc32(t.encode("utf-8")) for t in set(tokens)}
+    hashes = [codes[t] for t in tokens]
+    if len(hashes) < SHINGLE_SIZE:
+        return {hash(tuple(hashes))} if hashes else set()
+    return {hash(sh) for sh in zip(hashes, hashes[1:], hashes[2:])}
+
+
+def minhash(shingle_set):
+    """``NUM_PERM``-value signature (array of uint32), or None for empty input."""
+    if not shingle_set:
+        return None
+    bins = [_EMPTY] * NUM_PERM
+    for sh in shingle_set:
+        h = (sh * 0x9E3779B1) & 0xFFFFFFFF   # spread the hash over all 32 bits
+        b, v = h >> (32 - _BIN_BITS), h & _VALUE_MASK
+        if v < bins[b]:
+            bins[b] = v
+    sig = array("I", bytes(4 * NUM_PERM))
+    for i in range(NUM_PERM):
+        j, d = i, 0
+        while bins[j] == _EMPTY:   # empty bin: borrow from the next filled one
+            j, d = (j + 1) % NUM_PERM, d + 1
+        sig[i] = (bins[j] + d * _ROTATION_OFFSET) & 0xFFFFFFFF
+    return sig
+
+
+def similarity(sig_a, sig_b):
+    """Estimated Jaccard similarity of two signatures."""
+    return sum(1 for a, b in zip(sig_a, sig_b) if a == b) / NUM_PERM
+
+
+def text_digest(text):
+    return hashlib.sha1(" ".join((text or "").lower().split()).encode("utf-8")).hexdigest()[:16]
+
+
+class NearDuplicateIndex:
+    """MinHash/LSH index over past scans and scam reports."""
+
+    def __init__(self, max_docs=NEAR_DUP_MAX_DOCS):
+        self.max_docs = max_docs
+        self._docs = {}          # doc id → (signature, band keys, metadata)
+        self._bands = [{} for _ in range(BANDS)]
+        self._next_id = 0
+        self._started = False
+        self._ready = threading.Event()
+        self._lock = threading.RLock()
+
+    def __len__(self):
+        return len(self._docs)
+
+    @staticmethod
+    def _band_keys(sig):
+        return [hash(tuple(sig[b * ROWS:(b + 1) * ROWS])) for b in range(BANDS)]
+
+    def _add(self, text, meta):
+        sig = minhash(shingles(text))
+        if sig is None:
+            return None
+        meta["digest"] = text_digest(text)
+        doc_id = self._next_id
+        self._next_id += 1
+        keys = self._band_keys(sig)
+        self._docs[doc_id] = (sig, keys, meta)
+        for band, key in zip(self._bands, keys):
+            band.setdefault(key, []).append(doc_id)
+        if len(self._docs) > self.max_docs:
+            self._drop(next(iter(self._docs)))
+        return doc_id
+
+    def _drop(self, doc_id):
+        _, keys, _ = self._docs.pop(doc_id)
+        for band, key in zip(self._bands, keys):
+            ids = band.get(key)
+            if ids:
+                ids.remove(doc_id)
+                if not ids:
+                    del band[key]
+
+    def _ensure_built(self):
+        if self._started:
+            return
+        with self._lock:
+            if self._started:
+                return
+            self._started = True
+        threading.Thread(target=self._build, name="neardup-build", daemon=True).start()
+
+    def wait_ready(self, timeout=None):
+        """Start the build if needed and wait for it; True once it has finished."""
+        self._ensure_built()
+        return self._ready.wait(timeout)
+
+    def _build(self):
+        from .blobstore import TEXT_STORE
+        from .history import iter_scan_history
+        from .reports import REPORT_STORE
+        try:
+            # Newest record per stored text; rescans of one posting are indexed once.
+            latest = {}
+            for record in iter_scan_history(include_rotated=True):
+                key = record.get("text_digest") or id(record)
+                latest.pop(key, None)
+                latest[key] = ("scan", record)
+            for report in REPORT_STORE.iter_reports():
+                if report.get("text_digest"):
+                    latest[("report", report["text_digest"])] = ("report", report)
+            items = list(latest.values())
+            for i in range(0, len(items), _BUILD_BATCH):
+                batch = items[i:i + _BUILD_BATCH]
+                texts = TEXT_STORE.get_many(r["text_digest"] for _, r in batch
+                                            if "text_digest" in r)
+                with self._lock:
+                    for kind, r in batch:
+                        text = texts.get(r["text_digest"]) if "text_digest" in r else None
+                        if kind == "scan":
+                            self._add_scan(r, text)
+                        elif text is not None:
+                            self._add_report(r, text)
+        finally:
+            self._ready.set()
+
+    def _add_scan(self, record, text=None):
+        text = text if text is not None else record.get("job_text") or ""
+        return self._add(text, {
+            "kind": "scan", "score": record.get("score"), "risk_level": record.get("risk_level"),
+            "text_risk_level": record.get("text_risk_level"),
+            "timestamp": record.get("timestamp"), "company": record.get("company") or "",
+            "preview": text[:120]})
+
+    def _add_report(self, report, text):
+        return self._add(text, {
+            "kind": "report", "score": None, "risk_level": "REPORTED", "text_risk_level": None,
+            "timestamp": report.get("timestamp"), "company": "",
+            "preview": text[:120]})
+
+    def add_scan(self, record):
+        """Index a scored result record (``job_text``, ``score``, ``risk_level``,
+        ``text_risk_level``…)."""
+        self._ensure_built()
+        with self._lock:
+            return self._add_scan(record)
+
+    def add_report(self, report):
+        """Index a user scam report by the posting it reports (its ``job_text``).
+
+        Reports filed without a scanned posting are not indexed: the
+        reporter's description is not a posting.
+        """
+        self._ensure_built()
+        if not report.get("job_text"):
+            return None
+        with self._lock:
+            return self._add_report(report, report["job_text"])
+
+    def query(self, text, k=5, min_similarity=NEAR_DUP_MIN_SIMILARITY):
+        """Closest indexed postings, best first: metadata plus ``similarity``."""
+        self._ensure_built()
+        sig = minhash(shingles(text))
+        if sig is None:
+            return []
+        digest = text_digest(text)
+        with self._lock:
+            candidates = set()
+            for band, key in zip(self._bands, self._band_keys(sig)):
+                candidates.update(band.get(key, ()))
+            scored = []
+            for doc_id in candidates:
+                doc_sig, _, meta = self._docs[doc_id]
+                sim = similarity(sig, doc_sig)
+                if sim >= min_similarity:
+                    scored.append((sim, doc_id, meta))
+        scored.sort(key=lambda t: (-t[0], -t[1]))   # ties: newest first
+        return [dict(meta, similarity=round(sim, 3), exact=meta["digest"] == digest)
+                for sim, _, meta in scored[:k]]
+
+    def known_scam(self, text, threshold=NEAR_DUP_THRESHOLD):
+        return known_scam_match(self.query(text, k=10, min_similarity=threshold), threshold)
+
+
+def known_scam_match(matches, threshold=NEAR_DUP_THRESHOLD):
+    """First of ``matches`` that marks a posting as a repost of a known scam, else None.
+
+    Known scams are reported postings or earlier scans whose text alone
+    rated HIGH (``scoring.text_risk_level``, taken before any near-duplicate
+    bonus). Neither an unverified company nor an earlier match makes a
+    template, so one borderline posting cannot pass HIGH on to its reposts.
+    Scans recorded without a text-only level never count. A match with the
+    very same text is a rescan, not a repost, and is ignored so rescanning
+    a posting doesn't feed on its own result.
+    """
+    for match in matches:
+        if match["similarity"] < threshold or match["exact"]:
+            continue
+        if match["kind"] == "report" or match.get("text_risk_level") == "HIGH":
+            return match
+    return None
+
+
+NEAR_DUP_INDEX = NearDuplicateIndex()
@@ -0,0 +1,328 @@
+"""
+Screenshot OCR. Pillow and pytesseract are optional and are only imported
+the first time a screenshot is scanned, so importing the engine stays cheap.
+
+Screenshots are cleaned up before Tesseract sees them (EXIF rotation,
+grayscale, downscale, Otsu binarization, dark mode inverted), and results
+are cached in memory by the SHA-256 of the image bytes, so uploading the
+same screenshot again returns immediately.
+
+OCR runs on a small pool of long-lived worker processes that start once and
+stay warm. With ``tesserocr`` installed each worker keeps one Tesseract
+engine loaded in-process; otherwise it falls back to pytesseract. Every
+image gets a timeout and the number of queued images is bounded.
+"""
+
+import functools
+import hashlib
+import io
+import threading
+from collections import OrderedDict
+
+# Phone screenshots are 1080–1440 px wide with ~40 px text; 1000 px keeps
+# text around Tesseract's preferred 20–30 px x-height and cuts OCR time.
+OCR_MAX_WIDTH = 1000
+OCR_MAX_HEIGHT = 6000               # long scrolling screenshots
+OCR_SOURCE_DPI = 300                # what we tell Tesseract after scaling
+# psm 4: one column of text of variable sizes — how job posts are laid out
+TESSERACT_CONFIG = "--oem 1 --psm 4 -c preserve_interword_spaces=1"
+OCR_CACHE_MAX_ENTRIES = 128
+OCR_WORKERS = 2                     # warm OCR processes (0 = OCR in the calling thread)
+OCR_TIMEOUT = 30.0                  # seconds per image
+OCR_MAX_PENDING = 16                # images queued or running across all callers
+
+
+@functools.lru_cache(maxsize=None)
+def _ocr_backend():
+    """``(Image, pytesseract, error)`` — imported once, on first use."""
+    try:
+        from PIL import Image
+    except ImportError:
+        return None, None, "PIL/Pillow is not installed. Run: pip install Pillow"
+    try:
+        import pytesseract
+    except ImportError:
+        return Image, None, "pytesseract is not installed. Run: pip install pytesseract (and install Tesseract-OCR)"
+    return Image, pytesseract, None
+
+
+def ocr_available():
+    """True when both Pillow and pytesseract can be imported."""
+    return _ocr_backend()[2] is None
+
+
+class OCRCache:
+    """In-memory LRU of OCR text keyed by image content hash."""
+
+    def __init__(self, max_entries=OCR_CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            text = self._entries.get(key)
+            if text is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return text
+
+    def put(self, key, text):
+        with self._lock:
+            self._entries[key] = text
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+
+OCR_CACHE = OCRCache()
+
+
+def _read_bytes(uploaded_file):
+    """Raw bytes of a Streamlit upload, file object, path or bytes."""
+    if isinstance(uploaded_file, (bytes, bytearray)):
+        return bytes(uploaded_file)
+    if isinstance(uploaded_file, str):
+        with open(uploaded_file, "rb") as f:
+            return f.read()
+    if hasattr(uploaded_file, "getvalue"):
+        return uploaded_file.getvalue()
+    if hasattr(uploaded_file, "seek"):
+        uploaded_file.seek(0)
+    return uploaded_file.read()
+
+
+def _otsu_threshold(histogram):
+    """Threshold that best separates a 256-bin grayscale histogram into two classes."""
+    total = sum(histogram)
+    sum_all = sum(i * n for i, n in enumerate(histogram))
+    sum_bg = weight_bg = 0
+    best, best_var = 127, -1.0
+    for i, n in enumerate(histogram):
+        weight_bg += n
+        if weight_bg == 0:
+            continue
+        weight_fg = total - weight_bg
+        if weight_fg == 0:
+            break
+        sum_bg += i * n
+        mean_bg = sum_bg / weight_bg
+        mean_fg = (sum_all - sum_bg) / weight_fg
+        var = weight_bg * weight_fg * (mean_bg - mean_fg) ** 2
+        if var > best_var:
+            best, best_var = i, var
+    return best
+
+
+def preprocess_image(image):
+    """Grayscale, downscaled, binarized copy of ``image`` with dark text on white."""
+    from PIL import Image, ImageOps
+
+    image = ImageOps.exif_transpose(image)
+    if image.mode in ("RGBA", "LA", "P"):
+        # Transparent areas become white, not black
+        image = image.convert("RGBA")
+        background = Image.new("RGBA", image.size, (255, 255, 255, 255))
+        background.alpha_composite(image)
+        image = background
+    gray = image.convert("L")
+
+    scale = min(1.0, OCR_MAX_WIDTH / gray.width, OCR_MAX_HEIGHT / gray.height)
+    if scale < 1.0:
+        gray = gray.resize((max(1, round(gray.width * scale)), max(1, round(gray.height * scale))),
+                           resample=Image.BICUBIC)
+
+    histogram = gray.histogram()
+    threshold = _otsu_threshold(histogram)
+    dark = sum(histogram[:threshold + 1])
+    light = gray.width * gray.height - dark
+    binary = gray.point(lambda v: 255 if v > threshold else 0)
+    if dark > light:
+        binary = ImageOps.invert(binary)   # dark mode: light text on a dark background
+    return binary
+
+
+def _tesseract_text(image, timeout=0):
+    """OCR an already preprocessed image with pytesseract (one process per call)."""
+    _, pytesseract, _ = _ocr_backend()
+    return pytesseract.image_to_string(
+        image, config=f"{TESSERACT_CONFIG} --dpi {OCR_SOURCE_DPI}", timeout=timeout).strip()
+
+
+# ── Worker process side ──
+_worker_api = None   # tesserocr.PyTessBaseAPI, one per worker process, when available
+
+
+def _ocr_worker_init():
+    """Runs once per worker: import Pillow/pytesseract and load Tesseract if we can."""
+    global _worker_api
+    _ocr_backend()
+    try:
+        import tesserocr
+    except ImportError:
+        return
+    try:
+        _worker_api = tesserocr.PyTessBaseAPI(psm=tesserocr.PSM.SINGLE_COLUMN,
+                                              oem=tesserocr.OEM.LSTM_ONLY)
+        _worker_api.SetVariable("preserve_interword_spaces", "1")
+    except RuntimeError:
+        _worker_api = None   # no traineddata found; pytesseract may still work
+
+
+def _ocr_bytes(data, timeout=0):
+    """Worker task: image bytes → OCR text."""
+    Image = _ocr_backend()[0]
+    image = preprocess_image(Image.open(io.BytesIO(data)))
+    if _worker_api is not None:
+        _worker_api.SetImage(image)
+        _worker_api.SetSourceResolution(OCR_SOURCE_DPI)
+        return _worker_api.GetUTF8Text().strip()
+    return _tesseract_text(image, timeout)
+
+
+class OCRPool:
+    """Long-lived OCR workers with a per-image timeout and a bounded queue.
+
+    The process pool starts on first use and is reused for every later
+    image, so Tesseract start-up is paid once per worker, not per call.
+    When a queue slot is free the image is queued; otherwise it fails at
+    once as busy. A timed-out image may still be running in a worker, so
+    its pool is retired and the workers killed. The slot comes back when
+    the worker is actually gone.
+    """
+
+    def __init__(self, workers=OCR_WORKERS, max_pending=OCR_MAX_PENDING, timeout=OCR_TIMEOUT):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.timeout = timeout
+        self._pool = None
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._lock = threading.Lock()
+
+    def _executor(self):
+        with self._lock:
+            if self._pool is None:
+                from concurrent.futures import ProcessPoolExecutor
+                self._pool = ProcessPoolExecutor(max_workers=self.workers,
+                                                 initializer=_ocr_worker_init)
+            return self._pool
+
+    def _reset(self, pool=None, kill=False):
+        """Retire ``pool`` (default: the current one); the next image starts a new one.
+
+        ``kill`` terminates its workers too: a hung Tesseract call never
+        returns, and its task fails with ``BrokenProcessPool`` instead.
+        """
+        with self._lock:
+            old = self._pool if pool is None else pool
+            if old is None:
+                return
+            if self._pool is old:
+                self._pool = None
+        processes = list((old._processes or {}).values()) if kill else []
+        old.shutdown(wait=False, cancel_futures=True)
+        for proc in processes:
+            proc.terminate()
+
+    def _submit(self, pool, data):
+        """Queue one image, or None when ``max_pending`` images are already queued."""
+        if not self._slots.acquire(blocking=False):
+            return None
+        try:
+            fut = pool.submit(_ocr_bytes, data, self.timeout)
+        except Exception:
+            self._slots.release()
+            raise
+        fut.add_done_callback(lambda _: self._slots.release())
+        return fut
+
+    def run(self, images):
+        """OCR several images' bytes; returns ``[(text, err), ...]`` in the same order."""
+        if self.workers <= 0:
+            out = []
+            for data in images:
+                try:
+                    out.append((_ocr_bytes(data, self.timeout), None))
+                except Exception as e:
+                    out.append((None, f"OCR failed: {str(e)}"))
+            return out
+
+        from concurrent.futures import TimeoutError as FutureTimeout
+        from concurrent.futures.process import BrokenProcessPool
+
+        pool = self._executor()
+        futures = [self._submit(pool, data) for data in images]
+        out = []
+        hung = False
+        for fut in futures:
+            if fut is None:
+                out.append((None, "OCR is busy — too many screenshots queued, try again shortly"))
+                continue
+            try:
+                out.append((fut.result(timeout=self.timeout), None))
+            except FutureTimeout:
+                if not fut.cancel():   # already running in a worker
+                    hung = True
+                out.append((None, f"OCR timed out after {self.timeout:g}s"))
+            except BrokenProcessPool as e:
+                self._reset(pool)   # a worker died; start fresh next time
+                out.append((None, f"OCR failed: {str(e)}"))
+            except Exception as e:
+                out.append((None, f"OCR failed: {str(e)}"))
+        if hung:
+            self._reset(pool, kill=True)   # after the others, which may finish on healthy workers
+        return out
+
+    def close(self):
+        self._reset()
+
+
+OCR_POOL = OCRPool()
+
+
+def extract_texts_from_images(uploaded_files):
+    """OCR several uploads at once; returns ``[(text, err), ...]`` in order.
+
+    Cached images are answered immediately; the rest are OCR'd in parallel
+    on the warm worker pool.
+    """
+    _, _, err = _ocr_backend()
+    if err:
+        return [(None, err) for _ in uploaded_files]
+    results, todo = [], {}
+    for i, uploaded_file in enumerate(uploaded_files):
+        try:
+            data = _read_bytes(uploaded_file)
+        except Exception as e:
+            results.append((None, f"OCR failed: {str(e)}"))
+            continue
+        key = hashlib.sha256(data).hexdigest()
+        cached = OCR_CACHE.get(key)
+        results.append((cached, None))
+        if cached is None:
+            todo.setdefault(key, (data, []))[1].append(i)
+    if todo:
+        keys = list(todo)
+        for key, (text, err) in zip(keys, OCR_POOL.run([todo[k][0] for k in keys])):
+            if err is None:
+                OCR_CACHE.put(key, text)
+            for i in todo[key][1]:
+                results[i] = (text, err)
+    return results
+
+
+def extract_text_from_image(uploaded_file):
+    """Extract text from an uploaded image using OCR."""
+    return extract_texts_from_images([uploaded_file])[0]
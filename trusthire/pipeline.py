@@ -0,0 +1,398 @@
+"""
+Streaming ingestion with checkpoints
+====================================
+Score multi-GB job-board exports in a chain of generators:
+
+    read → normalize → features → [verify] → score → write
+
+Each stage pulls one batch at a time from the one before it, so at most
+one batch per stage is alive and a slow stage holds back the reader.
+Verification runs before scoring because the score consumes its result.
+
+With a checkpoint file the run records, every ``checkpoint_every`` rows,
+how far it has read the input and written the output. A crashed run
+started again with the same arguments truncates the output back to that
+point and carries on from the same input byte.
+
+    python -m trusthire jobs.jsonl -o scored.jsonl --checkpoint jobs.ckpt
+"""
+
+import csv
+import json
+import os
+import sys
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+from .cli import ResultWriter, _format_of
+from .features import extract_features
+from .keywords import keyword_automaton
+from .scoring import score_posting
+
+DEFAULT_FIELDS = {"text": "job_text", "email": "email", "company": "company",
+                  "url": "job_url", "id": "id"}
+CHECKPOINT_VERSION = 1
+_POSTING_KEYS = {"text": "job_text", "email": "email", "company": "company", "url": "job_url"}
+
+
+# ─────────────────────────────────────────────
+# THROUGHPUT
+# ─────────────────────────────────────────────
+
+class StageStats:
+    """Rows and time per stage.
+
+    Stages are nested generators, so the time spent waiting on a stage
+    includes everything upstream of it; ``_metered`` records that
+    cumulative time and each stage's own share is the difference from
+    the stage before it.
+    """
+
+    def __init__(self):
+        self._order = []
+        self._rows = {}
+        self._cumulative = {}
+
+    def _register(self, name):
+        self._order.append(name)
+        self._rows[name] = 0
+        self._cumulative[name] = 0.0
+
+    def summary(self):
+        """``{stage: {"rows", "seconds", "rows_per_second"}}`` in pipeline order."""
+        out = {}
+        upstream = 0.0
+        for name in self._order:
+            seconds = max(0.0, self._cumulative[name] - upstream)
+            upstream = self._cumulative[name]
+            rows = self._rows[name]
+            out[name] = {"rows": rows, "seconds": round(seconds, 3),
+                         "rows_per_second": round(rows / seconds, 1) if seconds else None}
+        return out
+
+    def line(self):
+        return " · ".join(f"{name} {s['rows_per_second'] or 0:,.0f}/s"
+                          for name, s in self.summary().items())
+
+
+def _metered(stats, name, batches):
+    stats._register(name)   # now, not on first pull, so stages stay in pipeline order
+    return _timed(stats, name, iter(batches))
+
+
+def _timed(stats, name, batches):
+    while True:
+        t0 = time.perf_counter()
+        try:
+            batch = next(batches)
+        except StopIteration:
+            return
+        finally:
+            stats._cumulative[name] += time.perf_counter() - t0
+        stats._rows[name] += len(batch)
+        yield batch
+
+
+# ─────────────────────────────────────────────
+# STAGES
+# ─────────────────────────────────────────────
+
+class _Lines:
+    """Decoded lines of a binary stream; ``offset`` is the byte just past the
+    last one and ``line`` its 1-based number."""
+
+    def __init__(self, stream, offset=0, line=0):
+        self.stream = stream
+        self.offset = offset
+        self.line = line
+
+    def __iter__(self):
+        for raw in self.stream:
+            if self.offset == 0 and raw.startswith(b"\xef\xbb\xbf"):
+                raw, self.offset = raw[3:], 3
+            self.offset += len(raw)
+            self.line += 1
+            yield raw.decode("utf-8")
+
+
+def _count_lines(path, offset):
+    """Lines in the first ``offset`` bytes of ``path``."""
+    count = 0
+    with open(path, "rb") as f:
+        while offset > 0:
+            chunk = f.read(min(offset, 1 << 20))
+            if not chunk:
+                break
+            count += chunk.count(b"\n")
+            offset -= len(chunk)
+    return count
+
+
+def read_csv_header(path):
+    """``(fieldnames, offset of the first data row)`` of a CSV file."""
+    with open(path, "rb") as f:
+        lines = _Lines(f)
+        return next(csv.reader(lines), None), lines.offset
+
+
+def read_records(path, fmt=None, offset=0, fieldnames=None, line=0):
+    """Yield ``(end_offset, end_line, record)`` from a CSV or JSONL file, starting at byte ``offset``.
+
+    ``end_offset`` is the byte just past the record, the place to resume
+    after it, and ``end_line`` the number of lines read up to there; pass
+    that back as ``line`` when resuming. A CSV read from the middle needs
+    the header's ``fieldnames``. Lines that are not valid JSON, or not an
+    object, come back as ``{"_error": ..., "_line": n}`` instead of
+    stopping the run, as in ``cli.read_postings``.
+    """
+    fmt = _format_of(path, fmt)
+    stream = sys.stdin.buffer if path == "-" else open(path, "rb")
+    lines = _Lines(stream, offset, line)
+    try:
+        if offset:
+            stream.seek(offset)
+        if fmt == "csv":
+            csv.field_size_limit(min(sys.maxsize, 2**31 - 1))
+            reader = csv.reader(lines)
+            if fieldnames is None:
+                fieldnames = next(reader, None)
+                if fieldnames is None:
+                    return
+            for values in reader:
+                if values:
+                    yield lines.offset, lines.line, dict(zip(fieldnames, values))
+        else:
+            for line in lines:
+                if not line.strip():
+                    continue
+                try:
+                    record = json.loads(line)
+                except ValueError as e:
+                    record = {"_error": f"{type(e).__name__}: {e}"}
+                if not isinstance(record, dict):
+                    record = {"_error": f"TypeError: expected a JSON object, got {type(record).__name__}"}
+                if "_error" in record:
+                    record["_line"] = lines.line
+                yield lines.offset, lines.line, record
+    finally:
+        if stream is not sys.stdin.buffer:
+            stream.close()
+
+
+def _read(records, batch_size, first_row):
+    batch = []
+    for row, (end, line, record) in enumerate(records, first_row):
+        batch.append({"row": row, "offset": end, "line": line, "record": record})
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _text(value):
+    return "" if value is None else value if isinstance(value, str) else str(value)
+
+
+def _normalize(batches, fields):
+    """Map input columns onto the posting fields; numbers and nulls become strings."""
+    for batch in batches:
+        for item in batch:
+            record = item["record"]
+            item["result"] = {"row": item["row"], "id": record.get(fields["id"])}
+            if "_error" in record:
+                item["result"].update(error=record["_error"], line=record.get("_line"))
+                continue
+            item["posting"] = {key: _text(record.get(fields[f])) for f, key in _POSTING_KEYS.items()}
+        yield batch
+
+
+def _features(batches):
+    for batch in batches:
+        for item in batch:
+            if "posting" in item:
+                item["features"] = extract_features(item["posting"]["job_text"])
+        yield batch
+
+
+def _verify(batches, pool):
+    from .verify import run_web_checks, verify_email_domains
+
+    def check(item):
+        p = item["posting"]
+        try:
+            return run_web_checks(p["company"], p["email"], p["job_url"])
+        except Exception as e:
+            return {"_error": f"{type(e).__name__}: {e}"}
+
+    for batch in batches:
+        todo = [item for item in batch if "posting" in item]
+        try:
+            verify_email_domains([item["posting"]["email"] for item in todo])   # one DNS burst warms the cache
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+            for item in todo:
+                if "@" in item["posting"]["email"]:
+                    item["result"]["error"] = error
+                    del item["posting"]
+            todo = [item for item in todo if "posting" in item]
+        for item, web_checks in zip(todo, pool.map(check, todo)):
+            if "_error" in web_checks:
+                item["result"]["error"] = web_checks["_error"]
+                del item["posting"]
+            else:
+                item["web_checks"] = web_checks
+        yield batch
+
+
+def _score(batches, reports=False):
+    if reports:
+        from .reports import lookup_prior_reports
+    for batch in batches:
+        for item in batch:
+            if "posting" not in item:
+                continue
+            p = item["posting"]
+            try:
+                prior = (lookup_prior_reports(p["job_text"], p["email"], p["job_url"] or None)
+                         if reports else None)
+                item["result"].update(score_posting(p, item.get("web_checks"),
+                                                    features=item["features"], prior_reports=prior))
+            except Exception as e:
+                item["result"]["error"] = f"{type(e).__name__}: {e}"
+        yield batch
+
+
+def _write(batches, writer):
+    for batch in batches:
+        writer.write_many([item["result"] for item in batch])
+        yield batch
+
+
+# ─────────────────────────────────────────────
+# CHECKPOINTS
+# ─────────────────────────────────────────────
+
+def load_checkpoint(path):
+    """The saved checkpoint dict, or None if there is none to resume from."""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            state = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return state if state.get("version") == CHECKPOINT_VERSION else None
+
+
+def save_checkpoint(path, state):
+    """Atomically replace ``path`` so a crash never leaves half a checkpoint."""
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(state, f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+def _resume_state(checkpoint, input_path, output_path):
+    state = load_checkpoint(checkpoint)
+    if state is None:
+        return None
+    if state["input"] != os.path.abspath(input_path) or state["output"] != os.path.abspath(output_path):
+        raise ValueError(f"checkpoint {checkpoint} belongs to {state['input']} → {state['output']}")
+    if os.path.getsize(input_path) < state["offset"]:
+        raise ValueError(f"{input_path} is shorter than when checkpoint {checkpoint} was written")
+    if not os.path.exists(output_path) or os.path.getsize(output_path) < state["output_bytes"]:
+        raise ValueError(f"{output_path} is missing rows recorded in checkpoint {checkpoint}")
+    return state
+
+
+# ─────────────────────────────────────────────
+# RUN
+# ─────────────────────────────────────────────
+
+def run_pipeline(input_path, output_path, fields=None, checkpoint=None, checkpoint_every=10_000,
+                 batch_size=500, web=False, verify_concurrency=16, input_format=None,
+                 output_format=None, progress_every=10_000, log=sys.stderr, reports=False):
+    """Score ``input_path`` into ``output_path``; returns the run summary dict.
+
+    ``reports`` adds points for matches in the user scam reports.
+
+    With ``checkpoint`` the run resumes from that file if it exists and
+    removes it once the input is done. Checkpoints need real files on both
+    sides, not ``-``.
+    """
+    fields = dict(DEFAULT_FIELDS, **(fields or {}))
+    if checkpoint and "-" in (input_path, output_path):
+        raise ValueError("checkpoints need an input and an output file, not stdin/stdout")
+    state = _resume_state(checkpoint, input_path, output_path) if checkpoint else None
+    if state:
+        with open(output_path, "r+b") as f:
+            f.truncate(state["output_bytes"])   # rows written after the checkpoint come again
+        if "line" not in state:   # written before line numbers were tracked
+            state["line"] = _count_lines(input_path, state["offset"])
+        print(f"↻ Resuming at row {state['rows'] + 1:,} (byte {state['offset']:,})", file=log)
+    else:
+        state = {"version": CHECKPOINT_VERSION, "offset": 0, "line": 0, "fieldnames": None, "rows": 0,
+                 "errors": 0, "risk_levels": {}, "output_bytes": 0}
+        if checkpoint:
+            state["input"], state["output"] = os.path.abspath(input_path), os.path.abspath(output_path)
+    resumed_from = state["rows"]
+    levels = Counter(state["risk_levels"])
+    done, errors = state["rows"], state["errors"]
+
+    fmt = _format_of(input_path, input_format)
+    if fmt == "csv" and state["fieldnames"] is None and input_path != "-":
+        state["fieldnames"], state["offset"] = read_csv_header(input_path)
+        state["line"] = _count_lines(input_path, state["offset"])
+    keyword_automaton()
+    writer = ResultWriter(output_path, output_format, append=resumed_from > 0)
+    stats = StageStats()
+    pool = ThreadPoolExecutor(max_workers=verify_concurrency) if web else None
+    records = read_records(input_path, fmt, state["offset"], state["fieldnames"], state["line"])
+    batches = _metered(stats, "read", _read(records, batch_size, done + 1))
+    batches = _metered(stats, "normalize", _normalize(batches, fields))
+    batches = _metered(stats, "features", _features(batches))
+    if web:
+        batches = _metered(stats, "verify", _verify(batches, pool))
+    batches = _metered(stats, "score", _score(batches, reports))
+    batches = _metered(stats, "write", _write(batches, writer))
+
+    next_checkpoint = done + checkpoint_every
+    next_report = done + progress_every
+    start = time.perf_counter()
+    try:
+        for batch in batches:
+            for item in batch:
+                if "error" in item["result"]:
+                    errors += 1
+                else:
+                    levels[item["result"]["risk_level"]] += 1
+            done += len(batch)
+            if checkpoint and done >= next_checkpoint:
+                os.fsync(writer.stream.fileno())
+                state.update(offset=batch[-1]["offset"], line=batch[-1]["line"], rows=done,
+                             errors=errors, risk_levels=dict(levels),
+                             output_bytes=writer.stream.tell())
+                save_checkpoint(checkpoint, state)
+                next_checkpoint = done + checkpoint_every
+            if progress_every and done >= next_report:
+                rate = (done - resumed_from) / (time.perf_counter() - start)
+                print(f"… {done:,} scored · {rate:,.0f} postings/s · {stats.line()}", file=log)
+                next_report = done + progress_every
+    finally:
+        writer.close()
+        if pool:
+            pool.shutdown(cancel_futures=True)
+    if checkpoint and os.path.exists(checkpoint):
+        os.remove(checkpoint)
+
+    elapsed = time.perf_counter() - start
+    scored = done - resumed_from
+    return {
+        "postings": done, "errors": errors, "seconds": round(elapsed, 3),
+        "postings_per_second": round(scored / elapsed, 1) if elapsed else None,
+        "risk_levels": {k: levels[k] for k in ("LOW", "MEDIUM", "HIGH")},
+        "resumed_from_row": resumed_from or None,
+        "stages": stats.summary(),
+    }
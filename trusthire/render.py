@@ -0,0 +1,161 @@
+"""
+Text and HTML renderings of a scored posting: highlighted keywords, the
+AI-style explanation, safe job-portal links and the downloadable report.
+"""
+
+import functools
+import html
+import re
+from datetime import datetime
+
+from .features import extract_features
+from .keywords import ALL_SCAM_KEYWORDS
+
+
+def _trie_pattern(keywords):
+    """Regex source for a keyword trie; the greedy optional tail makes it longest-first."""
+    trie = {}
+    for kw in keywords:
+        node = trie
+        for ch in kw:
+            node = node.setdefault(ch, {})
+        node[""] = {}
+
+    def emit(node):
+        alts = [re.escape(ch) + emit(child) for ch, child in sorted(node.items()) if ch]
+        if not alts:
+            return ""
+        body = alts[0] if len(alts) == 1 else "(?:" + "|".join(alts) + ")"
+        return f"(?:{body})?" if "" in node else body
+
+    return emit(trie)
+
+
+@functools.lru_cache(maxsize=None)
+def _highlight_re():
+    """Compiled on first use so importing this module costs nothing."""
+    return re.compile(_trie_pattern(set(ALL_SCAM_KEYWORDS)), re.IGNORECASE)
+
+
+def find_scam_word_spans(text):
+    """Leftmost-longest, non-overlapping ``(start, end)`` spans of scam keywords."""
+    return [m.span() for m in _highlight_re().finditer(text)]
+
+
+def highlight_scam_words(text):
+    parts = []
+    pos = 0
+    for start, end in find_scam_word_spans(text):
+        parts.append(html.escape(text[pos:start], quote=False))
+        parts.append(f'<span class="scam-word">{text[start:end].upper()}</span>')
+        pos = end
+    parts.append(html.escape(text[pos:], quote=False))
+    return "".join(parts)
+
+
+def generate_ai_explanation(score, reasons, verifications):
+    if score <= 30:
+        o = ("✅ **Low Risk Assessment:** This job posting appears mostly "
+             "legitimate. Our analysis including live web verification found no major red flags.")
+    elif score <= 60:
+        o = ("⚠️ **Moderate Risk Assessment:** This posting raises concerns. "
+             "Some elements are commonly associated with scam listings.")
+    else:
+        o = ("🚨 **High Risk Assessment:** This posting displays **multiple "
+             "strong scam indicators**. Our analysis flagged characteristics "
+             "overwhelmingly associated with known fraud patterns.")
+    secs = []
+    if reasons:
+        secs.append(f"\n\n**🔎 Issues ({len(reasons)}):**\n" + "\n".join(f"  - {r}" for r in reasons))
+    if verifications:
+        secs.append(f"\n\n**🌐 Verification:**\n" + "\n".join(f"  - {v}" for v in verifications))
+    tips = ("\n\n**🛡️ Recommendations:**\n"
+            "  - Verify company via official website & LinkedIn\n"
+            "  - Search government business registries (MCA, SEC)\n"
+            "  - Never pay money upfront for a job\n"
+            "  - Check reviews on Glassdoor / AmbitionBox\n"
+            "  - If too good to be true, it probably is")
+    conf = f"\n\n**🎯 Confidence:** {min(70 + len(reasons)*4 + len(verifications)*8, 98)}%"
+    return o + "".join(secs) + tips + conf
+
+
+def generate_safe_job_links(job_text):
+    """Generate links to trusted job portals based on keywords from the job description."""
+    features = extract_features(job_text)
+    # Job title / role keywords, found in the same pass as the scam keywords
+    role_keywords = features.keyword_hits["role"]
+
+    # Build a search query from found keywords (max 3)
+    if role_keywords:
+        search_query = " ".join(role_keywords[:3])
+    else:
+        # Fallback: extract first few meaningful words
+        words = [w for w in features.lead_words if len(w) > 3 and w.isalpha()]
+        search_query = " ".join(words[:3]) if words else "jobs"
+    
+    from urllib.parse import quote_plus
+    query_encoded = quote_plus(search_query)
+    
+    portals = [
+        {
+            "name": "LinkedIn Jobs",
+            "icon": "💼",
+            "url": f"https://www.linkedin.com/jobs/search/?keywords={query_encoded}",
+            "description": "Professional network with verified company profiles",
+            "trust": "⭐⭐⭐⭐⭐",
+        },
+        {
+            "name": "Indeed",
+            "icon": "🔍",
+            "url": f"https://www.indeed.com/jobs?q={query_encoded}",
+            "description": "World's largest job search engine with company reviews",
+            "trust": "⭐⭐⭐⭐⭐",
+        },
+        {
+            "name": "Glassdoor",
+            "icon": "🏢",
+            "url": f"https://www.glassdoor.com/Job/jobs.htm?sc.keyword={query_encoded}",
+            "description": "Jobs with salary data and employee reviews",
+            "trust": "⭐⭐⭐⭐⭐",
+        },
+        {
+            "name": "Naukri.com",
+            "icon": "🇮🇳",
+            "url": f"https://www.naukri.com/{query_encoded.replace('+', '-')}-jobs",
+            "description": "India's #1 job portal with verified employers",
+            "trust": "⭐⭐⭐⭐",
+        },
+        {
+            "name": "Google Jobs",
+            "icon": "🌐",
+            "url": f"https://www.google.com/search?q={query_encoded}+jobs&ibp=htl;jobs",
+            "description": "Aggregated listings from multiple trusted sources",
+            "trust": "⭐⭐⭐⭐⭐",
+        },
+        {
+            "name": "Monster",
+            "icon": "👾",
+            "url": f"https://www.monster.com/jobs/search?q={query_encoded}",
+            "description": "Established job board with career resources",
+            "trust": "⭐⭐⭐⭐",
+        },
+    ]
+    return portals, search_query
+
+
+def generate_report_txt(job_text, email, company, score, risk_level, reasons, verifications):
+    ts = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    lines = [
+        "=" * 56, "    🛡️ TrustHire AI – Scam Risk Report", "=" * 56,
+        f"  Generated : {ts}", f"  Risk Score: {score}/100 ({risk_level})",
+        "-" * 56, "", "📋 JOB DESCRIPTION:", "-" * 40,
+        job_text or "(none)", "", f"📧 EMAIL : {email or '(none)'}",
+        f"🏢 COMPANY: {company or '(none)'}", "", "-" * 56,
+        "🔎 RED FLAGS:", "-" * 40,
+    ]
+    for r in (reasons or ["✅ (none)"]): lines.append(f"  • {r}")
+    if verifications:
+        lines += ["", "🌐 VERIFICATION:", "-" * 40]
+        for v in verifications: lines.append(f"  • {v}")
+    lines += ["", "=" * 56, "  Report by TrustHire AI v1.0"]
+    return "\n".join(lines)
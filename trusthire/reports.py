@@ -0,0 +1,306 @@
+"""
+User scam reports: an indexed SQLite store plus the scoring-time lookup.
+
+Every identifier in the store (normalized email, email domain, phone,
+link host) is also in a Bloom filter kept beside the database. A lookup
+goes to SQLite only for identifiers the filter says may be reported.
+Most scans match nothing, so they never touch the database. Only saving
+a report writes the filter file; lookups catch up in memory.
+"""
+
+import json
+import os
+import re
+import threading
+import time
+from urllib.parse import urlparse
+
+from .blobstore import TEXT_STORE
+from .bloom import BloomFilter
+from .keywords import FREE_EMAIL_DOMAINS
+
+
+REPORTS_FILE = "scam_reports.json"          # legacy list format, imported on first open
+REPORTS_DB = "scam_reports.sqlite3"
+REPORTS_BLOOM = "scam_reports.bloom"
+BLOOM_MIN_CAPACITY = 100_000                # identifiers; ~120 KB at 1% false positives
+BLOOM_RECHECK_SECONDS = 1.0                 # how soon reports saved by other processes are seen
+
+# Big job portals: a reported link on these says nothing about other postings
+SHARED_LINK_HOSTS = {
+    "linkedin.com", "indeed.com", "glassdoor.com", "naukri.com",
+    "google.com", "monster.com", "forms.gle", "docs.google.com",
+}
+_PHONE_RE = re.compile(r'[\+]?[\d\-\s]{10,}')
+_LINK_RE = re.compile(r'(?:https?://|www\.)[^\s<>"\')]+', re.IGNORECASE)
+# Indexed column → key in the lookup result
+_LOOKUP_COLUMNS = {"email_norm": "email", "email_domain": "email_domain",
+                   "phone_norm": "phone", "link_host": "link_host"}
+_SQL_CHUNK = 500   # values per IN (...) query, well under SQLite's parameter limit
+
+
+def normalize_email(email):
+    return email.strip().lower() if email and "@" in email else ""
+
+
+def normalize_phone(phone):
+    """Last 10 digits, so '+91 98765-43210' and '9876543210' compare equal."""
+    digits = re.sub(r"\D", "", phone or "")
+    return digits[-10:] if len(digits) >= 7 else ""
+
+
+def link_host(link):
+    link = (link or "").strip().lower()
+    if not link:
+        return ""
+    if "://" not in link:
+        link = "http://" + link
+    try:
+        host = urlparse(link).hostname or ""
+    except ValueError:
+        return ""
+    return host[4:] if host.startswith("www.") else host
+
+
+class ReportStore:
+    """User scam reports in SQLite, indexed on every identifier scoring looks up."""
+
+    def __init__(self, path=REPORTS_DB, legacy_json=REPORTS_FILE, bloom_path=REPORTS_BLOOM):
+        self.path = path
+        self.legacy_json = legacy_json
+        self.bloom_path = bloom_path
+        self._db = None
+        self._bloom = None
+        self._bloom_mtime = None
+        self._bloom_checked = 0.0
+        self._exists = False
+        self._exists_checked = float("-inf")
+        self._lock = threading.Lock()
+
+    def _conn(self):
+        if self._db is None:
+            import sqlite3   # deferred: only needed once a report exists
+            db = sqlite3.connect(self.path, timeout=5, check_same_thread=False,
+                                 isolation_level=None)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            db.execute("""CREATE TABLE IF NOT EXISTS reports (
+                id INTEGER PRIMARY KEY,
+                timestamp TEXT, job_link TEXT, email TEXT, phone TEXT,
+                details TEXT, has_screenshot INTEGER,
+                email_norm TEXT, email_domain TEXT, phone_norm TEXT, link_host TEXT,
+                text_digest TEXT)""")
+            if "text_digest" not in {row[1] for row in db.execute("PRAGMA table_info(reports)")}:
+                db.execute("ALTER TABLE reports ADD COLUMN text_digest TEXT")
+            for col in ("email_norm", "email_domain", "phone_norm", "link_host"):
+                db.execute(f"CREATE INDEX IF NOT EXISTS reports_{col} ON reports({col})")
+            self._db = db
+            self._import_legacy()
+        return self._db
+
+    def _import_legacy(self):
+        """One-time import of the old ``scam_reports.json`` list."""
+        if not self.legacy_json or not os.path.exists(self.legacy_json):
+            return
+        with open(self.legacy_json, "r", encoding="utf-8") as f:
+            try: reports = json.load(f)
+            except json.JSONDecodeError: reports = []
+        self._db.execute("BEGIN")
+        for report in reports:
+            self._insert(report)
+        self._db.execute("COMMIT")
+        os.replace(self.legacy_json, self.legacy_json + ".migrated")
+
+    def _insert(self, report):
+        email = normalize_email(report.get("email", ""))
+        text = report.get("job_text")
+        digest = TEXT_STORE.put(text) if text else report.get("text_digest")
+        self._db.execute(
+            "INSERT INTO reports (timestamp, job_link, email, phone, details, has_screenshot,"
+            " email_norm, email_domain, phone_norm, link_host, text_digest)"
+            " VALUES (?,?,?,?,?,?,?,?,?,?,?)",
+            (report.get("timestamp"), report.get("job_link"), report.get("email"),
+             report.get("phone"), report.get("details"), int(bool(report.get("has_screenshot"))),
+             email or None, email.split("@")[-1] if email else None,
+             normalize_phone(report.get("phone")) or None,
+             link_host(report.get("job_link")) or None, digest))
+
+    def add(self, report):
+        with self._lock:
+            self._conn()
+            self._insert(report)
+            self._sync_bloom(write=True)
+
+    # ── Bloom filter over the indexed identifiers ──
+
+    def _sync_bloom(self, write=False):
+        """Load the filter from disk if another process changed it, add any
+        reports it doesn't cover yet, grow it past capacity; with ``write``
+        (only when saving a report) write it back. Lookups never write."""
+        bloom = self._bloom
+        mtime = _mtime(self.bloom_path)
+        if mtime is not None and mtime != self._bloom_mtime:
+            try:
+                disk = BloomFilter.load(self.bloom_path)
+            except (OSError, ValueError):
+                disk = None
+            if disk is not None and (bloom is None or disk.watermark >= bloom.watermark):
+                bloom = disk
+        db = self._conn()
+        if bloom is None:
+            n = db.execute("SELECT COUNT(*) FROM reports").fetchone()[0]
+            bloom = BloomFilter(max(BLOOM_MIN_CAPACITY, 8 * n))   # ~4 identifiers a report, 2× headroom
+        start = bloom.watermark
+        self._fill_bloom(bloom, db)
+        if bloom.count > bloom.capacity:
+            bloom = BloomFilter(2 * bloom.count)
+            self._fill_bloom(bloom, db)
+        if write and (bloom.watermark != start or mtime is None):
+            bloom.flush(self.bloom_path)
+            mtime = _mtime(self.bloom_path)
+        self._bloom, self._bloom_mtime = bloom, mtime
+        self._bloom_checked = time.monotonic()
+        return bloom
+
+    @staticmethod
+    def _fill_bloom(bloom, db):
+        cols = ", ".join(_LOOKUP_COLUMNS)
+        for row in db.execute(f"SELECT id, {cols} FROM reports WHERE id > ? ORDER BY id",
+                              (bloom.watermark,)):
+            for col, value in zip(_LOOKUP_COLUMNS, row[1:]):
+                if value:
+                    bloom.add(f"{col}:{value}")
+            bloom.watermark = row[0]
+
+    def _current_bloom(self):
+        if self._bloom is not None and time.monotonic() - self._bloom_checked < BLOOM_RECHECK_SECONDS:
+            return self._bloom
+        if self._bloom is None or _mtime(self.bloom_path) != self._bloom_mtime:
+            return self._sync_bloom()
+        self._bloom_checked = time.monotonic()
+        return self._bloom
+
+    def exists(self):
+        """True once there is anything to look up (database or legacy JSON on disk).
+
+        A yes is remembered; a no is rechecked at most every
+        ``BLOOM_RECHECK_SECONDS``, so per-posting calls cost no ``stat``.
+        """
+        if self._exists or self._db is not None:
+            return True
+        now = time.monotonic()
+        if now - self._exists_checked >= BLOOM_RECHECK_SECONDS:
+            self._exists_checked = now
+            self._exists = os.path.exists(self.path) or bool(
+                self.legacy_json and os.path.exists(self.legacy_json))
+        return self._exists
+
+    def count(self):
+        with self._lock:
+            return self._conn().execute("SELECT COUNT(*) FROM reports").fetchone()[0]
+
+    def iter_reports(self):
+        """All reports oldest-first, as dicts with the fields ``add`` was given.
+
+        A reported posting's text comes back as its ``text_digest`` in
+        ``blobstore.TEXT_STORE``, not as ``job_text``.
+        """
+        if not self.exists():
+            return
+        with self._lock:
+            rows = self._conn().execute(
+                "SELECT timestamp, job_link, email, phone, details, has_screenshot, text_digest"
+                " FROM reports ORDER BY id").fetchall()
+        for ts, link, email, phone, details, shot, digest in rows:
+            report = {"timestamp": ts, "job_link": link, "email": email, "phone": phone,
+                      "details": details, "has_screenshot": bool(shot)}
+            if digest:
+                report["text_digest"] = digest
+            yield report
+
+    def text_digests(self):
+        """Digests of every reported posting text, for ``history.prune_text_store``."""
+        if not self.exists():
+            return set()
+        with self._lock:
+            return {d for d, in self._conn().execute(
+                "SELECT DISTINCT text_digest FROM reports WHERE text_digest IS NOT NULL")}
+
+    @staticmethod
+    def _lookup_keys(email, phones, links):
+        keys = {
+            "email_norm": {normalize_email(email)} - {""},
+            "email_domain": set(),
+            "phone_norm": {normalize_phone(p) for p in phones} - {""},
+            "link_host": {link_host(l) for l in links} - {""} - SHARED_LINK_HOSTS,
+        }
+        dom = normalize_email(email).split("@")[-1]
+        if dom and dom not in FREE_EMAIL_DOMAINS:
+            keys["email_domain"].add(dom)
+        return keys
+
+    def lookup(self, email="", phones=(), links=()):
+        """Count prior reports per identifier; only identifiers with hits are returned.
+
+        Returns ``{"email": {addr: n}, "email_domain": {dom: n},
+        "phone": {digits: n}, "link_host": {host: n}}``.
+        """
+        return self.lookup_many([(email, phones, links)])[0]
+
+    def lookup_many(self, queries):
+        """``lookup`` for a list of ``(email, phones, links)`` with one query per
+        column for the whole list, not one per value."""
+        keyed = [self._lookup_keys(*q) for q in queries]
+        results = [{"email": {}, "email_domain": {}, "phone": {}, "link_host": {}} for _ in keyed]
+        wanted = {col: set().union(*(keys[col] for keys in keyed)) for col in _LOOKUP_COLUMNS}
+        if not any(wanted.values()):
+            return results
+        if not self.exists():
+            return results   # nothing reported yet; don't create the database just to look
+        counts = {col: {} for col in wanted}
+        with self._lock:
+            bloom = self._current_bloom()
+            wanted = {col: [v for v in values if f"{col}:{v}" in bloom] for col, values in wanted.items()}
+            if not any(wanted.values()):
+                return results
+            db = self._conn()
+            for col, values in wanted.items():
+                for i in range(0, len(values), _SQL_CHUNK):
+                    chunk = values[i:i + _SQL_CHUNK]
+                    counts[col].update(db.execute(
+                        f"SELECT {col}, COUNT(*) FROM reports WHERE {col} IN"
+                        f" ({','.join('?' * len(chunk))}) GROUP BY {col}", chunk))
+        for keys, found in zip(keyed, results):
+            for col, values in keys.items():
+                for value in values:
+                    if counts[col].get(value):
+                        found[_LOOKUP_COLUMNS[col]][value] = counts[col][value]
+        return results
+
+
+def _mtime(path):
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+
+REPORT_STORE = ReportStore()
+
+
+def lookup_prior_reports(job_text, email, job_url=None):
+    """Prior reports matching the posting's email, phone numbers and links.
+
+    Pass the result to ``calculate_risk_score(prior_reports=...)``.
+    """
+    if not REPORT_STORE.exists():
+        return REPORT_STORE.lookup()
+    phones = _PHONE_RE.findall(job_text)
+    links = _LINK_RE.findall(job_text)
+    if job_url:
+        links.append(job_url)
+    return REPORT_STORE.lookup(email, phones, links)
+
+
+def save_scam_report(report):
+    REPORT_STORE.add(report)
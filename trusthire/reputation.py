@@ -0,0 +1,284 @@
+"""
+Domain reputation: allow / deny / free-mail / suspicious-TLD verdicts,
+looked up before any DNS or HTTP probe.
+
+Large lists (millions of domains) are compiled offline into one binary
+file that is memory-mapped read-only. Lookups go through an open-addressing
+hash table inside the mapping (crc32, linear probing, at most half full),
+so nothing is loaded up front, a verdict takes a few microseconds, and
+every worker process shares the same page-cache pages:
+
+    python -m trusthire.reputation build -o domain_reputation.db \\
+        --allow top-sites.txt --deny phishing.txt --free-mail free.txt
+    python -m trusthire.reputation lookup jobs.example.xyz gmail.com
+
+A domain matches its own entry or the nearest parent's
+(``careers.acme.com`` → ``acme.com`` → ``com``). The built-in free-mail
+providers and suspicious TLDs apply with or without a file.
+
+File layout (little-endian): ``b"THREPDB1"``, entry count ``n`` and slot
+count ``m`` (u64 each), ``m`` u32 hash slots (entry number + 1, 0 when
+empty), ``n + 1`` u32 offsets into the entry blob, then the entries sorted
+by key, each the IDNA-encoded domain followed by one verdict byte.
+"""
+
+import argparse
+import logging
+import mmap
+import os
+import struct
+import sys
+import threading
+import time
+import zlib
+from array import array
+
+from .keywords import FREE_EMAIL_DOMAINS
+
+REPUTATION_FILE = "domain_reputation.db"
+RELOAD_CHECK_SECONDS = 30     # how often a running process notices a rebuilt file
+SUSPICIOUS_TLDS = ("xyz", "top", "buzz", "click", "link", "work", "gq", "ml", "tk", "cf", "ga")
+
+# Verdict codes; when lists disagree about a domain the higher code wins
+VERDICTS = {1: "allow", 2: "free_mail", 3: "suspicious", 4: "deny"}
+_CODES = {name: code for code, name in VERDICTS.items()}
+_MAGIC = b"THREPDB1"
+_HEADER = struct.Struct("<8sQQ")
+
+_log = logging.getLogger(__name__)
+
+
+def normalize_domain(name):
+    """Lowercase IDNA key for a host, list entry or URL netloc; None if it is not a domain."""
+    name = name.strip().lower().rpartition("@")[2]
+    if not name or name.startswith("["):
+        return None   # empty, or an IPv6 literal
+    name = name.split(":")[0].lstrip("*.").rstrip(".")
+    try:
+        key = name.encode("ascii") if name.isascii() else name.encode("idna")
+    except UnicodeError:
+        return None
+    return key if key and b" " not in key else None
+
+
+def _parents(key):
+    """``key`` and each parent domain, most specific first."""
+    while True:
+        yield key
+        dot = key.find(b".")
+        if dot < 0:
+            return
+        key = key[dot + 1:]
+
+
+_BUILTIN = {normalize_domain(d): _CODES["free_mail"] for d in FREE_EMAIL_DOMAINS}
+_BUILTIN.update({tld.encode(): _CODES["suspicious"] for tld in SUSPICIOUS_TLDS})
+
+
+class _MappedTable:
+    """Read-only view of a compiled reputation file."""
+
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            self.stat = os.fstat(f.fileno())
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            magic, self.count, slots = _HEADER.unpack_from(self._mm)
+            if magic != _MAGIC:
+                raise ValueError(f"{path} is not a domain reputation file")
+            offsets_at = _HEADER.size + 4 * slots
+            self._blob = offsets_at + 4 * (self.count + 1)
+            if slots & (slots - 1) or self._blob > len(self._mm):
+                raise ValueError(f"{path} is truncated or corrupt")
+            self._slots = self._u32(_HEADER.size, offsets_at)
+            self._offsets = self._u32(offsets_at, self._blob)
+            if self._blob + self._offsets[self.count] > len(self._mm):
+                raise ValueError(f"{path} is truncated or corrupt")
+        except (ValueError, struct.error):
+            self._slots = self._offsets = None   # release the views before closing
+            self._mm.close()
+            raise
+        self._mask = slots - 1
+
+    def _u32(self, start, stop):
+        view = memoryview(self._mm)[start:stop]
+        if sys.byteorder == "little":
+            return view.cast("I")
+        table = array("I")   # big-endian hosts read a swapped copy
+        table.frombytes(view)
+        table.byteswap()
+        return table
+
+    def get(self, key):
+        mm, slots, offsets, blob, mask = self._mm, self._slots, self._offsets, self._blob, self._mask
+        h = zlib.crc32(key) & mask
+        while True:
+            entry = slots[h]
+            if not entry:
+                return None
+            start, end = offsets[entry - 1], offsets[entry]
+            if end - start == len(key) + 1 and mm[blob + start:blob + end - 1] == key:
+                return mm[blob + end - 1]
+            h = (h + 1) & mask
+
+
+class DomainReputation:
+    """Verdicts from the compiled file (when present) plus the built-in lists."""
+
+    def __init__(self, path=REPUTATION_FILE):
+        self.path = path
+        self._table = None
+        self._bad = None          # (inode, mtime) of a file that failed to load
+        self._checked = 0.0
+        self._lock = threading.Lock()
+
+    def _current(self):
+        now = time.monotonic()
+        if now - self._checked < RELOAD_CHECK_SECONDS:
+            return self._table
+        with self._lock:
+            if now - self._checked >= RELOAD_CHECK_SECONDS:
+                self._reload()
+                self._checked = now
+        return self._table
+
+    def _reload(self):
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            self._table = None
+            return
+        old = self._table
+        ident = (st.st_ino, st.st_mtime_ns)
+        if ident == self._bad or old is not None and (old.stat.st_ino, old.stat.st_mtime_ns) == ident:
+            return
+        try:
+            self._table = _MappedTable(self.path)   # lookups still running keep the old mapping alive
+        except (OSError, ValueError, struct.error) as e:
+            # A bad build must not break every verifier: keep what was loaded
+            # (or just the built-in lists) and try again once the file changes.
+            self._bad = ident
+            _log.error("domain reputation file %s not loaded, keeping the previous lists: %s",
+                       self.path, e)
+
+    def reload(self):
+        """Pick up a rebuilt file now instead of within ``RELOAD_CHECK_SECONDS``."""
+        with self._lock:
+            self._reload()
+            self._checked = time.monotonic()
+
+    def match(self, domain):
+        """``(matched domain, verdict)`` for the nearest listed suffix, or None."""
+        key = normalize_domain(domain or "")
+        if key is None:
+            return None
+        table = self._current()
+        for suffix in _parents(key):
+            code = table.get(suffix) if table is not None else None
+            if code is None:
+                code = _BUILTIN.get(suffix)
+            if code is not None:
+                return suffix.decode("ascii"), VERDICTS[code]
+        return None
+
+    def version(self):
+        """Token that changes whenever the compiled file does; keys caches of verdicts."""
+        table = self._current()
+        return "builtin" if table is None else f"{table.stat.st_ino}-{table.stat.st_mtime_ns}"
+
+    def lookup(self, domain):
+        """``"allow"``, ``"deny"``, ``"free_mail"``, ``"suspicious"`` or None."""
+        found = self.match(domain)
+        return found[1] if found else None
+
+    def __len__(self):
+        table = self._current()
+        return (table.count if table is not None else 0) + len(_BUILTIN)
+
+
+DOMAIN_REPUTATION = DomainReputation()
+
+
+# ─────────────────────────────────────────────
+# OFFLINE BUILD
+# ─────────────────────────────────────────────
+
+def _list_entries(path):
+    """Domains from a list file: one per line, ``#`` comments, hosts-file lines allowed."""
+    with open(path, "r", encoding="utf-8", errors="replace") as f:
+        for line in f:
+            fields = line.split("#", 1)[0].split()
+            if fields:
+                key = normalize_domain(fields[-1])
+                if key is not None:
+                    yield key
+
+
+def build_reputation_db(path, sources):
+    """Compile ``{verdict: [list files]}`` into ``path``; returns the entry count.
+
+    The file is written beside ``path`` and swapped in atomically, so a
+    process that has the old one mapped keeps reading it undisturbed.
+    """
+    entries = {}
+    for verdict, files in sources.items():
+        code = _CODES[verdict]
+        for list_path in files:
+            for key in _list_entries(list_path):
+                if entries.get(key, 0) < code:
+                    entries[key] = code
+    keys = sorted(entries)
+    offsets = [0]
+    for key in keys:
+        offsets.append(offsets[-1] + len(key) + 1)
+    if offsets[-1] >= 2**32:
+        raise ValueError("reputation lists too large for one file (4 GiB of entries)")
+    size = 2
+    while size < 2 * len(keys):
+        size *= 2
+    slots = array("I", bytes(4 * size))
+    mask = size - 1
+    for number, key in enumerate(keys, 1):
+        h = zlib.crc32(key) & mask
+        while slots[h]:
+            h = (h + 1) & mask
+        slots[h] = number
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(_HEADER.pack(_MAGIC, len(keys), size))
+        f.write(struct.pack(f"<{size}I", *slots))
+        f.write(struct.pack(f"<{len(offsets)}I", *offsets))
+        for key in keys:
+            f.write(key + bytes((entries[key],)))
+    os.replace(tmp, path)
+    return len(keys)
+
+
+def main(argv=None):
+    p = argparse.ArgumentParser(prog="python -m trusthire.reputation",
+                                description="Build or query the domain reputation file.")
+    sub = p.add_subparsers(dest="command", required=True)
+    b = sub.add_parser("build", help="compile domain lists into a reputation file")
+    b.add_argument("-o", "--output", default=REPUTATION_FILE)
+    for verdict in ("allow", "deny", "free_mail", "suspicious"):
+        b.add_argument(f"--{verdict.replace('_', '-')}", dest=verdict, action="append", default=[],
+                       metavar="FILE", help=f"list of {verdict.replace('_', ' ')} domains (repeatable)")
+    q = sub.add_parser("lookup", help="print the verdict for domains")
+    q.add_argument("domains", nargs="+")
+    q.add_argument("--db", default=REPUTATION_FILE)
+    args = p.parse_args(argv)
+
+    if args.command == "build":
+        t0 = time.perf_counter()
+        n = build_reputation_db(args.output, {v: getattr(args, v) for v in VERDICTS.values()})
+        print(f"✅ {n:,} domains → {args.output} in {time.perf_counter() - t0:.1f}s", file=sys.stderr)
+        return 0
+    reputation = DomainReputation(args.db)
+    for domain in args.domains:
+        found = reputation.match(domain)
+        print(f"{domain}\t{found[1] if found else '-'}\t{found[0] if found else ''}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
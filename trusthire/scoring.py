@@ -0,0 +1,211 @@
+"""
+Rule-based scam risk scoring.
+
+Scoring reads no files: prior user reports count only when the caller
+looks them up (``reports.lookup_prior_reports``) and passes the result in.
+"""
+
+from .features import extract_features
+from .keywords import FREE_EMAIL_DOMAINS
+
+COMPANY_POINTS = {"verified": 0, "partial": 25, "unknown": 30, "not_found": 50, "missing": 50}
+
+VERIFY_LABELS = {
+    "company_check": "Company verification",
+    "email_check": "Email domain check",
+    "url_check": "URL safety check",
+}
+
+
+# ═════════════════════════════════════════════
+# SCORING ENGINE — 50/50 WEIGHTED
+#   Company verification  = 50 points (50%)
+#   Email + Description   = 50 points (50%)
+# ═════════════════════════════════════════════
+
+def calculate_risk_score(job_text, email, company, web_checks=None, near_duplicate=None,
+                         features=None, prior_reports=None):
+    text_reasons = []
+    verification_results = []
+    features = features or extract_features(job_text)
+    raw = 0
+    kw_hits = features.keyword_hits
+
+    hits = kw_hits["payment"]
+    if hits:
+        raw += 30; text_reasons.append(f"💳 Payment/fee demands: {', '.join(hits)}")
+    hits = kw_hits["urgency"]
+    if hits:
+        raw += 20; text_reasons.append(f"⚡ Urgency/pressure tactics: {', '.join(hits)}")
+    hits = kw_hits["personal_info"]
+    if hits:
+        raw += 25; text_reasons.append(f"🔓 Requests sensitive data: {', '.join(hits)}")
+    hits = kw_hits["too_good"]
+    if hits:
+        raw += 20; text_reasons.append(f"🌈 Unrealistic promises: {', '.join(hits)}")
+    hits = kw_hits["mlm"]
+    if hits:
+        raw += 25; text_reasons.append(f"🔺 MLM/pyramid indicators: {', '.join(hits)}")
+    hits = kw_hits["vague_role"]
+    if hits:
+        raw += 15; text_reasons.append(f"📝 Vague job descriptions: {', '.join(hits)}")
+    hits = kw_hits["contact"]
+    if hits:
+        raw += 10; text_reasons.append(f"📱 Informal communication: {', '.join(hits)}")
+
+    # Salary anomaly
+    if features.salary_lpa and features.mentions_fresher:
+        for s in features.salary_lpa:
+            if int(s) > 8:
+                raw += 20; text_reasons.append(f"💰 Unrealistic salary ({s} LPA) for freshers"); break
+    for m in features.dollar_amounts:
+        v = int(m.replace(",", ""))
+        if v > 5000 and features.mentions_week_or_daily:
+            raw += 20; text_reasons.append(f"💰 Suspiciously high pay (${m}/week or /day)"); break
+
+    # Free email
+    if email:
+        dom = email.lower().strip().split("@")[-1] if "@" in email else ""
+        if dom and dom in FREE_EMAIL_DOMAINS:
+            raw += 15; text_reasons.append(f"📧 Recruiter uses free email (@{dom})")
+
+    # Text quality checks
+    if features.word_count:
+        cr = features.caps_ratio
+        if cr > 0.25:
+            raw += 10; text_reasons.append(f"🔠 Excessive ALL-CAPS ({int(cr*100)}% of words)")
+    if features.exclamations >= 4:
+        raw += 8; text_reasons.append(f"❗ Excessive exclamation marks ({features.exclamations} found)")
+    wc = features.word_count
+    if 0 < wc < 30:
+        raw += 10; text_reasons.append(f"📏 Very short description ({wc} words)")
+    if not kw_hits["qualification"] and wc > 10:
+        raw += 8; text_reasons.append("🎓 No educational/skill requirements mentioned")
+    hits = kw_hits["no_interview"]
+    if hits:
+        raw += 15; text_reasons.append(f"🚫 Bypasses hiring process: {', '.join(hits)}")
+    if features.phone_count >= 2:
+        raw += 5; text_reasons.append(f"📞 Multiple phone numbers listed")
+    hits = kw_hits["commission"]
+    if hits:
+        raw += 12; text_reasons.append(f"💸 Commission/incentive-only pay: {', '.join(hits)}")
+    if not company or not company.strip():
+        raw += 10; text_reasons.append("🏢 No company name provided")
+
+    # Scale to 50-point budget
+    text_score = min(50, int((raw / 200) * 50)) if raw > 0 else 0
+
+    # ── Company verification (50 points, see COMPANY_POINTS) ──
+    company_status = "unknown"  # track for UI alert
+    timed_out = web_checks.get("timed_out", []) if web_checks else []
+    failed = web_checks.get("failed", []) if web_checks else []
+    skipped = web_checks.get("skipped", []) if web_checks else []
+
+    if not company or not company.strip():
+        company_status = "missing"
+        verification_results.append("❌ No company name provided — cannot verify online")
+    elif web_checks and "company_check" in web_checks:
+        cc = web_checks["company_check"]
+        if cc["found"] and cc["website_live"]:
+            company_status = "verified"
+            verification_results.append(f"✅ VERIFIED: {cc['details']}")
+        elif cc["found"] and not cc["website_live"]:
+            company_status = "partial"
+            verification_results.append(f"⚠️ {cc['details']}")
+            text_reasons.append("⚠️ Company domain exists but website is not reachable")
+        else:
+            company_status = "not_found"
+            verification_results.append(f"❌ {cc['details']}")
+            text_reasons.append(f"🌐 Company NOT found online — '{company}' has no web presence")
+    else:
+        company_status = "unknown"
+        if "company_check" not in timed_out + failed + skipped:
+            verification_results.append("⚠️ Company verification was not performed")
+
+    # Email domain verification bonus
+    if web_checks and "email_check" in web_checks and email:
+        ec = web_checks["email_check"]
+        if ec["is_free"]:
+            verification_results.append(f"⚠️ Email uses free provider (@{ec['domain']})")
+        elif ec.get("reputation") == "deny":
+            text_score = min(50, text_score + 10)
+            text_reasons.append(f"🚩 Email domain @{ec['domain']} is on the scam domain list")
+            verification_results.append(f"❌ Email domain @{ec['domain']} is a known scam domain")
+        elif ec["valid_domain"]:
+            text_score = max(0, text_score - 5)
+            verification_results.append(f"✅ Email domain @{ec['domain']} is valid (DNS verified)")
+        else:
+            text_score = min(50, text_score + 10)
+            text_reasons.append(f"🌐 Email domain @{ec['domain']} does NOT exist (DNS failed)")
+            verification_results.append(f"❌ Email domain @{ec['domain']} has no DNS records")
+
+    # URL check results
+    if web_checks and "url_check" in web_checks:
+        uc = web_checks["url_check"]
+        for r in uc["reasons"]:
+            verification_results.append(r)
+            if r.startswith("❌"):
+                text_score = min(50, text_score + 5)
+                text_reasons.append(r)
+
+    # Previously reported by other users (when the caller looked it up)
+    if prior_reports:
+        prior = prior_reports
+        direct = [(f"email {k}", n) for k, n in prior["email"].items()]
+        direct += [(f"phone …{k[-4:]}", n) for k, n in prior["phone"].items()]
+        direct += [(f"link host {k}", n) for k, n in prior["link_host"].items()]
+        if direct:
+            text_score = min(50, text_score + 20)
+            text_reasons.append("🚩 Previously reported as a scam: "
+                                + ", ".join(f"{what} ({n}×)" for what, n in direct))
+        elif prior["email_domain"]:
+            text_score = min(50, text_score + 10)
+            text_reasons.append("🚩 Email domain previously reported: "
+                                + ", ".join(f"@{d} ({n}×)" for d, n in prior["email_domain"].items()))
+
+    # Lightly edited repost of a known scam (see neardup.known_scam_match)
+    if near_duplicate:
+        text_score = min(50, text_score + 15)
+        what = ("a reported scam" if near_duplicate["kind"] == "report"
+                else f"a posting rated {near_duplicate['risk_level']} ({near_duplicate['score']}/100)")
+        text_reasons.append(f"♻️ Near-duplicate of {what} — {near_duplicate['similarity']:.0%} similar")
+
+    for key in timed_out:
+        verification_results.append(f"⏱️ {VERIFY_LABELS.get(key, key)} timed out — not counted")
+    for key in skipped:
+        verification_results.append(f"⏭️ {VERIFY_LABELS.get(key, key)} skipped — matches a known scam template")
+    for key in failed:
+        verification_results.append(f"⚠️ {VERIFY_LABELS.get(key, key)} failed — not counted")
+
+    score = max(0, min(COMPANY_POINTS[company_status] + text_score, 100))
+    return score, risk_level_of(score), text_reasons, verification_results, company_status
+
+
+def risk_level_of(score):
+    return "LOW" if score <= 30 else ("MEDIUM" if score <= 60 else "HIGH")
+
+
+def text_risk_level(score, company_status):
+    """Risk level of the text half alone, scaled to 100 points.
+
+    ``score`` and ``company_status`` come from one ``calculate_risk_score``
+    call; the company points are taken back out, so a posting is not HIGH
+    here just because its company could not be verified.
+    """
+    return risk_level_of(2 * (score - COMPANY_POINTS[company_status]))
+
+
+def score_posting(posting, web_checks=None, features=None, prior_reports=None):
+    """Score one ``{"job_text", "email", "company", "job_url"}`` dict.
+
+    Returns the result as a dict — the shape the batch CLI and the HTTP
+    service emit. Missing fields count as empty. ``features`` may carry
+    ``PostingFeatures`` already extracted from the same text;
+    ``prior_reports`` is a ``lookup_prior_reports`` result. ``job_url``
+    counts only through those two: it is not read here.
+    """
+    score, risk_level, reasons, verifications, company_status = calculate_risk_score(
+        posting.get("job_text") or "", posting.get("email") or "", posting.get("company") or "",
+        web_checks, features=features, prior_reports=prior_reports)
+    return {"score": score, "risk_level": risk_level, "company_status": company_status,
+            "reasons": reasons, "verifications": verifications}
@@ -0,0 +1,361 @@
+"""
+Local HTTP scoring service
+==========================
+Stdlib-only JSON API around the same engine the Streamlit app uses:
+
+    python -m trusthire.server --port 8765 --workers 4
+
+    GET  /health          liveness + counters
+    GET  /metrics         Prometheus text: request latency per route
+    POST /score           {"job_text", "email", "company", "job_url", "web": false, "reports": false}
+    POST /score/batch     {"postings": [{...}, ...], "web": false, "reports": false}
+    POST /verify          {"company", "email", "job_url"}  → web_checks
+
+Connections are HTTP/1.1 keep-alive. Scoring is CPU-bound, so it runs on a
+process pool; single ``/score`` requests that arrive together are coalesced
+into one pool task (micro-batching) so per-request IPC stays small. A pool
+whose worker died is replaced on the next submit, and a request that gets
+no result within ``--score-timeout`` seconds is answered 503.
+"""
+
+import argparse
+import json
+import os
+import queue
+import sys
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeout
+from concurrent.futures.process import BrokenProcessPool
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from .keywords import keyword_automaton
+from .metrics import STAGE_METRICS
+from .scoring import score_posting
+
+MAX_BODY_BYTES = 1024 * 1024     # per request
+MAX_BATCH_POSTINGS = 1000        # per /score/batch request
+KEEPALIVE_TIMEOUT = 15           # seconds an idle keep-alive connection is held
+MAX_CONNECTIONS = 256            # concurrent client connections
+SCORE_TIMEOUT = 30               # seconds a request waits for the scoring pool
+_TEXT_FIELDS = ("job_text", "email", "company", "job_url")
+# Metric label per route; unknown paths share one so they can't grow the label set
+_ROUTE_STAGES = {"/score": "api_score", "/score/batch": "api_score_batch", "/verify": "api_verify"}
+
+
+def _score_many(postings):
+    """Pool task: score a list of ``(posting, web_checks, prior_reports)`` triples."""
+    out = []
+    for posting, web_checks, prior in postings:
+        try:
+            out.append(score_posting(posting, web_checks, prior_reports=prior))
+        except Exception as e:
+            out.append({"error": f"{type(e).__name__}: {e}"})
+    return out
+
+
+class ScoreBatcher:
+    """Coalesces concurrent single-posting requests into pool-sized batches.
+
+    A dispatcher thread takes the first waiting request, keeps collecting
+    for up to ``max_wait`` seconds or ``max_batch`` requests, and hands the
+    lot to ``submit`` (``ScoringService.submit``) as one task. If that
+    fails, the collected requests get the exception and the thread goes on.
+    """
+
+    def __init__(self, submit, max_batch=64, max_wait=0.002):
+        self.submit_task = submit
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self._queue = queue.Queue()
+        threading.Thread(target=self._run, name="score-batcher", daemon=True).start()
+
+    def submit(self, posting, web_checks=None, prior=None):
+        fut = Future()
+        self._queue.put(((posting, web_checks, prior), fut))
+        return fut
+
+    def _run(self):
+        while True:
+            items = [self._queue.get()]
+            deadline = time.monotonic() + self.max_wait
+            while len(items) < self.max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    items.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            futures = [f for _, f in items]
+            try:
+                task = self.submit_task(_score_many, [item for item, _ in items])
+            except Exception as e:
+                for fut in futures:
+                    fut.set_exception(e)
+                continue
+            task.add_done_callback(lambda t, futs=futures: self._resolve(t, futs))
+
+    @staticmethod
+    def _resolve(task, futures):
+        try:
+            results = task.result()
+        except Exception as e:
+            for fut in futures:
+                fut.set_exception(e)
+            return
+        for fut, result in zip(futures, results):
+            fut.set_result(result)
+
+
+class ScoringService:
+    """Engine side of the server: process pool, batcher, web-check threads, counters."""
+
+    def __init__(self, workers=None, web_concurrency=16, max_batch=MAX_BATCH_POSTINGS,
+                 score_timeout=SCORE_TIMEOUT):
+        keyword_automaton()   # build before forking so workers share it
+        if workers is None:
+            workers = os.cpu_count() or 1
+        self.workers = workers
+        self.score_timeout = score_timeout
+        self.pool = ProcessPoolExecutor(max_workers=workers) if workers > 0 else None
+        self._pool_lock = threading.Lock()
+        self.batcher = ScoreBatcher(self.submit) if self.pool else None
+        self.web_pool = ThreadPoolExecutor(max_workers=web_concurrency, thread_name_prefix="web")
+        self.max_batch = max_batch
+        self.counters = {"requests": 0, "postings": 0, "errors": 0}
+        self._lock = threading.Lock()
+
+    def count(self, key, n=1):
+        with self._lock:
+            self.counters[key] += n
+
+    def submit(self, fn, *args):
+        """Submit to the scoring pool, replacing it once if a worker has died."""
+        pool = self.pool
+        try:
+            return pool.submit(fn, *args)
+        except BrokenProcessPool:
+            with self._pool_lock:
+                if self.pool is pool:
+                    pool.shutdown(wait=False, cancel_futures=True)
+                    self.pool = ProcessPoolExecutor(max_workers=self.workers)
+            return self.pool.submit(fn, *args)
+
+    def _web_checks(self, posting):
+        from .verify import run_web_checks
+        return run_web_checks(posting.get("company"), posting.get("email"), posting.get("job_url"))
+
+    @staticmethod
+    def _prior_reports(posting):
+        from .reports import lookup_prior_reports
+        return lookup_prior_reports(str(posting.get("job_text") or ""), str(posting.get("email") or ""),
+                                    posting.get("job_url") or None)
+
+    def score_one(self, posting, web=False, reports=False):
+        web_checks = self._web_checks(posting) if web else None
+        prior = self._prior_reports(posting) if reports else None
+        if self.batcher is None:
+            return _score_many([(posting, web_checks, prior)])[0]
+        return self.batcher.submit(posting, web_checks, prior).result(timeout=self.score_timeout)
+
+    def score_batch(self, postings, web=False, reports=False):
+        web_checks = list(self.web_pool.map(self._web_checks, postings)) if web else [None] * len(postings)
+        priors = [self._prior_reports(p) for p in postings] if reports else [None] * len(postings)
+        pairs = list(zip(postings, web_checks, priors))
+        if self.pool is None:
+            return _score_many(pairs)
+        # Split big batches so every worker gets a share
+        size = max(1, -(-len(pairs) // self.workers))
+        chunks = [self.submit(_score_many, pairs[i:i + size]) for i in range(0, len(pairs), size)]
+        deadline = time.monotonic() + self.score_timeout
+        return [r for chunk in chunks
+                for r in chunk.result(timeout=max(0.0, deadline - time.monotonic()))]
+
+    def verify(self, body):
+        return self._web_checks(body)
+
+    def close(self):
+        if self.pool:
+            self.pool.shutdown(cancel_futures=True)
+        self.web_pool.shutdown(wait=False, cancel_futures=True)
+
+
+class _HTTPError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+def _check_posting(posting, where="Posting"):
+    """400 unless every text field of ``posting`` is a string or missing/null."""
+    for field in _TEXT_FIELDS:
+        value = posting.get(field)
+        if value is not None and not isinstance(value, str):
+            raise _HTTPError(400, f'{where} field "{field}" must be a string')
+
+
+class ScoringRequestHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"       # keep-alive by default
+    server_version = "TrustHireAI/1.0"
+    timeout = KEEPALIVE_TIMEOUT
+    disable_nagle_algorithm = True      # headers and body are separate small writes
+
+    def log_message(self, fmt, *args):
+        if self.server.verbose:
+            super().log_message(fmt, *args)
+
+    def _send_json(self, status, payload):
+        self._send(status, json.dumps(payload, ensure_ascii=False).encode("utf-8"),
+                   "application/json; charset=utf-8")
+
+    def _send(self, status, body, content_type):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _read_json(self):
+        if self.headers.get("Content-Length") is None:
+            self.close_connection = True   # can't tell where the body ends
+            raise _HTTPError(411, "Content-Length required")
+        try:
+            length = int(self.headers["Content-Length"])
+        except ValueError:
+            length = -1
+        if length < 0:
+            self.close_connection = True
+            raise _HTTPError(400, "Invalid Content-Length")
+        if length > self.server.max_body_bytes:
+            self.close_connection = True   # don't read the oversized body
+            raise _HTTPError(413, f"Body larger than {self.server.max_body_bytes} bytes")
+        try:
+            body = json.loads(self.rfile.read(length) or b"{}")
+        except (json.JSONDecodeError, UnicodeDecodeError):
+            raise _HTTPError(400, "Body is not valid JSON")
+        if not isinstance(body, dict):
+            raise _HTTPError(400, "Body must be a JSON object")
+        return body
+
+    def do_GET(self):
+        if self.path == "/health":
+            service = self.server.service
+            self._send_json(200, {"ok": True, "workers": service.workers, **service.counters})
+        elif self.path == "/metrics":
+            self._send(200, STAGE_METRICS.prometheus_text().encode("utf-8"),
+                       "text/plain; version=0.0.4; charset=utf-8")
+        else:
+            self._send_json(404, {"error": f"No route for GET {self.path}"})
+
+    def do_POST(self):
+        service = self.server.service
+        service.count("requests")
+        t0 = time.perf_counter()
+        try:
+            body = self._read_json()
+            web, reports = bool(body.get("web")), bool(body.get("reports"))
+            if self.path == "/score":
+                _check_posting(body)
+                result = service.score_one(body, web, reports)
+                if body.get("id") is not None:
+                    result = {"id": body["id"], **result}
+                service.count("postings")
+                self._send_json(200, result)
+            elif self.path == "/score/batch":
+                postings = body.get("postings")
+                if not isinstance(postings, list) or not all(isinstance(p, dict) for p in postings):
+                    raise _HTTPError(400, '"postings" must be a list of objects')
+                if len(postings) > service.max_batch:
+                    raise _HTTPError(413, f"At most {service.max_batch} postings per batch")
+                for i, posting in enumerate(postings):
+                    _check_posting(posting, f"Posting {i}")
+                results = service.score_batch(postings, web, reports)
+                for posting, result in zip(postings, results):
+                    if posting.get("id") is not None:
+                        result["id"] = posting["id"]
+                service.count("postings", len(postings))
+                self._send_json(200, {"results": results})
+            elif self.path == "/verify":
+                _check_posting(body)
+                self._send_json(200, service.verify(body))
+            else:
+                raise _HTTPError(404, f"No route for POST {self.path}")
+        except _HTTPError as e:
+            service.count("errors")
+            self._send_json(e.status, {"error": str(e)})
+        except (FutureTimeout, BrokenProcessPool) as e:
+            service.count("errors")
+            self._send_json(503, {"error": f"Scoring unavailable: {type(e).__name__}"})
+        except Exception as e:
+            service.count("errors")
+            self._send_json(500, {"error": f"{type(e).__name__}: {e}"})
+        finally:
+            STAGE_METRICS.observe(_ROUTE_STAGES.get(self.path, "api_other"), time.perf_counter() - t0)
+
+
+class ScoringHTTPServer(ThreadingHTTPServer):
+    """Thread-per-connection server with a cap on concurrent connections."""
+
+    daemon_threads = True
+    request_queue_size = 128
+
+    def __init__(self, address, service, max_body_bytes=MAX_BODY_BYTES,
+                 max_connections=MAX_CONNECTIONS, verbose=False):
+        super().__init__(address, ScoringRequestHandler)
+        self.service = service
+        self.max_body_bytes = max_body_bytes
+        self.verbose = verbose
+        self._slots = threading.BoundedSemaphore(max_connections)
+
+    def process_request(self, request, client_address):
+        self._slots.acquire()   # extra connections wait in the listen backlog
+        try:
+            super().process_request(request, client_address)
+        except BaseException:
+            self._slots.release()
+            raise
+
+    def process_request_thread(self, request, client_address):
+        try:
+            super().process_request_thread(request, client_address)
+        finally:
+            self._slots.release()
+
+
+def main(argv=None):
+    p = argparse.ArgumentParser(prog="python -m trusthire.server",
+                                description="Local JSON API for TrustHire AI scam scoring.")
+    p.add_argument("--host", default="127.0.0.1")
+    p.add_argument("--port", type=int, default=8765)
+    p.add_argument("--workers", type=int, default=None,
+                   help="scoring processes (default: CPU count; 0 = score in the request thread)")
+    p.add_argument("--web-concurrency", type=int, default=16, help="threads for live web checks")
+    p.add_argument("--max-body-bytes", type=int, default=MAX_BODY_BYTES)
+    p.add_argument("--max-batch", type=int, default=MAX_BATCH_POSTINGS)
+    p.add_argument("--max-connections", type=int, default=MAX_CONNECTIONS)
+    p.add_argument("--keepalive-timeout", type=float, default=KEEPALIVE_TIMEOUT)
+    p.add_argument("--score-timeout", type=float, default=SCORE_TIMEOUT,
+                   help="seconds a request waits for scoring before a 503")
+    p.add_argument("--verbose", action="store_true", help="log every request")
+    args = p.parse_args(argv)
+
+    ScoringRequestHandler.timeout = args.keepalive_timeout
+    service = ScoringService(args.workers, args.web_concurrency, args.max_batch, args.score_timeout)
+    server = ScoringHTTPServer((args.host, args.port), service, args.max_body_bytes,
+                               args.max_connections, args.verbose)
+    print(f"🛡️ TrustHire AI scoring API on http://{args.host}:{server.server_address[1]} "
+          f"({service.workers} workers)", file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.close()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
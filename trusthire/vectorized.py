@@ -0,0 +1,375 @@
+"""
+Vectorized batch scoring for bulk rescoring. Needs NumPy.
+
+``score_batch(postings)`` returns exactly ``[score_posting(p) for p in
+postings]`` for offline scoring (no web checks), an order of magnitude
+faster on large batches:
+
+* keyword hits become a postings × keywords boolean matrix. Lowercased
+  texts are split on single spaces and each distinct token in the batch is
+  matched against the keyword words once (substring for one-word keywords;
+  suffix / exact / prefix over consecutive tokens for phrases), so a token
+  costs a table lookup instead of an automaton walk — same hits as
+  ``kw in text``;
+* the other rule inputs form an integer feature matrix (``NUMERIC_FEATURES``);
+* the category weights, the 200 → 50 point scaling, report bonuses and the
+  LOW / MEDIUM / HIGH thresholds are applied as array operations. Prior
+  reports are looked up for the whole batch at once when ``reports=True``.
+
+Reasons are only assembled for rules that fired. ``check_parity`` compares
+against the single-posting path; run it after changing either.
+"""
+
+import bisect
+from collections import defaultdict
+from itertools import chain
+
+import numpy as np
+
+from .features import _DOLLAR_RE, _LPA_RE, _PHONE_RE
+from .keywords import FREE_EMAIL_DOMAINS, KEYWORD_BANKS
+from .reports import _LINK_RE, REPORT_STORE, lookup_prior_reports
+from .scoring import score_posting
+
+# Weights and reason labels of the keyword rules, as in calculate_risk_score
+KEYWORD_RULES = {
+    "payment": (30, "💳 Payment/fee demands"),
+    "urgency": (20, "⚡ Urgency/pressure tactics"),
+    "personal_info": (25, "🔓 Requests sensitive data"),
+    "too_good": (20, "🌈 Unrealistic promises"),
+    "mlm": (25, "🔺 MLM/pyramid indicators"),
+    "vague_role": (15, "📝 Vague job descriptions"),
+    "contact": (10, "📱 Informal communication"),
+    "no_interview": (15, "🚫 Bypasses hiring process"),
+    "commission": (12, "💸 Commission/incentive-only pay"),
+}
+_LEAD_CATEGORIES = ("payment", "urgency", "personal_info", "too_good", "mlm", "vague_role", "contact")
+NUMERIC_FEATURES = ("word_count", "caps_words", "exclamations", "phone_count",
+                    "salary_anomaly", "dollar_anomaly", "free_email", "no_company")
+
+# One column per keyword, grouped by category in bank order
+_COLUMNS = [(cat, kw) for cat, bank in KEYWORD_BANKS.items() for kw in bank]
+_MAX_PARTS = max(kw.count(" ") + 1 for _, kw in _COLUMNS)
+_CATEGORY_SLICES = {}
+for _i, (_cat, _) in enumerate(_COLUMNS):
+    _start, _ = _CATEGORY_SLICES.get(_cat, (_i, _i))
+    _CATEGORY_SLICES[_cat] = (_start, _i + 1)
+
+# Phone numbers are runs of ≥10 of [digit, '-', whitespace]. Bytes ≥ 0x80 are
+# marked too: they may belong to a non-ASCII digit or space.
+_PHONE_MARKS = bytes(49 if (chr(b).isspace() or chr(b).isdigit() or b == 45 or b >= 128) else 32
+                     for b in range(256))
+_RUN_START = b" " + b"1" * 10
+
+
+def _find_phones(text):
+    """``_PHONE_RE.findall(text)``; the regex only runs on non-ASCII text.
+
+    A match is a maximal run of ≥10 marked characters, plus a ``+`` just
+    before it, so on ASCII text the runs can be sliced out directly.
+    """
+    marks = b" " + text.encode("utf-8", "surrogatepass").translate(_PHONE_MARKS)
+    pos = marks.find(_RUN_START)
+    if pos < 0:
+        return []
+    if not text.isascii():
+        return _PHONE_RE.findall(text)
+    phones = []
+    while pos >= 0:   # marks[i + 1] is text[i]
+        end = marks.find(b" ", pos + 1)
+        end = len(marks) if end < 0 else end
+        phones.append(text[pos - 1 if pos and text[pos - 1] == "+" else pos:end - 1])
+        pos = marks.find(_RUN_START, end)
+    return phones
+
+
+def _salary_hit(text_lower):
+    """First LPA figure above 8 in a posting aimed at freshers, like the scorer."""
+    if "lpa" not in text_lower or not ("fresher" in text_lower or "no experience" in text_lower):
+        return None
+    return next((s for s in _LPA_RE.findall(text_lower) if int(s) > 8), None)
+
+
+def _dollar_hit(text_lower):
+    if "$" not in text_lower or not ("week" in text_lower or "daily" in text_lower):
+        return None
+    return next((m for m in _DOLLAR_RE.findall(text_lower) if int(m.replace(",", "")) > 5000), None)
+
+
+def _tokenize(texts):
+    """Split on single spaces: flat token ids, posting index per token, vocabulary."""
+    vocab = defaultdict()
+    vocab.default_factory = vocab.__len__
+    tokens = [t.split(" ") for t in texts]
+    counts = list(map(len, tokens))
+    ids = np.fromiter(map(vocab.__getitem__, chain.from_iterable(tokens)), dtype=np.int64, count=sum(counts))
+    owner = np.repeat(np.arange(len(texts)), counts)
+    return ids, owner, list(vocab)
+
+
+class _VocabIndex:
+    """Lowercased vocabulary joined into one string, for C-speed ``str.find``."""
+
+    def __init__(self, words):
+        # NUL separates words; no keyword contains it or \x01
+        self.joined = "\x00" + "\x00".join(w.replace("\x00", "\x01") for w in words) + "\x00"
+        self.ids = {w: i for i, w in enumerate(words)}
+        self.starts = [0] * (len(words) + 1)   # index of each word's first character
+        pos = 1
+        for i, w in enumerate(words):
+            self.starts[i] = pos
+            pos += len(w) + 1
+        self.starts[-1] = pos
+
+    def find(self, needle, lead=0):
+        """Ids of the words holding ``needle``; ``lead`` chars of it come before the word."""
+        out = []
+        pos = self.joined.find(needle)
+        while pos >= 0:
+            i = bisect.bisect_right(self.starts, pos + lead) - 1
+            out.append(i)
+            pos = self.joined.find(needle, self.starts[i + 1] - lead)
+        return out
+
+
+def keyword_hit_matrix(ids, owner, words, n):
+    """``(n, len(_COLUMNS))`` bool matrix: ``[i, k]`` is keyword k in text i.
+
+    ``ids`` / ``owner`` / ``words`` are lowercased single-space tokens as
+    from ``_tokenize``. A one-word keyword hits when a token contains it; a
+    phrase ``w1 … wm`` when consecutive tokens of one posting end with
+    ``w1``, equal the middle words and start with ``wm``. Phrases are
+    looked for around their rarest word in the batch, so common words like
+    "work" or "join" don't each become a candidate.
+    """
+    hits = np.zeros((n, len(_COLUMNS)), dtype=bool)
+    index = _VocabIndex(words)
+    freq = np.bincount(ids, minlength=len(words))
+    vocab_size = len(words)
+    entries = []   # (anchor word id, column, anchor part)
+    codes = []     # (column × _MAX_PARTS + part) × vocabulary + word id, for every allowed word
+    span = np.ones(len(_COLUMNS), dtype=np.int64)
+    for col, (_, kw) in enumerate(_COLUMNS):
+        parts = kw.split(" ")
+        if len(parts) == 1:
+            entries += [(w, col, 0) for w in index.find(kw)]
+            continue
+        allowed = ([index.find(parts[0] + "\x00")]
+                   + [[index.ids[p]] if p in index.ids else [] for p in parts[1:-1]]
+                   + [index.find("\x00" + parts[-1], lead=1)])
+        if not all(allowed):
+            continue   # not in this batch
+        span[col] = len(parts)
+        anchor = min(range(len(parts)), key=lambda j: int(freq[allowed[j]].sum()))
+        entries += [(w, col, anchor) for w in allowed[anchor]]
+        codes += [(col * _MAX_PARTS + j) * vocab_size + w for j, ws in enumerate(allowed) for w in ws]
+    if not entries:
+        return hits
+
+    # Fan every token position out to the (column, part) entries of its word
+    entries.sort()
+    entry_word, entry_col, entry_part = (np.array(a, dtype=np.int64) for a in zip(*entries))
+    per_word = np.bincount(entry_word, minlength=vocab_size)
+    first_entry = np.cumsum(per_word) - per_word
+    pos = np.flatnonzero(per_word[ids])
+    fan = per_word[ids[pos]]
+    pos = np.repeat(pos, fan)
+    entry = first_entry[ids[pos]] + np.arange(len(pos)) - np.repeat(np.cumsum(fan) - fan, fan)
+    col, part = entry_col[entry], entry_part[entry]
+
+    # The whole keyword must lie in one posting with every word allowed
+    start = pos - part
+    length = span[col]
+    end = start + length - 1
+    ok = (start >= 0) & (end < len(ids))
+    ok &= owner[np.clip(start, 0, len(ids) - 1)] == owner[np.clip(end, 0, len(ids) - 1)]
+    codes = np.unique(np.array(codes, dtype=np.int64))
+    for j in range(int(length.max())):
+        check = ok & (j < length) & (j != part)
+        if not check.any():
+            continue
+        code = (col[check] * _MAX_PARTS + j) * vocab_size + ids[start[check] + j]
+        at = np.minimum(np.searchsorted(codes, code), len(codes) - 1)
+        ok[check] = codes[at] == code
+    hits[owner[start[ok]], col[ok]] = True
+    return hits
+
+
+class BatchFeatures:
+    """Rule inputs for a batch: keyword hit matrix plus numeric feature matrix."""
+
+    def __init__(self, texts, emails, companies):
+        self.lowers = lowers = [t.lower() for t in texts]
+        # One tokenization serves everything: each distinct single-space
+        # token is lowercased and split into words once, not per occurrence.
+        ids, owner, vocab = _tokenize(texts)
+        lower_ids = defaultdict()
+        lower_ids.default_factory = lower_ids.__len__
+        to_lower = np.fromiter((lower_ids[w.lower()] for w in vocab), dtype=np.int64, count=len(vocab))
+        n_words = np.fromiter((len(w.split()) for w in vocab), dtype=np.int64, count=len(vocab))
+        n_caps = np.fromiter((sum(1 for x in w.split() if x.isupper() and len(x) > 2) for w in vocab),
+                             dtype=np.int64, count=len(vocab))
+        self.hits = keyword_hit_matrix(to_lower[ids], owner, list(lower_ids), len(texts))
+        self.salary = [_salary_hit(t) for t in lowers]
+        self.dollar = [_dollar_hit(t) for t in lowers]
+        self.free_domain = [_free_domain(e) for e in emails]
+        self.numeric = np.column_stack([
+            np.bincount(owner, weights=n_words[ids], minlength=len(texts)),
+            np.bincount(owner, weights=n_caps[ids], minlength=len(texts)),
+            [t.count("!") for t in texts],
+            [len(_find_phones(t.strip())) for t in texts],
+            [s is not None for s in self.salary],
+            [d is not None for d in self.dollar],
+            [d is not None for d in self.free_domain],
+            [not c or not c.strip() for c in companies],
+        ]).astype(np.int64)
+
+    def column(self, name):
+        return self.numeric[:, NUMERIC_FEATURES.index(name)]
+
+    def category_hits(self, category):
+        start, stop = _CATEGORY_SLICES[category]
+        return self.hits[:, start:stop].any(axis=1)
+
+
+def _free_domain(email):
+    if not email or "@" not in email:
+        return None
+    dom = email.lower().strip().split("@")[-1]
+    return dom if dom and dom in FREE_EMAIL_DOMAINS else None
+
+
+def _prior_reports(texts, lowers, emails, job_urls):
+    """``lookup_prior_reports`` for the whole batch in a few queries."""
+    queries = []
+    for text, lower, email, job_url in zip(texts, lowers, emails, job_urls):
+        phones = _find_phones(text)
+        links = _LINK_RE.findall(text) if "http" in lower or "www." in lower else []
+        if job_url:
+            links.append(job_url)
+        queries.append((email, phones, links))
+    return REPORT_STORE.lookup_many(queries)
+
+
+def _prior_bonus(prior):
+    """``(points, reason)`` for prior user reports, as in calculate_risk_score."""
+    direct = [(f"email {k}", n) for k, n in prior["email"].items()]
+    direct += [(f"phone …{k[-4:]}", n) for k, n in prior["phone"].items()]
+    direct += [(f"link host {k}", n) for k, n in prior["link_host"].items()]
+    if direct:
+        return 20, "🚩 Previously reported as a scam: " + ", ".join(f"{what} ({n}×)" for what, n in direct)
+    if prior["email_domain"]:
+        return 10, ("🚩 Email domain previously reported: "
+                    + ", ".join(f"@{d} ({n}×)" for d, n in prior["email_domain"].items()))
+    return 0, None
+
+
+def score_batch(postings, reasons=True, reports=False):
+    """Score ``{"job_text", "email", "company", "job_url"}`` dicts without web checks.
+
+    Same results, in order, as ``score_posting`` for each (given
+    ``lookup_prior_reports`` when ``reports``); with ``reasons=False``
+    only ``score``, ``risk_level`` and ``company_status``.
+    """
+    texts = [p.get("job_text") or "" for p in postings]
+    emails = [p.get("email") or "" for p in postings]
+    companies = [p.get("company") or "" for p in postings]
+    feats = BatchFeatures(texts, emails, companies)
+    n = len(texts)
+
+    raw = np.zeros(n, dtype=np.int64)
+    for category, (weight, _) in KEYWORD_RULES.items():
+        raw += weight * feats.category_hits(category)
+    word_count = feats.column("word_count")
+    caps_ratio = np.divide(feats.column("caps_words"), word_count,
+                           out=np.zeros(n), where=word_count > 0)
+    no_company = feats.column("no_company").astype(bool)
+    no_qualification = ~feats.category_hits("qualification") & (word_count > 10)
+    raw += 20 * feats.column("salary_anomaly") + 20 * feats.column("dollar_anomaly")
+    raw += 15 * feats.column("free_email")
+    raw += 10 * (caps_ratio > 0.25) + 8 * (feats.column("exclamations") >= 4)
+    raw += 10 * ((word_count > 0) & (word_count < 30)) + 8 * no_qualification
+    raw += 5 * (feats.column("phone_count") >= 2) + 10 * no_company
+
+    # Scale to the 50-point text budget (same float ops as the scorer)
+    text_score = np.where(raw > 0, np.minimum(50, ((raw / 200) * 50).astype(np.int64)), 0)
+
+    prior = [(0, None)] * n
+    if reports and REPORT_STORE.exists():
+        found = _prior_reports(texts, feats.lowers, emails, [p.get("job_url") or None for p in postings])
+        prior = [_prior_bonus(f) for f in found]
+        text_score = np.minimum(50, text_score + np.array([b for b, _ in prior], dtype=np.int64))
+
+    company_score = np.where(no_company, 50, 30)
+    score = np.clip(company_score + text_score, 0, 100)
+    level = np.where(score <= 30, 0, np.where(score <= 60, 1, 2))
+
+    levels = ("LOW", "MEDIUM", "HIGH")
+    out = [{"score": s, "risk_level": levels[lv], "company_status": "missing" if missing else "unknown"}
+           for s, lv, missing in zip(score.tolist(), level.tolist(), no_company.tolist())]
+    if reasons:
+        hit_rows = _hits_by_row(feats.hits)
+        rows, ratios = feats.numeric.tolist(), caps_ratio.tolist()
+        for i, result in enumerate(out):
+            result["reasons"] = _reasons(hit_rows.get(i, {}), rows[i], ratios[i], feats.salary[i],
+                                         feats.dollar[i], feats.free_domain[i], prior[i][1])
+            result["verifications"] = (["❌ No company name provided — cannot verify online"]
+                                       if result["company_status"] == "missing"
+                                       else ["⚠️ Company verification was not performed"])
+    return out
+
+
+def _hits_by_row(hits):
+    """``{row: {category: [keywords hit]}}`` for the rows with any hit."""
+    rows = {}
+    for category, (start, stop) in _CATEGORY_SLICES.items():
+        bank = KEYWORD_BANKS[category]
+        found = None
+        row, cols = np.nonzero(hits[:, start:stop])
+        for i, c in zip(row.tolist(), cols.tolist()):
+            if found is None or i != last:
+                found = rows.setdefault(i, {}).setdefault(category, [])
+                last = i
+            found.append(bank[c])
+    return rows
+
+
+def _reasons(hits, row, caps_ratio, salary, dollar, free_domain, prior_reason):
+    """The scorer's text reasons for one posting, in the scorer's order."""
+    word_count, _, exclamations, phone_count, _, _, _, no_company = row
+    reasons = [f"{KEYWORD_RULES[c][1]}: {', '.join(hits[c])}" for c in _LEAD_CATEGORIES if c in hits]
+    if salary is not None:
+        reasons.append(f"💰 Unrealistic salary ({salary} LPA) for freshers")
+    if dollar is not None:
+        reasons.append(f"💰 Suspiciously high pay (${dollar}/week or /day)")
+    if free_domain is not None:
+        reasons.append(f"📧 Recruiter uses free email (@{free_domain})")
+    if word_count and caps_ratio > 0.25:
+        reasons.append(f"🔠 Excessive ALL-CAPS ({int(caps_ratio*100)}% of words)")
+    if exclamations >= 4:
+        reasons.append(f"❗ Excessive exclamation marks ({exclamations} found)")
+    if 0 < word_count < 30:
+        reasons.append(f"📏 Very short description ({word_count} words)")
+    if "qualification" not in hits and word_count > 10:
+        reasons.append("🎓 No educational/skill requirements mentioned")
+    if "no_interview" in hits:
+        reasons.append(f"{KEYWORD_RULES['no_interview'][1]}: {', '.join(hits['no_interview'])}")
+    if phone_count >= 2:
+        reasons.append("📞 Multiple phone numbers listed")
+    if "commission" in hits:
+        reasons.append(f"{KEYWORD_RULES['commission'][1]}: {', '.join(hits['commission'])}")
+    if no_company:
+        reasons.append("🏢 No company name provided")
+    if prior_reason:
+        reasons.append(prior_reason)
+    return reasons
+
+
+def check_parity(postings, reports=False):
+    """Indexes of postings where ``score_batch`` and ``score_posting`` disagree."""
+    def single(p):
+        prior = (lookup_prior_reports(p.get("job_text") or "", p.get("email") or "",
+                                      p.get("job_url") or None) if reports else None)
+        return score_posting(p, prior_reports=prior)
+    return [i for i, (a, b) in enumerate(zip(score_batch(postings, reports=reports), map(single, postings)))
+            if a != b]
@@ -0,0 +1,612 @@
+"""
+Live web verification: company website, email domain and URL checks,
+a pooled HEAD-probe client, and a persistent result cache.
+"""
+
+import functools
+import http.client
+import json
+import re
+import socket
+import sqlite3
+import ssl
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, wait
+from urllib.parse import urljoin, urlparse
+
+from .dnsclient import DNS_CLIENT, DNSError
+from .reputation import DOMAIN_REPUTATION
+
+
+# ═════════════════════════════════════════════
+# VERIFICATION CACHE
+#   DNS / HTTP results shared across sessions
+#   and restarts (SQLite on local disk)
+# ═════════════════════════════════════════════
+VERIFY_CACHE_FILE = "verify_cache.sqlite3"
+VERIFY_CACHE_POSITIVE_TTL = 24 * 3600   # found / valid / reachable
+VERIFY_CACHE_NEGATIVE_TTL = 30 * 60     # failures may be transient
+VERIFY_CACHE_MAX_ENTRIES = 50_000
+
+
+class VerificationCache:
+    """Size-bounded LRU cache of verifier results with separate positive/negative TTLs."""
+
+    _EVICT_EVERY = 64   # puts between size checks
+
+    def __init__(self, path=VERIFY_CACHE_FILE, max_entries=VERIFY_CACHE_MAX_ENTRIES,
+                 positive_ttl=VERIFY_CACHE_POSITIVE_TTL, negative_ttl=VERIFY_CACHE_NEGATIVE_TTL):
+        self.path = path
+        self.max_entries = max_entries
+        self.positive_ttl = positive_ttl
+        self.negative_ttl = negative_ttl
+        self.hits = Counter()
+        self.misses = Counter()
+        self._db = None
+        self._lock = threading.Lock()
+        self._puts = 0
+
+    def _conn(self):
+        if self._db is None:
+            db = sqlite3.connect(self.path, timeout=5, check_same_thread=False,
+                                 isolation_level=None)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            db.execute("""CREATE TABLE IF NOT EXISTS verify_cache (
+                kind TEXT NOT NULL, key TEXT NOT NULL, value TEXT NOT NULL,
+                expires REAL NOT NULL, last_used REAL NOT NULL,
+                PRIMARY KEY (kind, key))""")
+            db.execute("CREATE INDEX IF NOT EXISTS verify_cache_lru ON verify_cache(last_used)")
+            self._db = db
+        return self._db
+
+    def get(self, kind, key):
+        """Cached result for ``(kind, key)``, or None when missing or expired."""
+        now = time.time()
+        try:
+            with self._lock:
+                db = self._conn()
+                row = db.execute("SELECT value, expires FROM verify_cache WHERE kind=? AND key=?",
+                                 (kind, key)).fetchone()
+                if row and row[1] > now:
+                    db.execute("UPDATE verify_cache SET last_used=? WHERE kind=? AND key=?",
+                               (now, kind, key))
+                    self.hits[kind] += 1
+                    return json.loads(row[0])
+        except sqlite3.Error:
+            pass
+        self.misses[kind] += 1
+        return None
+
+    def put(self, kind, key, value, positive):
+        now = time.time()
+        ttl = self.positive_ttl if positive else self.negative_ttl
+        try:
+            with self._lock:
+                db = self._conn()
+                db.execute("INSERT OR REPLACE INTO verify_cache VALUES (?, ?, ?, ?, ?)",
+                           (kind, key, json.dumps(value, ensure_ascii=False), now + ttl, now))
+                self._puts += 1
+                if self._puts % self._EVICT_EVERY == 0:
+                    self._evict(db, now)
+        except sqlite3.Error:
+            pass
+
+    def _evict(self, db, now):
+        db.execute("DELETE FROM verify_cache WHERE expires <= ?", (now,))
+        db.execute("""DELETE FROM verify_cache WHERE rowid IN (
+            SELECT rowid FROM verify_cache ORDER BY last_used DESC LIMIT -1 OFFSET ?)""",
+                   (self.max_entries,))
+
+    def stats(self):
+        """Hit/miss counters per verifier kind plus the current entry count."""
+        try:
+            with self._lock:
+                size = self._conn().execute("SELECT COUNT(*) FROM verify_cache").fetchone()[0]
+        except sqlite3.Error:
+            size = None
+        kinds = sorted(set(self.hits) | set(self.misses))
+        return {
+            "entries": size,
+            "hits": sum(self.hits.values()),
+            "misses": sum(self.misses.values()),
+            "by_kind": {k: {"hits": self.hits[k], "misses": self.misses[k]} for k in kinds},
+        }
+
+
+VERIFY_CACHE = VerificationCache()
+
+
+def cached_check(kind, key_fn, is_positive):
+    """Route a one-argument verifier through ``VERIFY_CACHE``.
+
+    ``key_fn`` normalizes the argument into the cache key (return a falsy
+    value to bypass the cache); ``is_positive`` picks the TTL for a result.
+    The key also carries ``DOMAIN_REPUTATION.version()``, so rebuilding the
+    reputation file retires verdicts cached under the old lists at once.
+    The raw verifier stays reachable as ``.uncached``.
+    """
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(arg):
+            key = _versioned(key_fn(arg))
+            if not key:
+                return fn(arg)
+            result = VERIFY_CACHE.get(kind, key)
+            if result is None:
+                result = fn(arg)
+                VERIFY_CACHE.put(kind, key, result, is_positive(result))
+            return result
+        wrapper.uncached = fn
+        return wrapper
+    return decorator
+
+
+def _versioned(key):
+    return f"{key}|{DOMAIN_REPUTATION.version()}" if key else ""
+
+
+def _email_cache_key(email):
+    return email.strip().lower().split("@")[-1] if email and "@" in email else ""
+
+
+def _company_cache_key(company_name):
+    return company_name.strip().lower() if company_name else ""
+
+
+def _url_cache_key(url_str):
+    return url_str.strip() if url_str else ""
+
+
+# ═════════════════════════════════════════════
+# HTTP PROBE CLIENT
+#   One SSL context, keep-alive connections
+#   pooled per host, per-request timeouts
+# ═════════════════════════════════════════════
+PROBE_TIMEOUT = 6            # seconds per connect / TLS / response phase
+PROBE_USER_AGENT = "Mozilla/5.0 TrustHireAI/1.0"
+
+
+class ProbeClient:
+    """HEAD-request client shared by all verifiers and sessions.
+
+    Connections are kept alive and pooled per ``(scheme, host, port)`` so a
+    repeat probe skips DNS, TCP and TLS. Every response carries a
+    ``timings`` dict (seconds) for the ``dns``, ``connect``, ``tls`` and
+    ``response`` phases; reused connections report zero for the first three.
+    """
+
+    MAX_IDLE_PER_HOST = 4
+    IDLE_TTL = 30           # servers drop idle keep-alives after ~60 s
+    MAX_REDIRECTS = 10      # same limit as urllib
+
+    def __init__(self, timeout=PROBE_TIMEOUT, resolver=socket.getaddrinfo):
+        self.timeout = timeout
+        self.resolver = resolver    # getaddrinfo-compatible; swapped out by the benchmarks
+        self._ssl_context = None
+        self._idle = {}
+        self._lock = threading.Lock()
+
+    @property
+    def ssl_context(self):
+        """Created on first HTTPS probe — loading the CA store is the slow part."""
+        if self._ssl_context is None:
+            ctx = ssl.create_default_context()
+            ctx.check_hostname = False
+            ctx.verify_mode = ssl.CERT_NONE
+            self._ssl_context = ctx
+        return self._ssl_context
+
+    def resolve(self, host, port=80):
+        """``getaddrinfo`` for TCP; returns ``(addrinfos, seconds)``."""
+        t0 = time.perf_counter()
+        infos = self.resolver(host, port, type=socket.SOCK_STREAM)
+        return infos, time.perf_counter() - t0
+
+    def head(self, url, timeout=None):
+        """HEAD ``url``, following redirects like ``urlopen``.
+
+        Returns ``{"status", "url", "reused", "timings"}``; raises ``OSError``
+        (or ``http.client.HTTPException``) when the server cannot be reached.
+        """
+        timeout = timeout or self.timeout
+        total = {"dns": 0.0, "connect": 0.0, "tls": 0.0, "response": 0.0}
+        for _ in range(self.MAX_REDIRECTS + 1):
+            status, location, reused, timings = self._head_once(url, timeout)
+            for phase, secs in timings.items():
+                total[phase] += secs
+            if status in (301, 302, 303, 307, 308) and location:
+                url = urljoin(url, location)
+                continue
+            return {"status": status, "url": url, "reused": reused, "timings": total}
+        raise http.client.HTTPException(f"Too many redirects for {url}")
+
+    def _head_once(self, url, timeout):
+        parsed = urlparse(url)
+        scheme = parsed.scheme.lower()
+        if scheme not in ("http", "https") or not parsed.hostname:
+            raise http.client.InvalidURL(url)
+        port = parsed.port or (443 if scheme == "https" else 80)
+        pool_key = (scheme, parsed.hostname, port)
+        path = (parsed.path or "/") + (f"?{parsed.query}" if parsed.query else "")
+        headers = {"User-Agent": PROBE_USER_AGENT, "Host": parsed.netloc}
+
+        conn = self._checkout(pool_key)
+        if conn is not None:
+            try:
+                return self._send(conn, pool_key, path, headers, timeout, True,
+                                  {"dns": 0.0, "connect": 0.0, "tls": 0.0})
+            except (OSError, http.client.HTTPException):
+                conn.close()   # stale keep-alive; fall through to a fresh one
+
+        conn, timings = self._connect(scheme, parsed.hostname, port, timeout)
+        try:
+            return self._send(conn, pool_key, path, headers, timeout, False, timings)
+        except BaseException:
+            conn.close()
+            raise
+
+    def _connect(self, scheme, host, port, timeout):
+        timings = {"dns": 0.0, "connect": 0.0, "tls": 0.0}
+        infos, timings["dns"] = self.resolve(host, port)
+        sock, err = None, None
+        t0 = time.perf_counter()
+        for family, socktype, proto, _, addr in infos:
+            try:
+                sock = socket.socket(family, socktype, proto)
+                sock.settimeout(timeout)
+                sock.connect(addr)
+                break
+            except OSError as e:
+                err = e
+                if sock is not None:
+                    sock.close()
+                sock = None
+        timings["connect"] = time.perf_counter() - t0
+        if sock is None:
+            raise err or OSError(f"Could not connect to {host}:{port}")
+        if scheme == "https":
+            t0 = time.perf_counter()
+            try:
+                sock = self.ssl_context.wrap_socket(sock, server_hostname=host)
+            except BaseException:
+                sock.close()
+                raise
+            timings["tls"] = time.perf_counter() - t0
+            conn = http.client.HTTPSConnection(host, port, timeout=timeout, context=self.ssl_context)
+        else:
+            conn = http.client.HTTPConnection(host, port, timeout=timeout)
+        conn.sock = sock
+        return conn, timings
+
+    def _send(self, conn, pool_key, path, headers, timeout, reused, timings):
+        conn.sock.settimeout(timeout)
+        t0 = time.perf_counter()
+        conn.request("HEAD", path, headers=headers)
+        resp = conn.getresponse()
+        resp.read()
+        timings["response"] = time.perf_counter() - t0
+        location = resp.getheader("Location")
+        if resp.will_close:
+            conn.close()
+        else:
+            self._checkin(pool_key, conn)
+        return resp.status, location, reused, timings
+
+    def _checkout(self, pool_key):
+        now = time.monotonic()
+        with self._lock:
+            idle = self._idle.get(pool_key, [])
+            while idle:
+                conn, since = idle.pop()
+                if now - since < self.IDLE_TTL:
+                    return conn
+                conn.close()
+        return None
+
+    def _checkin(self, pool_key, conn):
+        with self._lock:
+            idle = self._idle.setdefault(pool_key, [])
+            if len(idle) < self.MAX_IDLE_PER_HOST:
+                idle.append((conn, time.monotonic()))
+                return
+        conn.close()
+
+
+PROBE_CLIENT = ProbeClient()
+
+
+# ═════════════════════════════════════════════
+# WEB VERIFICATION FUNCTIONS
+# ═════════════════════════════════════════════
+
+def _mail_queries(domain):
+    return [(domain, "MX"), (domain, "A"), (domain, "AAAA")]
+
+
+def _mail_hosts(mx, a, aaaa):
+    """``(MX hosts, accepts mail)`` from the answers to ``_mail_queries``.
+
+    Without MX records a domain's A/AAAA address takes mail (RFC 5321
+    §5.1); a single ``.`` MX says it takes none (RFC 7505). Raises
+    ``DNSError`` when no nameserver answered the MX query.
+    """
+    if isinstance(mx, ValueError):   # not a valid domain name
+        return [], False
+    if isinstance(mx, Exception):
+        raise mx
+    if mx["rcode"] == "NXDOMAIN":
+        return [], False
+    hosts = [host for _, host in mx["records"]]
+    if hosts:
+        return ([], False) if hosts == [""] else (hosts, True)
+    return [], any(not isinstance(r, Exception) and r["records"] for r in (a, aaaa))
+
+
+_NO_SUCH_NAME = {socket.EAI_NONAME, getattr(socket, "EAI_NODATA", socket.EAI_NONAME)}
+
+
+def _system_mail_hosts(domain, error):
+    """``_mail_hosts`` by ``getaddrinfo`` for when the stub resolver got no
+    answer at all (UDP/53 blocked, only a local resolver allowed…).
+
+    An address means the domain takes mail; no MX hosts are known. Raises
+    ``error`` again unless the system resolver answered either way.
+    """
+    try:
+        PROBE_CLIENT.resolve(domain)
+    except socket.gaierror as e:
+        if e.errno in _NO_SUCH_NAME:
+            return [], False
+        raise error from e
+    except OSError as e:
+        raise error from e
+    return [], True
+
+
+def _email_check(email, answers=None):
+    result = {"valid_domain": False, "is_free": False, "domain": "", "mx": []}
+    if "@" not in email:
+        return result
+    domain = email.strip().lower().split("@")[-1]
+    result["domain"] = domain
+    verdict = DOMAIN_REPUTATION.lookup(domain)
+    if verdict in ("free_mail", "allow", "deny"):
+        result["reputation"] = verdict
+        result["is_free"] = verdict == "free_mail"
+        result["valid_domain"] = verdict != "deny"
+        return result
+    if answers is None:
+        answers = DNS_CLIENT.resolve_many(_mail_queries(domain))
+    try:
+        result["mx"], result["valid_domain"] = _mail_hosts(*answers)
+    except DNSError as e:
+        result["mx"], result["valid_domain"] = _system_mail_hosts(domain, e)
+        result["resolver"] = "system"
+    return result
+
+
+@cached_check("email", _email_cache_key, lambda r: r["valid_domain"])
+def verify_email_domain(email):
+    """MX lookup for the email's domain (falling back to A/AAAA), sent as
+    one pipelined batch of queries. When no nameserver answers, the system
+    resolver is asked instead; ``DNSError`` is raised only when that fails
+    too, so the check counts as failed rather than as a bad domain."""
+    return _email_check(email)
+
+
+def verify_email_domains(emails):
+    """``verify_email_domain`` for many addresses at once.
+
+    The MX/A/AAAA queries of every uncached domain go out together on the
+    shared DNS sockets. Returns one result per email, in order, or the
+    ``DNSError`` for a domain no nameserver answered.
+    """
+    keys = [_email_cache_key(e) for e in emails]
+    results = {}
+    todo = []
+    for key in dict.fromkeys(filter(None, keys)):
+        cached = VERIFY_CACHE.get("email", _versioned(key))
+        if cached is not None:
+            results[key] = cached
+        elif DOMAIN_REPUTATION.lookup(key) in ("free_mail", "allow", "deny"):
+            results[key] = _email_check("@" + key)
+        else:
+            todo.append(key)
+    answers = DNS_CLIENT.resolve_many([q for key in todo for q in _mail_queries(key)])
+
+    def check(i):
+        try:
+            return _email_check("@" + todo[i], answers[3 * i:3 * i + 3])
+        except DNSError as e:
+            return e
+
+    # Unanswered domains fall back to getaddrinfo, which blocks: run those side by side
+    unanswered = any(isinstance(mx, DNSError) for mx in answers[::3])
+    for key, result in zip(todo, (_PROBE_POOL.map if unanswered else map)(check, range(len(todo)))):
+        results[key] = result
+    for key, result in results.items():
+        if not isinstance(result, Exception):
+            VERIFY_CACHE.put("email", _versioned(key), result, result["valid_domain"])
+    return [results[key] if key else _email_check(email) for email, key in zip(emails, keys)]
+
+
+_PROBE_POOL = ThreadPoolExecutor(max_workers=24, thread_name_prefix="probe")
+
+
+def _probe_domain(domain, stop):
+    """Resolve one candidate domain, then HEAD it over https and http.
+
+    Returns ``(resolves, live_url, timings)``. Skips the HEAD requests once
+    ``stop`` is set, i.e. when a higher-priority candidate has already won.
+    """
+    try:
+        _, dns_secs = PROBE_CLIENT.resolve(domain)
+    except (socket.gaierror, socket.timeout, OSError):
+        return False, None, {}
+    timings = {"dns": dns_secs}
+    for scheme in ["https", "http"]:
+        if stop.is_set():
+            break
+        try:
+            resp = PROBE_CLIENT.head(f"{scheme}://{domain}")
+        except Exception:
+            continue
+        timings = resp["timings"]
+        if resp["status"] < 400:
+            return True, f"{scheme}://{domain}", timings
+    return True, None, timings
+
+
+@cached_check("company", _company_cache_key, lambda r: r["found"])
+def verify_company_online(company_name):
+    result = {"found": False, "domain_tried": "", "website_live": False, "details": ""}
+    if not company_name or not company_name.strip():
+        result["details"] = "No company name provided"
+        return result
+    clean = re.sub(r'[^a-zA-Z0-9\s]', '', company_name.strip().lower())
+    slug = clean.replace(" ", "")
+    domains_to_try = [
+        f"{slug}.com", f"{slug}.in", f"{slug}.co.in",
+        f"{slug}.org", f"{slug}.io", f"www.{slug}.com",
+    ]
+    # Reputation first: deny-listed candidates are never probed, and nothing
+    # after an allow-listed one needs to be, since that one wins at the latest.
+    verdicts = [DOMAIN_REPUTATION.lookup(d) for d in domains_to_try]
+    allowed = verdicts.index("allow") if "allow" in verdicts else len(domains_to_try)
+    candidates = [d for d, v in zip(domains_to_try[:allowed], verdicts) if v != "deny"]
+    # Probe every candidate at once; the first one in list order that
+    # resolves still wins, exactly as in the old sequential loop.
+    stops = [threading.Event() for _ in candidates]
+    futures = [_PROBE_POOL.submit(_probe_domain, d, ev) for d, ev in zip(candidates, stops)]
+    for i, domain in enumerate(candidates):
+        result["domain_tried"] = domain
+        resolves, live_url, timings = futures[i].result()
+        if not resolves:
+            continue
+        for fut, ev in zip(futures[i + 1:], stops[i + 1:]):
+            ev.set()
+            fut.cancel()
+        result["found"] = True
+        result["timings"] = timings
+        if live_url:
+            result["website_live"] = True
+            result["details"] = f"Company website found at {live_url}"
+        else:
+            result["details"] = f"Domain {domain} exists in DNS but website is not reachable"
+        return result
+    if allowed < len(domains_to_try):
+        domain = domains_to_try[allowed]
+        result.update(found=True, website_live=True, domain_tried=domain,
+                      details=f"Company website {domain} is on the known-good domain list")
+        return result
+    result["details"] = f"No website found for '{company_name}' (tried: {', '.join(domains_to_try[:3])}...)"
+    return result
+
+
+@cached_check("url", _url_cache_key, lambda r: r["reachable"])
+def check_url_safety(url_str):
+    """Check if a URL is reachable and analyze its domain for safety signals."""
+    result = {"safe": None, "reachable": False, "domain": "", "reasons": []}
+    try:
+        parsed = urlparse(url_str)
+        domain = parsed.netloc or parsed.path.split("/")[0]
+        result["domain"] = domain
+    except Exception:
+        result["reasons"].append("❌ Invalid URL format")
+        result["safe"] = False
+        return result
+
+    if not domain:
+        result["reasons"].append("❌ Could not parse domain from URL")
+        result["safe"] = False
+        return result
+
+    # Reputation lists (deny / allow / suspicious TLDs) before any network probe
+    listed, verdict = DOMAIN_REPUTATION.match(domain) or (None, None)
+    if verdict == "suspicious":
+        result["reasons"].append(f"⚠️ Suspicious TLD: .{listed} (commonly used in scam sites)"
+                                 if "." not in listed else f"⚠️ Suspicious domain: {listed}")
+    elif verdict == "deny":
+        result["reasons"].append(f"❌ Domain {listed} is on the scam domain list")
+
+    # Check for IP-address URLs
+    if re.match(r'^\d+\.\d+\.\d+\.\d+', domain):
+        result["reasons"].append("⚠️ URL uses raw IP address instead of domain name")
+
+    # Check for very long subdomains (phishing pattern)
+    if domain.count(".") > 3:
+        result["reasons"].append("⚠️ Excessive subdomains — common phishing pattern")
+
+    # Check HTTP reachability (not needed for listed domains)
+    if verdict == "allow":
+        result["reachable"] = True
+    for scheme in ([] if verdict in ("allow", "deny") else ["https", "http"]):
+        full_url = f"{scheme}://{domain}" if "://" not in url_str else url_str
+        try:
+            resp = PROBE_CLIENT.head(full_url)
+        except Exception:
+            continue
+        result["timings"] = resp["timings"]
+        if resp["status"] >= 400:
+            continue   # urlopen raised HTTPError here, so this never counted as reachable
+        result["reachable"] = True
+        break
+
+    if not result["reachable"] and verdict != "deny":
+        result["reasons"].append("❌ URL is NOT reachable — website may be down or fake")
+
+    # No HTTPS check
+    if url_str.startswith("http://") and not url_str.startswith("https://"):
+        result["reasons"].append("⚠️ URL uses HTTP instead of HTTPS (not secure)")
+
+    result["safe"] = len(result["reasons"]) == 0
+    return result
+
+
+# ── Concurrent verification stage ──
+VERIFY_DEADLINE = 10.0   # seconds for the whole stage, not per check
+_VERIFY_POOL = ThreadPoolExecutor(max_workers=12, thread_name_prefix="verify")
+
+
+def run_web_checks(company, email, job_url, deadline=VERIFY_DEADLINE, skip=False):
+    """Run the company, email and URL checks at once under one overall deadline.
+
+    Returns the ``web_checks`` dict for ``calculate_risk_score``. Checks that
+    did not finish in time are left out and their keys are listed under
+    ``"timed_out"``; checks that raised are listed under ``"failed"``. With
+    ``skip`` the email and URL checks stay off the network and are listed
+    under ``"skipped"``. The company check always runs: it carries half the
+    score, which must not depend on whether a repost was recognised.
+    """
+    jobs = {}
+    if company and company.strip():
+        jobs["company_check"] = (verify_company_online, company)
+    if email and "@" in email:
+        jobs["email_check"] = (verify_email_domain, email)
+    if job_url and job_url.strip():
+        jobs["url_check"] = (check_url_safety, job_url.strip())
+    web_checks = {}
+    if skip:
+        skipped = sorted(set(jobs) - {"company_check"})
+        jobs = {k: v for k, v in jobs.items() if k not in skipped}
+        if skipped:
+            web_checks["skipped"] = skipped
+
+    futures = {_VERIFY_POOL.submit(fn, arg): key for key, (fn, arg) in jobs.items()}
+    done, pending = wait(futures, timeout=deadline)
+    failed = []
+    for fut in done:
+        try:
+            web_checks[futures[fut]] = fut.result()
+        except Exception:
+            failed.append(futures[fut])
+    for fut in pending:
+        fut.cancel()
+    if pending:
+        web_checks["timed_out"] = sorted(futures[f] for f in pending)
+    if failed:
+        web_checks["failed"] = sorted(failed)
+    return web_checks